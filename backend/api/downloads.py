@@ -0,0 +1,154 @@
+"""
+api/downloads.py
+────────────────
+Streaming downloads of stored files.
+
+The file is never loaded whole: the body is read in DOWNLOAD_CHUNK_BYTES
+pieces from the blob store (ingestion/blob_store.py) — or, for a row whose
+bytes are still in its legacy BYTEA column, with substr() in PostgreSQL,
+each slice on a short session of its own — so memory per download stays
+constant and a slow client never pins a pooled connection. Responses carry
+the file's SHA-256 as a strong ETag (304 on If-None-Match) and honour a
+single `Range: bytes=…` with 206, so browser PDF viewers can seek without
+fetching the whole file.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import func
+
+from config.postgres import SessionLocal
+from config.settings import settings
+from ingestion import blob_store
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Inclusive (start, end) of a single-range `bytes=` header, or None to send
+    the whole file. Multi-range and malformed headers are ignored, as RFC 9110
+    allows; a well-formed range outside the file is answered with 416.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)  # "bytes=-N": the last N bytes
+        start, end = (max(size - suffix, 0) if suffix else size), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _iter_file(path: str, start: int, end: int):
+    """Yield bytes start..end (inclusive) of a blob store file."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            piece = fh.read(min(settings.DOWNLOAD_CHUNK_BYTES, remaining))
+            if not piece:
+                break
+            yield piece
+            remaining -= len(piece)
+
+
+def _iter_blob(blob, pk, row_id, start: int, end: int):
+    """Yield bytes start..end (inclusive) of one BYTEA value, slice by slice."""
+    offset = start
+    while offset <= end:
+        length = min(settings.DOWNLOAD_CHUNK_BYTES, end - offset + 1)
+        db = SessionLocal()
+        try:
+            piece = db.query(func.substr(blob, offset + 1, length)).filter(pk == row_id).scalar()
+        finally:
+            db.close()
+        if not piece:
+            break  # row deleted or shrunk mid-download
+        yield bytes(piece)
+        offset += len(piece)
+
+
+def blob_response(
+    request: Request,
+    blob,
+    pk,
+    row_id: int,
+    size: int | None,
+    content_sha256: str | None,
+    filename: str,
+    media_type: str | None,
+) -> Response:
+    """
+    Stream the file of the row where `pk == row_id`: from the blob store
+    when it holds content_sha256, else from the row's BYTEA column `blob`.
+    size is the row's file_size_bytes; when missing it is measured.
+    """
+    path = blob_store.blob_path(content_sha256) if blob_store.exists(content_sha256) else None
+    if path is not None:
+        size = os.path.getsize(path)
+    elif size is None:
+        db = SessionLocal()
+        try:
+            size = db.query(func.length(blob)).filter(pk == row_id).scalar() or 0
+        finally:
+            db.close()
+    if not size:
+        raise HTTPException(status_code=404, detail="No binary data stored for this file.")
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+    }
+    etag = f'"{content_sha256}"' if content_sha256 else None
+    if etag:
+        headers["ETag"] = etag
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+    # If-Range: only honour Range when the client's copy is still current
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or (etag is not None and if_range.strip() == etag):
+        byte_range = _byte_range(request.headers.get("range"), size)
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    body = _iter_file(path, start, end) if path else _iter_blob(blob, pk, row_id, start, end)
+    return StreamingResponse(
+        body,
+        status_code=status_code,
+        media_type=media_type or "application/octet-stream",
+        headers=headers,
+    )
@@ -0,0 +1,83 @@
+"""
+api/pagination.py
+─────────────────
+Keyset (cursor) pagination shared by the list endpoints.
+
+Rows are ordered newest first by (timestamp, id), and a page is fetched with
+`WHERE (timestamp, id) < (cursor)` against the matching composite index, so
+page N costs the same as page 1 however deep it is. Every list endpoint
+answers with the same envelope:
+
+    {"items": [...], "next_cursor": "<opaque token>" | null}
+
+Pass next_cursor back as ?cursor= for the following page; null means there
+are no more rows.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import json
+from typing import Callable, Generic, List, Optional, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(timestamp: datetime.datetime | None, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime | None, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return (datetime.datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def keyset_page(
+    query,
+    timestamp_column,
+    id_column,
+    cursor: str | None,
+    limit: int,
+    key: Callable[[object], tuple[datetime.datetime | None, int]],
+) -> tuple[list, str | None]:
+    """
+    One page of `query`, newest first by (timestamp_column, id_column).
+    key(row) returns the (timestamp, id) of a result row, for the cursor.
+    Returns (rows, next_cursor).
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        if timestamp is None:
+            # PostgreSQL sorts NULLs first under DESC: the rest of the
+            # NULL-timestamp rows, then every row that has one
+            query = query.filter(
+                (timestamp_column.is_(None) & (id_column < row_id))
+                | timestamp_column.isnot(None)
+            )
+        else:
+            query = query.filter(tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id))
+    rows = (
+        # Plain DESC on both keys: a backward scan of the (timestamp, id) index
+        query.order_by(timestamp_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,121 @@
+"""
+api/query_log_writer.py
+───────────────────────
+Buffered, batched writer for query_logs.
+
+/query hands its QueryLog row to log() and returns without waiting for
+PostgreSQL: rows collect in a bounded in-process queue and a background
+task writes them with one multi-row INSERT and one commit per batch —
+as soon as QUERY_LOG_BATCH_SIZE rows are waiting, or QUERY_LOG_FLUSH_SECONDS
+after the first of them arrived. When the queue is full (the database is
+down or far behind) new rows are dropped and counted rather than slowing
+queries down. main.py starts the writer on startup and drains it on
+shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+from sqlalchemy import insert
+
+from config.postgres import AsyncSessionLocal, QueryLog
+from config.settings import settings
+
+_STOP = object()
+
+
+class QueryLogWriter:
+    def __init__(self, queue_size: int, batch_size: int, flush_seconds: float):
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._flush_seconds = flush_seconds
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the flush task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def log(self, **fields) -> None:
+        """Queue one QueryLog row (column=value); never blocks."""
+        if self._task is None:
+            self.dropped += 1
+            return
+        fields.setdefault("queried_at", datetime.datetime.utcnow())
+        try:
+            self._queue.put_nowait(fields)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+    # ── Flushing ──────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            deadline = loop.time() + self._flush_seconds
+            stopping = False
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: list[dict]) -> None:
+        try:
+            # executemany of one INSERT → a single multi-row INSERT … VALUES
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(QueryLog), batch)
+                await db.commit()
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error writing {len(batch)} query logs: {e}")
+            return
+        self.written += len(batch)
+        self.flushes += 1
+
+
+query_log_writer = QueryLogWriter(
+    queue_size=settings.QUERY_LOG_QUEUE_SIZE,
+    batch_size=settings.QUERY_LOG_BATCH_SIZE,
+    flush_seconds=settings.QUERY_LOG_FLUSH_SECONDS,
+)
@@ -4,22 +4,40 @@ api/routes.py
 FastAPI route definitions.
 
 New endpoints added (PostgreSQL-backed):
-  POST /api/upload              – Accept file upload from frontend, store + ingest
+  POST /api/upload              – Accept file upload from frontend, queue for ingestion (202)
+  GET  /api/jobs                – Recent ingestion jobs
+  GET  /api/jobs/{job_id}       – State / progress of a single ingestion job
   GET  /api/files               – List ingested files (with filters)
-  GET  /api/files/{file_id}     – Detail for a single ingested file
+  GET  /api/files/{file_id}     – Detail for a single ingested file (with ingest_metrics)
+  GET  /api/case-files/{file_id} – Detail for a single case file (with ingest_metrics)
+  GET  /api/ingestion-metrics   – p50 / p95 / p99 per ingestion stage over a time window
   GET  /api/cases/pg            – List case records from PostgreSQL
   GET  /api/query-logs          – Recent query logs
+  GET  /api/query-logs/writer   – Buffered query log writer counters (queued / written / dropped)
+  GET  /api/query-stats         – Hourly / daily query aggregates (from the rollup tables)
+  GET  /api/embedding-cache     – Embedding cache hit/miss counters
+  GET  /api/query-embedding-cache – Query embedding cache hit ratio
+
+List endpoints return {"items": [...], "next_cursor": ...} pages, newest
+first; pass next_cursor back as ?cursor= (keyset pagination, api/pagination.py).
+
+File downloads (…/download) are streamed from the blob store in slices,
+with Range and ETag support; see api/downloads.py.
 """
 
 import os
 import json
 import datetime
+import hashlib
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from fastapi.responses import Response, StreamingResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from orchestrator import RAGOrchestrator
 from analytics_orchestrator import AnalyticsOrchestrator
@@ -27,9 +45,12 @@ from config.database import db_client
 from config.settings import settings
 from config.postgres import (
     get_db,
+    get_async_db,
     IngestedFile,
     CaseRecord,
     QueryLog,
+    QueryLogHourly,
+    QueryLogDaily,
     IngestionStatus,
     TargetDB,
     FileType,
@@ -41,12 +62,46 @@ from config.postgres import (
     ChatSessionRecord,
     ChatMessageRecord,
     AnalyticsCache,
+    IngestionJob,
+    JobType,
 )
-from ingest_cli import ingest_file, ingest_case_file, DB_MAPPING, SUPPORTED_EXTENSIONS, MIME_MAP
+from api.downloads import blob_response
+from api.pagination import Page, keyset_page
+from api.query_log_writer import query_log_writer
+from ingestion import blob_store, job_queue
+from ingestion.embedding_cache import embedding_cache
+from retrieval.query_cache import query_embedding_cache
+from ingestion import ingest_metrics
+from ingest_cli import DB_MAPPING, SUPPORTED_EXTENSIONS, MIME_MAP
 
 router = APIRouter()
 
 
+def _count(child_fk, parent_pk):
+    """
+    Correlated COUNT(*) of the rows whose child_fk points at parent_pk, as a
+    column of the parent's query: one statement however many parents are
+    listed, and no child rows (or their blobs) are loaded.
+    """
+    return select(func.count()).where(child_fk == parent_pk).scalar_subquery()
+
+# Uploads are read (and hashed) in pieces of this size
+UPLOAD_READ_CHUNK = 1 << 20
+
+
+async def _read_upload(file: UploadFile) -> tuple[bytes, str]:
+    """Read an upload, hashing it as it streams in. Returns (bytes, sha256 hex)."""
+    digest = hashlib.sha256()
+    buf = bytearray()
+    while True:
+        piece = await file.read(UPLOAD_READ_CHUNK)
+        if not piece:
+            break
+        digest.update(piece)
+        buf += piece
+    return bytes(buf), digest.hexdigest()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Pydantic schemas
 # ──────────────────────────────────────────────────────────────────────────────
@@ -74,6 +129,7 @@ class FileOut(BaseModel):
     uploaded_at: datetime.datetime
     ingested_at: Optional[datetime.datetime]
     case_id: Optional[str]
+    ingest_metrics: Optional[dict] = None   # detail endpoint only
 
     class Config:
         from_attributes = True
@@ -141,6 +197,7 @@ class CaseFileOut(BaseModel):
     error_message: Optional[str]
     uploaded_at: datetime.datetime
     ingested_at: Optional[datetime.datetime]
+    ingest_metrics: Optional[dict] = None   # detail endpoint only
 
     class Config:
         from_attributes = True
@@ -175,13 +232,13 @@ class LawOut(BaseModel):
 # ──────────────────────────────────────────────────────────────────────────────
 
 @router.post("/query")
-async def query_rag(request: QueryRequest, db: Session = Depends(get_db)):
+async def query_rag(request: QueryRequest):
     try:
-        result = RAGOrchestrator.process_query(request.query, request.databases, request.case_id)
+        result = await RAGOrchestrator.process_query(request.query, request.databases, request.case_id)
 
-        # Persist query log
+        # Persist query log (buffered; written in batches off the response path)
         eval_data = result.get("evaluation_metrics", {})
-        log = QueryLog(
+        query_log_writer.log(
             query_text=request.query,
             databases_queried=",".join(request.databases or []),
             answer_text=result.get("answer", ""),
@@ -190,8 +247,6 @@ async def query_rag(request: QueryRequest, db: Session = Depends(get_db)):
             is_helpful=eval_data.get("is_helpful") if eval_data else None,
             num_sources=len(result.get("sources", [])),
         )
-        db.add(log)
-        db.commit()
 
         return result
     except Exception as e:
@@ -199,7 +254,7 @@ async def query_rag(request: QueryRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/cases")
-async def list_cases_chroma():
+def list_cases_chroma():
     """Legacy endpoint — lists case IDs from ChromaDB metadata."""
     try:
         client_db = db_client.get_client_db()
@@ -217,21 +272,29 @@ async def list_cases_chroma():
 # File upload endpoint
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.post("/upload", summary="Upload a file from the frontend and ingest it")
+@router.post("/upload", status_code=202, summary="Upload a file from the frontend and queue it for ingestion")
 async def upload_and_ingest(
     file: UploadFile = File(...),
     db_target: str = Form(..., description="One of: law, cases, client"),
     case_id: Optional[str] = Form(None, description="Required when db_target='client'"),
     overwrite: bool = Form(False, description="Re-ingest if already processed"),
-    db: Session = Depends(get_db),
+    replaces_file_id: Optional[int] = Form(None, description="The ingested file this upload is a new version of"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Accepts a file upload from the frontend and runs it through the unified
-    ingest_file() pipeline which:
-      1. Duplicate-checks against PostgreSQL
-      2. Saves the file to FILE_STORAGE_DIR/<db>/<case_id>/
-      3. Stores the raw bytes in PostgreSQL BYTEA
+    Accepts a file upload from the frontend and queues it for the unified
+    ingest_file() pipeline, which an ingest_worker process then runs:
+      1. Duplicate-checks against PostgreSQL (by content SHA-256)
+      2. Stores the bytes once in the content-addressed blob store
+      3. Registers the file in PostgreSQL by its content hash
       4. Parses, chunks, embeds → ChromaDB
+
+    An amended document names the file it replaces (replaces_file_id, or
+    overwrite=True for the latest one of the same filename): it is ingested
+    on that row, under the same doc_id, so only chunks whose text changed
+    are embedded and the superseded ones are deleted.
+
+    Returns 202 with a job_id immediately; poll GET /api/jobs/{job_id}.
     """
     # ── Validate inputs ───────────────────────────────────────────────────────
     if db_target not in DB_MAPPING:
@@ -248,54 +311,88 @@ async def upload_and_ingest(
             detail=f"Unsupported file type '{ext}'. Allowed: {SUPPORTED_EXTENSIONS}",
         )
 
-    # ── Read upload bytes once ────────────────────────────────────────────────
+    # ── Read upload bytes once, hashing as they stream in ─────────────────────
     try:
-        file_bytes = await file.read()
+        file_bytes, content_sha256 = await _read_upload(file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read upload: {e}")
 
-    # ── Hand off to unified pipeline ──────────────────────────────────────────
-    #    ingest_file() handles everything:
-    #      duplicate check → disk save → PostgreSQL BYTEA → parse → embed
-    result = ingest_file(
-        original_filename=filename,
-        target_db_key=db_target,
-        file_bytes=file_bytes,      # bytes from HTTP upload stored in BYTEA
-        case_id=case_id,
-        overwrite=overwrite,
-    )
+    payload = {
+        "original_filename": filename,
+        "target_db_key": db_target,
+        "case_id": case_id,
+        "overwrite": overwrite,
+        "content_sha256": content_sha256,
+    }
+    if replaces_file_id is not None:
+        await _check_replaced_file(db, replaces_file_id, db_target, case_id)
+        # ingest_file() re-ingests this row in place
+        payload["file_id"] = replaces_file_id
 
-    if result["skipped"]:
-        return {
-            "status": "skipped",
-            "detail": f"'{filename}' was already ingested. Use overwrite=true to force.",
-        }
+    # ── Hand off to the ingestion queue (awaited on asyncpg) ─────────────────
+    job = await job_queue.aenqueue(db, JobType.ingest_file, payload=payload, file_data=file_bytes)
 
-    if result["success"]:
-        return {
-            "status": "success",
-            "file_id": result["file_id"],
-            "filename": filename,
-            "chunks": result["chunks"],
-        }
+    return {
+        "status": "queued",
+        "job_id": job.id,
+        "filename": filename,
+    }
 
-    raise HTTPException(status_code=500, detail=f"Ingestion failed: {result['error']}")
+
+async def _check_replaced_file(db: AsyncSession, file_id: int, db_target: str, case_id: Optional[str]) -> None:
+    """404 unless file_id is an ingested file of this target DB (and client case)."""
+    row = (await db.execute(
+        select(IngestedFile.target_db, CaseRecord.case_id)
+        .outerjoin(CaseRecord, IngestedFile.case_record_id == CaseRecord.id)
+        .where(IngestedFile.id == file_id)
+    )).first()
+    if row is None or row.target_db != DB_MAPPING[db_target][1] or row.case_id != (case_id or None):
+        raise HTTPException(status_code=404, detail=f"File {file_id} not found in '{db_target}'.")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ingestion jobs
+# ──────────────────────────────────────────────────────────────────────────────
+
+@router.get("/jobs", summary="Recent ingestion jobs")
+def list_jobs(
+    state: Optional[str] = Query(None, description="Filter by state: queued/running/succeeded/failed"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    q = db.query(IngestionJob)
+    if state:
+        q = q.filter(IngestionJob.state == state)
+    jobs, next_cursor = keyset_page(
+        q, IngestionJob.created_at, IngestionJob.id, cursor, limit,
+        key=lambda j: (j.created_at, j.id),
+    )
+    return {"items": [job_queue.job_status(j) for j in jobs], "next_cursor": next_cursor}
+
+
+@router.get("/jobs/{job_id}", summary="Ingestion job state and progress")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job_queue.job_status(job)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # File listing / detail
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/files", response_model=List[FileOut], summary="List ingested files")
+@router.get("/files", response_model=Page[FileOut], summary="List ingested files")
 def list_files(
     status: Optional[str] = Query(None, description="Filter by status: pending/processing/success/failed"),
     db_target: Optional[str] = Query(None, description="Filter by target DB: law/cases/client"),
     case_id: Optional[str] = Query(None, description="Filter by client case ID"),
-    limit: int = Query(50, le=200),
-    offset: int = Query(0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    q = db.query(IngestedFile)
+    q = db.query(IngestedFile).options(joinedload(IngestedFile.case))
     if status:
         q = q.filter(IngestedFile.status == status)
     if db_target:
@@ -303,7 +400,10 @@ def list_files(
     if case_id:
         q = q.join(CaseRecord).filter(CaseRecord.case_id == case_id)
 
-    rows = q.order_by(IngestedFile.uploaded_at.desc()).offset(offset).limit(limit).all()
+    rows, next_cursor = keyset_page(
+        q, IngestedFile.uploaded_at, IngestedFile.id, cursor, limit,
+        key=lambda r: (r.uploaded_at, r.id),
+    )
 
     out = []
     for r in rows:
@@ -320,7 +420,7 @@ def list_files(
             ingested_at=r.ingested_at,
             case_id=r.case.case_id if r.case else None,
         ))
-    return out
+    return {"items": out, "next_cursor": next_cursor}
 
 
 @router.get("/files/{file_id}", response_model=FileOut, summary="Get a single file record")
@@ -340,6 +440,7 @@ def get_file(file_id: int, db: Session = Depends(get_db)):
         uploaded_at=r.uploaded_at,
         ingested_at=r.ingested_at,
         case_id=r.case.case_id if r.case else None,
+        ingest_metrics=r.ingest_metrics,
     )
 
 
@@ -347,19 +448,28 @@ def get_file(file_id: int, db: Session = Depends(get_db)):
 # Case records (PostgreSQL-backed)
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/cases/pg", response_model=List[CaseOut], summary="List case records from PostgreSQL")
-def list_cases_pg(db: Session = Depends(get_db)):
-    cases = db.query(CaseRecord).order_by(CaseRecord.created_at.desc()).all()
-    return [
+@router.get("/cases/pg", response_model=Page[CaseOut], summary="List case records from PostgreSQL")
+def list_cases_pg(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    rows, next_cursor = keyset_page(
+        db.query(CaseRecord, _count(IngestedFile.case_record_id, CaseRecord.id)),
+        CaseRecord.created_at, CaseRecord.id, cursor, limit,
+        key=lambda row: (row[0].created_at, row[0].id),
+    )
+    items = [
         CaseOut(
             id=c.id,
             case_id=c.case_id,
             description=c.description,
             created_at=c.created_at,
-            file_count=len(c.files),
+            file_count=file_count,
         )
-        for c in cases
+        for c, file_count in rows
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -368,11 +478,15 @@ def list_cases_pg(db: Session = Depends(get_db)):
 
 @router.get("/query-logs", summary="Recent RAG query logs")
 def get_query_logs(
-    limit: int = Query(20, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    logs = db.query(QueryLog).order_by(QueryLog.queried_at.desc()).limit(limit).all()
-    return [
+    logs, next_cursor = keyset_page(
+        db.query(QueryLog), QueryLog.queried_at, QueryLog.id, cursor, limit,
+        key=lambda l: (l.queried_at, l.id),
+    )
+    items = [
         {
             "id": l.id,
             "query": l.query_text,
@@ -385,35 +499,134 @@ def get_query_logs(
         }
         for l in logs
     ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/query-logs/writer", summary="Buffered query log writer statistics")
+def get_query_log_writer_stats():
+    return query_log_writer.stats()
+
+
+@router.get("/query-stats", summary="Query volume, confidence and eval scores over time")
+def get_query_stats(
+    granularity: str = Query("hour", description="hour / day"),
+    since: Optional[datetime.datetime] = Query(None, description="UTC; default: 48 hours / 90 days ago"),
+    until: Optional[datetime.datetime] = Query(None, description="UTC; default: now"),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-bucket and total aggregates for dashboards, read from the
+    query_log_hourly / query_log_daily rollups only (never query_logs).
+    They trail the logs by up to QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS.
+    """
+    rollups = {"hour": (QueryLogHourly, 48), "day": (QueryLogDaily, 90 * 24)}
+    if granularity not in rollups:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'.")
+    model, default_hours = rollups[granularity]
+    until = until or datetime.datetime.utcnow()
+    since = since or until - datetime.timedelta(hours=default_hours)
+
+    rows = (
+        db.query(model)
+        .filter(model.bucket >= since, model.bucket < until)
+        .order_by(model.bucket)
+        .all()
+    )
+
+    def summarize(query_count, high, low, helpful, score_sum, score_count, sources_sum) -> dict:
+        return {
+            "query_count": query_count,
+            "high_confidence_rate": high / query_count if query_count else None,
+            "low_confidence_rate": low / query_count if query_count else None,
+            "helpful_rate": helpful / score_count if score_count else None,
+            "avg_eval_score": score_sum / score_count if score_count else None,
+            "avg_sources": sources_sum / query_count if query_count else None,
+        }
+
+    def counts(r) -> tuple:
+        return (
+            r.query_count, r.high_confidence_count, r.low_confidence_count, r.helpful_count,
+            r.eval_score_sum, r.eval_score_count, r.num_sources_sum,
+        )
+
+    totals = [sum(column) for column in zip(*map(counts, rows))] or [0] * 7
+    return {
+        "granularity": granularity,
+        "since": since,
+        "until": until,
+        "buckets": [{"bucket": r.bucket, **summarize(*counts(r))} for r in rows],
+        "totals": summarize(*totals),
+    }
+
+
+@router.get("/embedding-cache", summary="Embedding cache statistics")
+def get_embedding_cache_stats():
+    return embedding_cache.stats()
+
+
+@router.get("/query-embedding-cache", summary="Query embedding cache statistics")
+def get_query_embedding_cache_stats():
+    return query_embedding_cache.stats()
+
+
+@router.get("/ingestion-metrics", summary="Ingestion stage latency percentiles")
+def get_ingestion_metrics(
+    hours: float = Query(24, gt=0, le=24 * 90, description="Window: files uploaded in the last N hours"),
+    source: str = Query("all", description="all / files (ingested_files) / case_files (case_file_table)"),
+    db_target: Optional[str] = Query(None, description="Filter ingested_files by target DB: law/cases/client"),
+    db: Session = Depends(get_db),
+):
+    """
+    p50 / p95 / p99 / max wall time per pipeline stage (and total, peak
+    memory, bytes parsed, embedding throughput) over every file whose
+    ingestion recorded metrics in the window. Failed files are included;
+    "failed" counts them.
+    """
+    if source not in ("all", "files", "case_files"):
+        raise HTTPException(status_code=400, detail="source must be one of: all, files, case_files.")
+    since = datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
+
+    records = []
+    if source in ("all", "files"):
+        q = db.query(IngestedFile.ingest_metrics).filter(
+            IngestedFile.ingest_metrics.isnot(None),
+            IngestedFile.uploaded_at >= since,
+        )
+        if db_target:
+            q = q.filter(IngestedFile.target_db == db_target)
+        records += [row[0] for row in q]
+    if source in ("all", "case_files") and not db_target:
+        q = db.query(CaseFile.ingest_metrics).filter(
+            CaseFile.ingest_metrics.isnot(None),
+            CaseFile.uploaded_at >= since,
+        )
+        records += [row[0] for row in q]
+
+    return {"since": since, "source": source, **ingest_metrics.summarize(records)}
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# File download — serve the raw bytes stored in PostgreSQL BYTEA
+# File download — serve the raw bytes from the blob store
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/files/{file_id}/download", summary="Download original file from PostgreSQL")
-def download_file(file_id: int, db: Session = Depends(get_db)):
+@router.get("/files/{file_id}/download", summary="Download original file")
+def download_file(file_id: int, request: Request, db: Session = Depends(get_db)):
     """
-    Streams the original file bytes stored in the BYTEA column back to the client.
+    Streams the original file bytes from the blob store (or a legacy BYTEA
+    column not yet migrated) back to the client,
+    with Range / If-None-Match support (see api/downloads.py).
     The Content-Disposition header causes most browsers to prompt a Save dialog.
     """
     row = db.query(IngestedFile).filter(IngestedFile.id == file_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="File not found.")
 
-    if not row.file_data:
-        raise HTTPException(status_code=404, detail="No binary data stored for this file.")
-
-    mime = row.mime_type or "application/octet-stream"
-    filename = row.original_filename or f"file_{file_id}"
-
-    return Response(
-        content=row.file_data,
-        media_type=mime,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Length": str(len(row.file_data)),
-        },
+    return blob_response(
+        request, IngestedFile.file_data, IngestedFile.id, file_id,
+        size=row.file_size_bytes,
+        content_sha256=row.content_sha256,
+        filename=row.original_filename or f"file_{file_id}",
+        media_type=row.mime_type,
     )
 
 
@@ -425,21 +638,30 @@ def download_file(file_id: int, db: Session = Depends(get_db)):
 # Client endpoints
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/clients", response_model=List[ClientOut], summary="List all clients")
-def list_clients(db: Session = Depends(get_db)):
-    """Returns all client IDs for the frontend dropdown/selection."""
-    clients = db.query(Client).order_by(Client.created_at.desc()).all()
-    return [
+@router.get("/clients", response_model=Page[ClientOut], summary="List all clients")
+def list_clients(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Returns client IDs for the frontend dropdown/selection, newest first."""
+    rows, next_cursor = keyset_page(
+        db.query(Client, _count(Case.client_id, Client.client_id)),
+        Client.created_at, Client.client_id, cursor, limit,
+        key=lambda row: (row[0].created_at, row[0].client_id),
+    )
+    items = [
         ClientOut(
             client_id=c.client_id,
             client_name=c.client_name,
             phone=c.phone,
             address=c.address,
             created_at=c.created_at,
-            case_count=len(c.cases),
+            case_count=case_count,
         )
-        for c in clients
+        for c, case_count in rows
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.post("/clients", response_model=ClientOut, summary="Create a new client")
@@ -466,16 +688,21 @@ def create_client(client_data: ClientCreate, db: Session = Depends(get_db)):
 @router.get("/clients/{client_id}", response_model=ClientOut, summary="Get a single client")
 def get_client(client_id: int, db: Session = Depends(get_db)):
     """Get details of a specific client."""
-    client = db.query(Client).filter(Client.client_id == client_id).first()
-    if not client:
+    row = (
+        db.query(Client, _count(Case.client_id, Client.client_id))
+        .filter(Client.client_id == client_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Client not found.")
+    client, case_count = row
     return ClientOut(
         client_id=client.client_id,
         client_name=client.client_name,
         phone=client.phone,
         address=client.address,
         created_at=client.created_at,
-        case_count=len(client.cases),
+        case_count=case_count,
     )
 
 
@@ -483,24 +710,34 @@ def get_client(client_id: int, db: Session = Depends(get_db)):
 # Case endpoints (linked to clients)
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/clients/{client_id}/cases", response_model=List[CaseNewOut], summary="List cases for a client")
-def list_cases_for_client(client_id: int, db: Session = Depends(get_db)):
-    """Returns all cases for a specific client."""
-    client = db.query(Client).filter(Client.client_id == client_id).first()
-    if not client:
+@router.get("/clients/{client_id}/cases", response_model=Page[CaseNewOut], summary="List cases for a client")
+def list_cases_for_client(
+    client_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Returns the cases of a specific client, newest first."""
+    if not db.query(Client.client_id).filter(Client.client_id == client_id).first():
         raise HTTPException(status_code=404, detail="Client not found.")
-    
-    return [
+
+    rows, next_cursor = keyset_page(
+        db.query(Case, _count(CaseFile.case_id, Case.case_id)).filter(Case.client_id == client_id),
+        Case.created_at, Case.case_id, cursor, limit,
+        key=lambda row: (row[0].created_at, row[0].case_id),
+    )
+    items = [
         CaseNewOut(
             case_id=case.case_id,
             client_id=case.client_id,
             description=case.description,
             created_at=case.created_at,
             updated_at=case.updated_at,
-            file_count=len(case.files),
+            file_count=file_count,
         )
-        for case in client.cases
+        for case, file_count in rows
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.post("/clients/{client_id}/cases", response_model=CaseNewOut, summary="Create a case for a client")
@@ -530,16 +767,21 @@ def create_case_for_client(client_id: int, case_data: CaseCreate, db: Session =
 @router.get("/cases-new/{case_id}", response_model=CaseNewOut, summary="Get a specific case")
 def get_case(case_id: int, db: Session = Depends(get_db)):
     """Get details of a specific case."""
-    case = db.query(Case).filter(Case.case_id == case_id).first()
-    if not case:
+    row = (
+        db.query(Case, _count(CaseFile.case_id, Case.case_id))
+        .filter(Case.case_id == case_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Case not found.")
+    case, file_count = row
     return CaseNewOut(
         case_id=case.case_id,
         client_id=case.client_id,
         description=case.description,
         created_at=case.created_at,
         updated_at=case.updated_at,
-        file_count=len(case.files),
+        file_count=file_count,
     )
 
 
@@ -547,14 +789,23 @@ def get_case(case_id: int, db: Session = Depends(get_db)):
 # Case Files endpoints (files for a specific case)
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/cases-new/{case_id}/files", response_model=List[CaseFileOut], summary="List files for a case")
-def list_files_for_case(case_id: int, db: Session = Depends(get_db)):
-    """Returns all files associated with a specific case."""
-    case = db.query(Case).filter(Case.case_id == case_id).first()
-    if not case:
+@router.get("/cases-new/{case_id}/files", response_model=Page[CaseFileOut], summary="List files for a case")
+def list_files_for_case(
+    case_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Returns the files of a specific case, newest first."""
+    if not db.query(Case.case_id).filter(Case.case_id == case_id).first():
         raise HTTPException(status_code=404, detail="Case not found.")
-    
-    return [
+
+    files, next_cursor = keyset_page(
+        db.query(CaseFile).filter(CaseFile.case_id == case_id),
+        CaseFile.uploaded_at, CaseFile.file_id, cursor, limit,
+        key=lambda f: (f.uploaded_at, f.file_id),
+    )
+    items = [
         CaseFileOut(
             file_id=f.file_id,
             case_id=f.case_id,
@@ -568,27 +819,45 @@ def list_files_for_case(case_id: int, db: Session = Depends(get_db)):
             uploaded_at=f.uploaded_at,
             ingested_at=f.ingested_at,
         )
-        for f in case.files
+        for f in files
     ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/case-files/{file_id}", response_model=CaseFileOut, summary="Get a single case file record")
+def get_case_file(file_id: int, db: Session = Depends(get_db)):
+    f = db.query(CaseFile).filter(CaseFile.file_id == file_id).first()
+    if not f:
+        raise HTTPException(status_code=404, detail="File not found.")
+    return CaseFileOut(
+        file_id=f.file_id,
+        case_id=f.case_id,
+        filename=f.filename,
+        extension=f.extension,
+        mime_type=f.mime_type,
+        file_size_bytes=f.file_size_bytes,
+        status=f.status.value if hasattr(f.status, "value") else str(f.status),
+        chunk_count=f.chunk_count,
+        error_message=f.error_message,
+        uploaded_at=f.uploaded_at,
+        ingested_at=f.ingested_at,
+        ingest_metrics=f.ingest_metrics,
+    )
 
 
 @router.get("/case-files/{file_id}/download", summary="Download a case file")
-def download_case_file(file_id: int, db: Session = Depends(get_db)):
-    """Download the original file from case_file_table."""
+def download_case_file(file_id: int, request: Request, db: Session = Depends(get_db)):
+    """Stream the original file from case_file_table."""
     row = db.query(CaseFile).filter(CaseFile.file_id == file_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="File not found.")
-    if not row.file:
-        raise HTTPException(status_code=404, detail="No binary data stored for this file.")
-    
-    mime = row.mime_type or "application/octet-stream"
-    return Response(
-        content=row.file,
-        media_type=mime,
-        headers={
-            "Content-Disposition": f'attachment; filename="{row.filename}"',
-            "Content-Length": str(len(row.file)),
-        },
+
+    return blob_response(
+        request, CaseFile.file, CaseFile.file_id, file_id,
+        size=row.file_size_bytes,
+        content_sha256=row.content_sha256,
+        filename=row.filename,
+        media_type=row.mime_type,
     )
 
 
@@ -596,11 +865,18 @@ def download_case_file(file_id: int, db: Session = Depends(get_db)):
 # Past Cases endpoints (historical reference - no ingestion)
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/past-cases", response_model=List[PastCaseOut], summary="List all past cases")
-def list_past_cases(db: Session = Depends(get_db)):
-    """Returns all historical/reference case documents."""
-    past_cases = db.query(PastCase).order_by(PastCase.uploaded_at.desc()).all()
-    return [
+@router.get("/past-cases", response_model=Page[PastCaseOut], summary="List all past cases")
+def list_past_cases(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Returns historical/reference case documents, newest first."""
+    past_cases, next_cursor = keyset_page(
+        db.query(PastCase), PastCase.uploaded_at, PastCase.past_case_id, cursor, limit,
+        key=lambda pc: (pc.uploaded_at, pc.past_case_id),
+    )
+    items = [
         PastCaseOut(
             past_case_id=pc.past_case_id,
             case_name=pc.case_name,
@@ -611,26 +887,22 @@ def list_past_cases(db: Session = Depends(get_db)):
         )
         for pc in past_cases
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/past-cases/{past_case_id}/download", summary="Download a past case file")
-def download_past_case(past_case_id: int, db: Session = Depends(get_db)):
-    """Download the original file from past_case_table."""
+def download_past_case(past_case_id: int, request: Request, db: Session = Depends(get_db)):
+    """Stream the original file from past_case_table."""
     row = db.query(PastCase).filter(PastCase.past_case_id == past_case_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Past case not found.")
-    if not row.case_file:
-        raise HTTPException(status_code=404, detail="No binary data stored for this past case.")
-    
-    mime = row.mime_type or "application/octet-stream"
-    filename = row.filename or f"past_case_{past_case_id}"
-    return Response(
-        content=row.case_file,
-        media_type=mime,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Length": str(len(row.case_file)),
-        },
+
+    return blob_response(
+        request, PastCase.case_file, PastCase.past_case_id, past_case_id,
+        size=row.file_size_bytes,
+        content_sha256=row.content_sha256,
+        filename=row.filename or f"past_case_{past_case_id}",
+        media_type=row.mime_type,
     )
 
 
@@ -638,11 +910,18 @@ def download_past_case(past_case_id: int, db: Session = Depends(get_db)):
 # Law endpoints (constitution/law reference - no ingestion)
 # ──────────────────────────────────────────────────────────────────────────────
 
-@router.get("/laws", response_model=List[LawOut], summary="List all law documents")
-def list_laws(db: Session = Depends(get_db)):
-    """Returns all law/constitution reference documents."""
-    laws = db.query(Law).order_by(Law.uploaded_at.desc()).all()
-    return [
+@router.get("/laws", response_model=Page[LawOut], summary="List all law documents")
+def list_laws(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Returns law/constitution reference documents, newest first."""
+    laws, next_cursor = keyset_page(
+        db.query(Law), Law.uploaded_at, Law.id, cursor, limit,
+        key=lambda law: (law.uploaded_at, law.id),
+    )
+    items = [
         LawOut(
             id=law.id,
             law_of_country=law.law_of_country,
@@ -653,26 +932,22 @@ def list_laws(db: Session = Depends(get_db)):
         )
         for law in laws
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/laws/{law_id}/download", summary="Download a law document")
-def download_law(law_id: int, db: Session = Depends(get_db)):
-    """Download the original file from law_table."""
+def download_law(law_id: int, request: Request, db: Session = Depends(get_db)):
+    """Stream the original file from law_table."""
     row = db.query(Law).filter(Law.id == law_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Law document not found.")
-    if not row.constitution_file:
-        raise HTTPException(status_code=404, detail="No binary data stored for this law document.")
-    
-    mime = row.mime_type or "application/octet-stream"
-    filename = row.filename or f"law_{law_id}"
-    return Response(
-        content=row.constitution_file,
-        media_type=mime,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Length": str(len(row.constitution_file)),
-        },
+
+    return blob_response(
+        request, Law.constitution_file, Law.id, law_id,
+        size=row.file_size_bytes,
+        content_sha256=row.content_sha256,
+        filename=row.filename or f"law_{law_id}",
+        media_type=row.mime_type,
     )
 
 
@@ -687,14 +962,26 @@ async def upload_file_by_type(
     case_id: Optional[int] = Form(None, description="Required when file_type='case_file'"),
     case_name: Optional[str] = Form(None, description="Required when file_type='past_case'"),
     law_of_country: Optional[str] = Form(None, description="Required when file_type='law'"),
+    replaces_file_id: Optional[int] = Form(None, description="case_file: the case file this upload is a new version of"),
+    overwrite: bool = Form(False, description="case_file: replace the latest file of the same name in the case"),
     db: Session = Depends(get_db),
 ):
     """
     Unified file upload endpoint that handles three file types differently:
     
-    - case_file: Stored in case_file_table + runs ingestion pipeline (ChromaDB)
+    - case_file: Stored in case_file_table + queued for ingestion (202 + job_id)
     - past_case: Stored in past_case_table only (NO ingestion)
     - law: Stored in law_table only (NO ingestion)
+
+    Files whose SHA-256 matches one already stored (per case for case_file)
+    are not stored again; the response has status "skipped" and the
+    existing row's id. A case file whose earlier ingestion failed or never
+    finished is queued again on its existing row instead.
+
+    An amended case file names the file it replaces — replaces_file_id, or
+    overwrite=True for the latest one of the same filename. The new version
+    is ingested on that row, under the same doc_id: only chunks whose text
+    changed are embedded, and the superseded ones are deleted.
     """
     # Validate file_type
     valid_types = ["case_file", "past_case", "law"]
@@ -722,12 +1009,63 @@ async def upload_file_by_type(
             detail=f"Unsupported file type '{ext}'. Allowed: {SUPPORTED_EXTENSIONS}",
         )
     
-    # Read file bytes
+    # Read file bytes, hashing as they stream in
     try:
-        file_bytes = await file.read()
+        file_bytes, content_sha256 = await _read_upload(file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read upload: {e}")
     
+    # Storing is sync (SQLAlchemy session, blob store fsync) → worker thread
+    return await run_in_threadpool(
+        _store_typed_upload, db, file_type, filename, ext, file_bytes, content_sha256,
+        case_id, case_name, law_of_country, replaces_file_id, overwrite,
+    )
+
+
+def _replace_case_file(
+    db: Session,
+    row: CaseFile,
+    filename: str,
+    ext: str,
+    mime_type: str,
+    file_bytes: bytes,
+    content_sha256: str,
+) -> None:
+    """
+    Point a CaseFile at the bytes of its new version, moving its blob
+    reference, and reset it for ingestion. Not committed here.
+    """
+    if row.content_sha256 != content_sha256:
+        blob_store.put(db, file_bytes, content_sha256)
+        if row.content_sha256:
+            blob_store.release(db, row.content_sha256)
+    row.filename = filename
+    row.extension = ext
+    row.mime_type = mime_type
+    row.file = None
+    row.file_size_bytes = len(file_bytes)
+    row.content_sha256 = content_sha256
+    row.status = IngestionStatus.pending
+    row.error_message = None
+    row.chunk_count = None
+    row.uploaded_at = datetime.datetime.utcnow()
+    row.ingested_at = None
+
+
+def _store_typed_upload(
+    db: Session,
+    file_type: str,
+    filename: str,
+    ext: str,
+    file_bytes: bytes,
+    content_sha256: str,
+    case_id: Optional[int],
+    case_name: Optional[str],
+    law_of_country: Optional[str],
+    replaces_file_id: Optional[int] = None,
+    overwrite: bool = False,
+):
+    """Blocking half of upload_file_by_type: dedup, store and queue one upload."""
     mime_type = MIME_MAP.get(ext, "application/octet-stream")
     file_size = len(file_bytes)
     
@@ -739,59 +1077,117 @@ async def upload_file_by_type(
         case = db.query(Case).filter(Case.case_id == case_id).first()
         if not case:
             raise HTTPException(status_code=404, detail=f"Case with case_id={case_id} not found.")
-        
-        # Create CaseFile record
-        case_file = CaseFile(
-            case_id=case_id,
-            filename=filename,
-            extension=ext,
-            file=file_bytes,
-            mime_type=mime_type,
-            file_size_bytes=file_size,
-            status=IngestionStatus.pending,
-        )
-        db.add(case_file)
-        db.commit()
-        db.refresh(case_file)
-        
-        # Run ingestion pipeline
-        result = ingest_case_file(
-            file_id=case_file.file_id,
-            filename=filename,
-            file_bytes=file_bytes,
-            case_id=case_id,
-            db_session=db,
+
+        # The stored file this upload is a new version of, if any
+        previous = None
+        if replaces_file_id is not None:
+            previous = db.query(CaseFile).filter(CaseFile.file_id == replaces_file_id).first()
+            if previous is None or previous.case_id != case_id:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Case file {replaces_file_id} not found in case {case_id}.",
+                )
+        elif overwrite:
+            previous = (
+                db.query(CaseFile)
+                .filter(CaseFile.case_id == case_id, CaseFile.filename == filename)
+                .order_by(CaseFile.file_id.desc())
+                .first()
+            )
+
+        # Same bytes already ingested (on the replaced row, or anywhere in
+        # this case) → don't store or embed again
+        existing = db.query(CaseFile.file_id, CaseFile.filename).filter(
+            CaseFile.content_sha256 == content_sha256,
+            CaseFile.status == IngestionStatus.success,
         )
-        
-        if result["success"]:
-            return {
-                "status": "success",
-                "file_type": "case_file",
-                "file_id": case_file.file_id,
-                "filename": filename,
-                "chunks": result.get("chunks", 0),
-                "message": "File stored and ingested into ChromaDB",
-            }
+        if previous is not None:
+            existing = existing.filter(CaseFile.file_id == previous.file_id)
         else:
+            existing = existing.filter(CaseFile.case_id == case_id)
+        existing = existing.first()
+        if existing:
             return {
-                "status": "partial",
+                "status": "skipped",
                 "file_type": "case_file",
-                "file_id": case_file.file_id,
+                "file_id": existing.file_id,
                 "filename": filename,
-                "message": f"File stored but ingestion failed: {result.get('error')}",
+                "message": f"Identical file already stored for this case as '{existing.filename}'",
             }
+
+        if previous is not None:
+            # New version: re-ingested on the old row (same doc_id), so only
+            # changed chunks are embedded and the superseded ones deleted
+            _replace_case_file(db, previous, filename, ext, mime_type, file_bytes, content_sha256)
+            case_file = previous
+        else:
+            # Same bytes whose ingestion failed or never finished → queue that row again
+            case_file = (
+                db.query(CaseFile)
+                .filter(CaseFile.case_id == case_id, CaseFile.content_sha256 == content_sha256)
+                .order_by(CaseFile.file_id.desc())
+                .first()
+            )
+            if case_file is not None:
+                case_file.status = IngestionStatus.pending
+                case_file.error_message = None
+            else:
+                # Create CaseFile record; the bytes go to the blob store
+                blob_store.put(db, file_bytes, content_sha256)
+                case_file = CaseFile(
+                    case_id=case_id,
+                    filename=filename,
+                    extension=ext,
+                    mime_type=mime_type,
+                    file_size_bytes=file_size,
+                    content_sha256=content_sha256,
+                    status=IngestionStatus.pending,
+                )
+                db.add(case_file)
+        db.flush()
+
+        # Queue ingestion pipeline (run by ingest_worker), committed with the
+        # row: a crash in between must not leave a pending file without a job
+        job = job_queue.enqueue(
+            db, JobType.case_file, payload={"case_file_id": case_file.file_id}, commit=False,
+        )
+        db.commit()
+
+        return JSONResponse(status_code=202, content={
+            "status": "queued",
+            "file_type": "case_file",
+            "file_id": case_file.file_id,
+            "job_id": job.id,
+            "filename": filename,
+            "message": "File stored and queued for ingestion into ChromaDB",
+        })
     
     # ══════════════════════════════════════════════════════════════════════════
     # PAST_CASE: Store only (NO ingestion)
     # ══════════════════════════════════════════════════════════════════════════
     elif file_type == "past_case":
+        existing = (
+            db.query(PastCase.past_case_id, PastCase.case_name)
+            .filter(PastCase.content_sha256 == content_sha256)
+            .first()
+        )
+        if existing:
+            return {
+                "status": "skipped",
+                "file_type": "past_case",
+                "past_case_id": existing.past_case_id,
+                "filename": filename,
+                "message": f"Identical file already stored as past case '{existing.case_name}'",
+            }
+
+        blob_store.put(db, file_bytes, content_sha256)
         past_case = PastCase(
             case_name=case_name,
-            case_file=file_bytes,
             filename=filename,
             extension=ext,
             mime_type=mime_type,
             file_size_bytes=file_size,
+            content_sha256=content_sha256,
         )
         db.add(past_case)
         db.commit()
@@ -809,13 +1205,28 @@ async def upload_file_by_type(
     # LAW: Store only (NO ingestion)
     # ══════════════════════════════════════════════════════════════════════════
     elif file_type == "law":
+        existing = (
+            db.query(Law.id, Law.law_of_country)
+            .filter(Law.content_sha256 == content_sha256)
+            .first()
+        )
+        if existing:
+            return {
+                "status": "skipped",
+                "file_type": "law",
+                "law_id": existing.id,
+                "filename": filename,
+                "message": f"Identical law document already stored for '{existing.law_of_country}'",
+            }
+
+        blob_store.put(db, file_bytes, content_sha256)
         law = Law(
             law_of_country=law_of_country,
-            constitution_file=file_bytes,
             filename=filename,
             extension=ext,
             mime_type=mime_type,
             file_size_bytes=file_size,
+            content_sha256=content_sha256,
         )
         db.add(law)
         db.commit()
@@ -904,50 +1315,112 @@ class ChatSessionUpdate(BaseModel):
     messages: List[ChatMessageIn] = []
 
 
+class ChatMessagesAppend(BaseModel):
+    after_message_id: Optional[int] = None   # id of the last message the client has; None for an empty session
+    title: Optional[str] = None
+    messages: List[ChatMessageIn]
+
+
+def _message_out(m: ChatMessageRecord) -> dict:
+    return {
+        "id": m.id,
+        "role": m.role,
+        "content": m.content,
+        "ai_response_json": m.ai_response_json,
+        "created_at": m.created_at.isoformat() if m.created_at else None,
+    }
+
+
+def _md5_or_none(text: Optional[str]) -> Optional[str]:
+    """Python side of PostgreSQL's md5(text): hex digest of the UTF-8 bytes, NULL stays NULL."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest() if text is not None else None
+
+
+def _add_messages(db: Session, session_id: int, messages: List[ChatMessageIn]) -> List[ChatMessageRecord]:
+    """Insert messages in order and flush, so their ids are assigned."""
+    rows = [
+        ChatMessageRecord(
+            session_id=session_id,
+            role=msg.role,
+            content=msg.content,
+            ai_response_json=msg.ai_response_json,
+        )
+        for msg in messages
+    ]
+    db.add_all(rows)
+    db.flush()
+    return rows
+
+
 @router.get("/chat-sessions", summary="List chat sessions")
 def list_chat_sessions(
     case_id: Optional[int] = Query(None),
-    limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    q = db.query(ChatSessionRecord).order_by(ChatSessionRecord.updated_at.desc())
+    q = db.query(ChatSessionRecord, _count(ChatMessageRecord.session_id, ChatSessionRecord.id))
     if case_id is not None:
         q = q.filter(ChatSessionRecord.case_id == case_id)
-    sessions = q.limit(limit).all()
-    return [
+    rows, next_cursor = keyset_page(
+        q, ChatSessionRecord.updated_at, ChatSessionRecord.id, cursor, limit,
+        key=lambda row: (row[0].updated_at, row[0].id),
+    )
+    items = [
         {
             "id": s.id,
             "case_id": s.case_id,
             "title": s.title or "Untitled Chat",
             "created_at": s.created_at.isoformat() if s.created_at else None,
             "updated_at": s.updated_at.isoformat() if s.updated_at else None,
-            "message_count": len(s.messages_rel),
+            "message_count": message_count,
         }
-        for s in sessions
+        for s, message_count in rows
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/chat-sessions/{session_id}", summary="Get a chat session with messages")
-def get_chat_session(session_id: int, db: Session = Depends(get_db)):
+def get_chat_session(
+    session_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Return only the latest N messages"),
+    before_id: Optional[int] = Query(None, description="With limit: page back from this message id"),
+    db: Session = Depends(get_db),
+):
+    """
+    The session with its messages in order. With limit, only a page of the
+    latest messages (before before_id) is returned; has_more tells whether
+    older ones exist. last_message_id is the precondition for appending.
+    """
     s = db.query(ChatSessionRecord).filter(ChatSessionRecord.id == session_id).first()
     if not s:
         raise HTTPException(status_code=404, detail="Chat session not found.")
+
+    q = db.query(ChatMessageRecord).filter(ChatMessageRecord.session_id == session_id)
+    has_more = False
+    if limit is None:
+        messages = q.order_by(ChatMessageRecord.id).all()
+    else:
+        if before_id is not None:
+            q = q.filter(ChatMessageRecord.id < before_id)
+        page = q.order_by(ChatMessageRecord.id.desc()).limit(limit + 1).all()
+        has_more = len(page) > limit
+        messages = list(reversed(page[:limit]))
+
+    last_message_id = (
+        db.query(func.max(ChatMessageRecord.id))
+        .filter(ChatMessageRecord.session_id == session_id)
+        .scalar()
+    )
     return {
         "id": s.id,
         "case_id": s.case_id,
         "title": s.title,
         "created_at": s.created_at.isoformat() if s.created_at else None,
         "updated_at": s.updated_at.isoformat() if s.updated_at else None,
-        "messages": [
-            {
-                "id": m.id,
-                "role": m.role,
-                "content": m.content,
-                "ai_response_json": m.ai_response_json,
-                "created_at": m.created_at.isoformat() if m.created_at else None,
-            }
-            for m in s.messages_rel
-        ],
+        "last_message_id": last_message_id,
+        "has_more": has_more,
+        "messages": [_message_out(m) for m in messages],
     }
 
 
@@ -960,28 +1433,75 @@ def upsert_chat_session(data: ChatSessionCreate, db: Session = Depends(get_db)):
     db.add(session)
     db.flush()
 
-    for msg in data.messages:
-        db.add(ChatMessageRecord(
-            session_id=session.id,
-            role=msg.role,
-            content=msg.content,
-            ai_response_json=msg.ai_response_json,
-        ))
+    rows = _add_messages(db, session.id, data.messages)
     db.commit()
-    db.refresh(session)
     return {
         "id": session.id,
         "case_id": session.case_id,
         "title": session.title,
         "created_at": session.created_at.isoformat() if session.created_at else None,
         "updated_at": session.updated_at.isoformat() if session.updated_at else None,
-        "message_count": len(session.messages_rel),
+        "message_count": len(rows),
+        "last_message_id": rows[-1].id if rows else None,
+    }
+
+
+@router.post("/chat-sessions/{session_id}/messages", summary="Append new messages to a chat session")
+def append_chat_messages(session_id: int, data: ChatMessagesAppend, db: Session = Depends(get_db)):
+    """
+    Append only the messages the client added since after_message_id, which
+    must be the session's current last message id (409 otherwise, with the
+    server's last_message_id, so the client can refetch and retry). Costs
+    O(new messages) whatever the length of the conversation.
+    """
+    session = (
+        db.query(ChatSessionRecord)
+        .filter(ChatSessionRecord.id == session_id)
+        .with_for_update()
+        .first()
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Chat session not found.")
+
+    last_message_id = (
+        db.query(func.max(ChatMessageRecord.id))
+        .filter(ChatMessageRecord.session_id == session_id)
+        .scalar()
+    )
+    if data.after_message_id != last_message_id:
+        db.rollback()
+        raise HTTPException(status_code=409, detail={
+            "message": "Chat session has changed; refetch and retry.",
+            "last_message_id": last_message_id,
+        })
+
+    rows = _add_messages(db, session_id, data.messages)
+    if data.title is not None:
+        session.title = data.title
+    session.updated_at = datetime.datetime.utcnow()
+    db.commit()
+    return {
+        "id": session.id,
+        "title": session.title,
+        "updated_at": session.updated_at.isoformat() if session.updated_at else None,
+        "message_ids": [m.id for m in rows],
+        "last_message_id": rows[-1].id if rows else last_message_id,
     }
 
 
 @router.put("/chat-sessions/{session_id}", summary="Update a chat session")
 def update_chat_session(session_id: int, data: ChatSessionUpdate, db: Session = Depends(get_db)):
-    session = db.query(ChatSessionRecord).filter(ChatSessionRecord.id == session_id).first()
+    """
+    Sync the full history. When the stored messages are a prefix of it, only
+    the new tail is inserted; the history is rewritten only if it diverged.
+    Prefer POST /chat-sessions/{id}/messages, which doesn't resend history.
+    """
+    session = (
+        db.query(ChatSessionRecord)
+        .filter(ChatSessionRecord.id == session_id)
+        .with_for_update()
+        .first()
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Chat session not found.")
 
@@ -989,26 +1509,42 @@ def update_chat_session(session_id: int, data: ChatSessionUpdate, db: Session =
         session.title = data.title
     session.updated_at = datetime.datetime.utcnow()
 
-    # Replace all messages
-    for old_msg in session.messages_rel:
-        db.delete(old_msg)
-    db.flush()
-
-    for msg in data.messages:
-        db.add(ChatMessageRecord(
-            session_id=session.id,
-            role=msg.role,
-            content=msg.content,
-            ai_response_json=msg.ai_response_json,
-        ))
+    # ai_response_json is compared by its md5, so the stored JSON is never loaded
+    stored = (
+        db.query(
+            ChatMessageRecord.role,
+            ChatMessageRecord.content,
+            func.md5(ChatMessageRecord.ai_response_json),
+        )
+        .filter(ChatMessageRecord.session_id == session_id)
+        .order_by(ChatMessageRecord.id)
+        .all()
+    )
+    is_prefix = len(stored) <= len(data.messages) and all(
+        (role, content, response_md5) == (msg.role, msg.content, _md5_or_none(msg.ai_response_json))
+        for (role, content, response_md5), msg in zip(stored, data.messages)
+    )
+    if is_prefix:
+        new_messages = data.messages[len(stored):]
+    else:
+        db.query(ChatMessageRecord).filter(
+            ChatMessageRecord.session_id == session_id,
+        ).delete(synchronize_session=False)
+        new_messages = data.messages
+
+    rows = _add_messages(db, session_id, new_messages)
+    last_message_id = (
+        rows[-1].id if rows else
+        db.query(func.max(ChatMessageRecord.id)).filter(ChatMessageRecord.session_id == session_id).scalar()
+    )
     db.commit()
-    db.refresh(session)
     return {
         "id": session.id,
         "case_id": session.case_id,
         "title": session.title,
         "updated_at": session.updated_at.isoformat() if session.updated_at else None,
-        "message_count": len(session.messages_rel),
+        "message_count": len(data.messages),
+        "last_message_id": last_message_id,
     }
 
 
@@ -1027,20 +1563,30 @@ def delete_chat_session(session_id: int, db: Session = Depends(get_db)):
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/all-cases", summary="All cases with client info for dropdown")
-def list_all_cases_with_clients(db: Session = Depends(get_db)):
-    cases = db.query(Case).order_by(Case.created_at.desc()).all()
-    return [
+def list_all_cases_with_clients(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    rows, next_cursor = keyset_page(
+        db.query(Case, Client.client_name, _count(CaseFile.case_id, Case.case_id))
+        .outerjoin(Client, Case.client_id == Client.client_id),
+        Case.created_at, Case.case_id, cursor, limit,
+        key=lambda row: (row[0].created_at, row[0].case_id),
+    )
+    items = [
         {
             "case_id": c.case_id,
             "client_id": c.client_id,
-            "client_name": c.client.client_name if c.client else "Unknown",
+            "client_name": client_name or "Unknown",
             "description": c.description,
             "created_at": c.created_at.isoformat() if c.created_at else None,
             "updated_at": c.updated_at.isoformat() if c.updated_at else None,
-            "file_count": len(c.files),
+            "file_count": file_count,
         }
-        for c in cases
+        for c, client_name, file_count in rows
     ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # ══════════════════════════════════════════════════════════════════════════════
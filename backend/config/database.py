@@ -1,5 +1,6 @@
 import os
 import chromadb
+import ollama
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from config.postgres import engine, SessionLocal, Base, TargetDB, IngestionStatus
 from sqlalchemy import create_engine
@@ -75,4 +76,8 @@ class DatabaseClient:
     def get_client_db(self):
         return self._chroma_client.get_or_create_collection(name=settings.CLIENT_DB_NAME)
 
-db_client = DatabaseClient()
\ No newline at end of file
+db_client = DatabaseClient()
+
+# Shared async Ollama client for the request path (query embedding, generation,
+# judging), so a slow model call awaits instead of blocking the event loop
+ollama_client = ollama.AsyncClient(host=settings.OLLAMA_BASE_URL)
@@ -1,7 +1,9 @@
 """
 config/postgres.py
 ──────────────────
-PostgreSQL integration via SQLAlchemy (sync).
+PostgreSQL integration via SQLAlchemy: a sync engine for the pipelines and
+most endpoints, and an asyncpg engine for the async request path
+(get_async_db: /upload) and the query log writer (api/query_log_writer.py).
 
 Tables
 ──────
@@ -10,30 +12,55 @@ Tables
 • case_file_table  – files for active cases (with ingestion)
 • past_case_table  – historical case references (no ingestion)
 • law_table        – law/constitution files (no ingestion)
-• ingested_files   – one row per file; stores the actual binary via BYTEA
+• ingested_files   – one row per ingested file
+• file_blobs       – reference counts of the on-disk content-addressed blob store
 • case_records     – one row per unique client case (legacy)
-• query_logs       – every RAG query + evaluation score
+• query_logs       – every RAG query + evaluation score (monthly partitions)
+• query_log_hourly / query_log_daily – rollups of query_logs for dashboards
+• ingestion_jobs   – durable queue of ingestion work claimed by ingest_worker
+• chunk_manifests  – ordered chunk fingerprints per embedded document
+• ingestion_checkpoints – parsed chunks + progress of interrupted ingestions
+• document_texts   – compressed extracted text + chunk boundaries per document
+• metadata_cache   – LLM-extracted document metadata, keyed by text hash
+
+File bytes live in the blob store under FILE_STORAGE_DIR (see
+ingestion/blob_store.py); file rows keep only content_sha256. Their BYTEA
+columns are legacy, NULL once init_db has moved the bytes to the store.
+
+Every BYTEA column is deferred: querying a row loads its metadata only, and
+the bytes are fetched on first access to the attribute (or up front with
+.options(undefer(...)) where they are the point of the query). Listings must
+read file_size_bytes, never len() of a blob.
 """
 
 from __future__ import annotations
 
 import datetime
 import enum
+import hashlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Enum as SAEnum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     LargeBinary,   # ← maps to BYTEA in PostgreSQL
     String,
     Text,
     create_engine,
+    func,
+    inspect,
+    text,
 )
-from sqlalchemy.orm import DeclarativeBase, relationship, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import DeclarativeBase, deferred, relationship, sessionmaker
 
 from config.settings import settings
 
@@ -51,6 +78,18 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(
+    settings.POSTGRES_ASYNC_URL,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10,
+    echo=settings.DEBUG,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -72,6 +111,19 @@ class IngestionStatus(str, enum.Enum):
     failed = "failed"
 
 
+class JobState(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class JobType(str, enum.Enum):
+    ingest_file = "ingest_file"  # POST /api/upload       → ingest_file()
+    case_file = "case_file"      # POST /api/upload-file  → ingest_case_file()
+    enrich_metadata = "enrich_metadata"  # deferred LLM metadata for an embedded document
+
+
 class FileType(str, enum.Enum):
     """Type of file being uploaded - determines processing pipeline."""
     case_file = "case_file"      # Active case files → ingestion + ChromaDB
@@ -92,7 +144,7 @@ class Client(Base):
     client_name = Column(String(256), nullable=False)
     phone = Column(String(32), nullable=True)
     address = Column(Text, nullable=True)
-    photo = Column(LargeBinary, nullable=True)  # Client photo stored as BYTEA
+    photo = deferred(Column(LargeBinary, nullable=True))  # Client photo stored as BYTEA
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(
         DateTime,
@@ -103,6 +155,11 @@ class Client(Base):
     # Relationship: one client has many cases
     cases = relationship("Case", back_populates="client", cascade="all, delete-orphan")
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_client_table_created_at_client_id", "created_at", "client_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Client client_id={self.client_id} name={self.client_name}>"
 
@@ -113,7 +170,7 @@ class Case(Base):
     __tablename__ = "case_table"
 
     case_id = Column(Integer, primary_key=True, autoincrement=True)
-    client_id = Column(Integer, ForeignKey("client_table.client_id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("client_table.client_id"), nullable=False, index=True)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(
@@ -126,6 +183,12 @@ class Case(Base):
     client = relationship("Client", back_populates="cases")
     files = relationship("CaseFile", back_populates="case", cascade="all, delete-orphan")
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_case_table_created_at_case_id", "created_at", "case_id"),
+        Index("ix_case_table_client_id_created_at_case_id", "client_id", "created_at", "case_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Case case_id={self.case_id} client_id={self.client_id}>"
 
@@ -136,12 +199,13 @@ class CaseFile(Base):
     __tablename__ = "case_file_table"
 
     file_id = Column(Integer, primary_key=True, autoincrement=True)
-    case_id = Column(Integer, ForeignKey("case_table.case_id"), nullable=False)
+    case_id = Column(Integer, ForeignKey("case_table.case_id"), nullable=False, index=True)
     filename = Column(String(512), nullable=False)
     extension = Column(String(16), nullable=True)
-    file = Column(LargeBinary, nullable=False)  # File content as BYTEA
+    file = deferred(Column(LargeBinary, nullable=True))  # legacy BYTEA copy; bytes are in the blob store
     mime_type = Column(String(128), nullable=True)
     file_size_bytes = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)  # dedup + blob store key
     status = Column(
         SAEnum(IngestionStatus, name="case_file_ingestion_status_enum"),
         nullable=False,
@@ -149,12 +213,18 @@ class CaseFile(Base):
     )
     chunk_count = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
+    ingest_metrics = Column(JSON(none_as_null=True), nullable=True)  # see ingestion/ingest_metrics.py
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
     ingested_at = Column(DateTime, nullable=True)
 
     # Relationship
     case = relationship("Case", back_populates="files")
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_case_file_table_case_id_uploaded_at_file_id", "case_id", "uploaded_at", "file_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<CaseFile file_id={self.file_id} filename={self.filename}>"
 
@@ -166,13 +236,19 @@ class PastCase(Base):
 
     past_case_id = Column(Integer, primary_key=True, autoincrement=True)
     case_name = Column(String(512), nullable=False)
-    case_file = Column(LargeBinary, nullable=False)  # PDF/TXT stored as BYTEA
+    case_file = deferred(Column(LargeBinary, nullable=True))  # legacy BYTEA copy; bytes are in the blob store
     filename = Column(String(512), nullable=True)
     extension = Column(String(16), nullable=True)
     mime_type = Column(String(128), nullable=True)
     file_size_bytes = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)  # dedup + blob store key
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_past_case_table_uploaded_at_past_case_id", "uploaded_at", "past_case_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<PastCase past_case_id={self.past_case_id} name={self.case_name}>"
 
@@ -184,17 +260,45 @@ class Law(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     law_of_country = Column(String(256), nullable=False)
-    constitution_file = Column(LargeBinary, nullable=False)  # PDF/TXT stored as BYTEA
+    constitution_file = deferred(Column(LargeBinary, nullable=True))  # legacy BYTEA copy; bytes are in the blob store
     filename = Column(String(512), nullable=True)
     extension = Column(String(16), nullable=True)
     mime_type = Column(String(128), nullable=True)
     file_size_bytes = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)  # dedup + blob store key
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_law_table_uploaded_at_id", "uploaded_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Law id={self.id} country={self.law_of_country}>"
 
 
+class FileBlob(Base):
+    """
+    One row per file in the on-disk blob store (ingestion/blob_store.py).
+
+    ref_count        – file rows (ingested, case file, past case, law) with
+                       this content_sha256; recounted by the garbage collector
+    unreferenced_at  – when ref_count last dropped to 0; the file is deleted
+                       BLOB_GC_GRACE_SECONDS later
+    """
+
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    unreferenced_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<FileBlob {self.sha256[:12]} refs={self.ref_count}>"
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Legacy ORM Models (kept for backward compatibility)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -217,6 +321,11 @@ class CaseRecord(Base):
         "IngestedFile", back_populates="case", cascade="all, delete-orphan"
     )
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_case_records_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<CaseRecord case_id={self.case_id}>"
 
@@ -225,17 +334,18 @@ class IngestedFile(Base):
     """
     One row per ingested document.
 
-    The raw file bytes are stored in `file_data` (PostgreSQL BYTEA).
-    The document is fully self-contained inside the database — no dependency
-    on the filesystem after ingestion.
+    The raw file bytes are stored once in the content-addressed blob store
+    (ingestion/blob_store.py), keyed by content_sha256.
 
     Column notes
     ────────────
-    file_data         – raw binary content of the original file (BYTEA)
+    file_data         – legacy BYTEA copy of the file; NULL once moved to the blob store
     mime_type         – e.g. "application/pdf", "application/vnd.openxmlformats…"
     original_filename – original name as uploaded / provided
     file_size_bytes   – byte length (for quick queries without loading the blob)
-    stored_path       – optional on-disk path if also saved locally; NULL if DB-only
+    content_sha256    – hex SHA-256 of the file; duplicate detection + blob store key
+    ingest_metrics    – per-stage timings, peak memory, throughput (JSON)
+    stored_path       – path of the file in the blob store
     """
 
     __tablename__ = "ingested_files"
@@ -246,11 +356,12 @@ class IngestedFile(Base):
     original_filename = Column(String(512), nullable=False)
     mime_type = Column(String(128), nullable=True)
     file_size_bytes = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)
 
-    # ── THE ACTUAL FILE (BYTEA) ───────────────────────────────────────────────
-    file_data = Column(LargeBinary, nullable=False)
+    # ── Legacy BYTEA copy (NULL once moved to the blob store) ────────────────
+    file_data = deferred(Column(LargeBinary, nullable=True))
 
-    # ── Optional on-disk path (NULL when file is only in DB) ─────────────────
+    # ── On-disk path in the blob store ────────────────────────────────────────
     stored_path = Column(String(1024), nullable=True)
 
     # ── Ingestion tracking ────────────────────────────────────────────────────
@@ -262,19 +373,32 @@ class IngestedFile(Base):
     )
     chunk_count = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
+    ingest_metrics = Column(JSON(none_as_null=True), nullable=True)
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
     ingested_at = Column(DateTime, nullable=True)
 
     # ── Client case link (optional) ───────────────────────────────────────────
-    case_record_id = Column(Integer, ForeignKey("case_records.id"), nullable=True)
+    case_record_id = Column(Integer, ForeignKey("case_records.id"), nullable=True, index=True)
     case = relationship("CaseRecord", back_populates="files")
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_ingested_files_uploaded_at_id", "uploaded_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<IngestedFile {self.original_filename} status={self.status}>"
 
 
 class QueryLog(Base):
-    """Every RAG query logged for analytics and audit."""
+    """
+    Every RAG query logged for analytics and audit.
+
+    Range-partitioned by month on queried_at (query_logs_pYYYYMM, managed by
+    evaluation/query_stats.py), so old months are dropped whole and the
+    dashboards read the query_log_hourly / query_log_daily rollups instead.
+    The partition key has to be part of the primary key.
+    """
 
     __tablename__ = "query_logs"
 
@@ -286,12 +410,246 @@ class QueryLog(Base):
     eval_score = Column(Float, nullable=True)
     is_helpful = Column(Boolean, nullable=True)
     num_sources = Column(Integer, nullable=True)
-    queried_at = Column(DateTime, default=datetime.datetime.utcnow)
+    queried_at = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        # keyset pagination order (api/pagination.py)
+        Index("ix_query_logs_queried_at_id", "queried_at", "id"),
+        {"postgresql_partition_by": "RANGE (queried_at)"},
+    )
 
     def __repr__(self) -> str:
         return f"<QueryLog id={self.id} score={self.eval_score}>"
 
 
+class _QueryLogRollup:
+    """
+    Aggregates of query_logs per time bucket. Sums and counts rather than
+    averages, so buckets combine by addition (hourly → daily → any window).
+    """
+
+    bucket = Column(DateTime, primary_key=True)       # start of the hour / day (UTC)
+    query_count = Column(Integer, nullable=False, default=0)
+    high_confidence_count = Column(Integer, nullable=False, default=0)
+    low_confidence_count = Column(Integer, nullable=False, default=0)
+    helpful_count = Column(Integer, nullable=False, default=0)
+    eval_score_sum = Column(Float, nullable=False, default=0)
+    eval_score_count = Column(Integer, nullable=False, default=0)  # queries that were scored
+    num_sources_sum = Column(BigInteger, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class QueryLogHourly(_QueryLogRollup, Base):
+    __tablename__ = "query_log_hourly"
+
+
+class QueryLogDaily(_QueryLogRollup, Base):
+    __tablename__ = "query_log_daily"
+
+
+class IngestionJob(Base):
+    """
+    One unit of queued ingestion work.
+
+    Claimed by ingest_worker processes with SELECT … FOR UPDATE SKIP LOCKED,
+    so any number of workers on any number of machines can share the queue.
+
+    Column notes
+    ────────────
+    payload_json  – keyword arguments for the pipeline (filename, target DB, …)
+    file_data     – upload bytes for ingest_file jobs; cleared once the job ends
+    run_after     – earliest time the job may be claimed (retry backoff)
+    locked_at     – claim / heartbeat time; stale running jobs are re-claimed
+    progress      – current pipeline stage, for the status endpoint
+    """
+
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(SAEnum(JobType, name="ingestion_job_type_enum"), nullable=False)
+    state = Column(
+        SAEnum(JobState, name="ingestion_job_state_enum"),
+        nullable=False,
+        default=JobState.queued,
+    )
+    payload_json = Column(Text, nullable=False)
+    file_data = deferred(Column(LargeBinary, nullable=True))
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    locked_by = Column(String(128), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    progress = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result_json = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingestion_jobs_state_run_after", "state", "run_after"),
+        Index("ix_ingestion_jobs_created_at_id", "created_at", "id"),  # keyset pagination
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionJob id={self.id} type={self.job_type} state={self.state}>"
+
+
+class ChunkManifest(Base):
+    """
+    The chunks of one document as last written to ChromaDB, in order.
+
+    Re-ingestion diffs the new chunks against this list so only added or
+    changed chunks are embedded (see DocumentEmbedder.embed_and_store).
+
+    Column notes
+    ────────────
+    collection  – ChromaDB collection name
+    doc_id      – logical document id shared by every version of the file
+    chunks_json – [[chunk_id, metadata_sha256], …] in document order
+    complete    – False while an interrupted first ingest may have left chunks
+                  of an older, manifest-less version that are not listed here
+    """
+
+    __tablename__ = "chunk_manifests"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(128), nullable=False)
+    doc_id = Column(String(1024), nullable=False)
+    chunks_json = Column(Text, nullable=False)
+    complete = Column(Boolean, nullable=True)  # NULL → complete
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_chunk_manifests_collection_doc_id", "collection", "doc_id", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ChunkManifest {self.collection}/{self.doc_id}>"
+
+
+class IngestionCheckpoint(Base):
+    """
+    Progress of an ingestion that has not finished yet, so a retry reuses
+    its metadata and embeds only the chunks after the last committed batch
+    (see ingestion/checkpoints.py). Deleted on success.
+
+    Column notes
+    ────────────
+    collection, doc_id – the document being embedded (as in chunk_manifests)
+    content_sha256     – the bytes the checkpoint was made from; any other
+                         bytes start from scratch
+    file_id            – ingested_files.id / case_file_table.file_id being ingested
+    metadata_json      – document metadata passed to embed_and_store
+    text_head          – start of the text, for the deferred LLM metadata pass
+    enrich_later       – whether that pass still has to be queued
+    chunks_committed   – chunks in ChromaDB as of the last committed batch,
+                         out of chunks_total cut so far
+    """
+
+    __tablename__ = "ingestion_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(128), nullable=False)
+    doc_id = Column(String(1024), nullable=False)
+    content_sha256 = Column(String(64), nullable=False)
+    file_id = Column(Integer, nullable=False)
+    metadata_json = Column(Text, nullable=False)
+    text_head = Column(Text, nullable=False)
+    enrich_later = Column(Boolean, nullable=False, default=False)
+    chunks_committed = Column(Integer, nullable=False, default=0)
+    chunks_total = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_ingestion_checkpoints_collection_doc_id", "collection", "doc_id", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionCheckpoint {self.collection}/{self.doc_id} {self.chunks_committed}/{self.chunks_total}>"
+
+
+class DocumentText(Base):
+    """
+    The extracted text of an embedded document and where it was chunked,
+    so a collection can be re-chunked without parsing the files again
+    (see ingestion/text_store.py and ingest_cli --rechunk).
+
+    Column notes
+    ────────────
+    collection, doc_id – the document in ChromaDB (as in chunk_manifests)
+    source, file_id    – "ingested_files" / "case_file_table" row it came from
+    manual_meta_json   – the caller-supplied metadata (source_file, case ids)
+    text_zlib          – zlib-compressed UTF-8 text, exactly as chunked
+    chunk_bounds_json  – [[start_offset, end_offset], …] of the current chunks
+    chunker_config     – SectionAwareChunker.config_signature() they were cut with
+    """
+
+    __tablename__ = "document_texts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(128), nullable=False)
+    doc_id = Column(String(1024), nullable=False)
+    content_sha256 = Column(String(64), nullable=False)
+    source = Column(String(32), nullable=False)
+    file_id = Column(Integer, nullable=False)
+    manual_meta_json = Column(Text, nullable=False)
+    text_zlib = deferred(Column(LargeBinary, nullable=False))
+    chunk_bounds_json = Column(Text, nullable=False)
+    chunker_config = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_document_texts_collection_doc_id", "collection", "doc_id", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<DocumentText {self.collection}/{self.doc_id}>"
+
+
+class MetadataCache(Base):
+    """
+    LLM metadata extraction results, so a document head the model has
+    already read is never sent to it again.
+
+    text_sha256 is the hash of the exact text given to the model.
+    """
+
+    __tablename__ = "metadata_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    text_sha256 = Column(String(64), nullable=False)
+    model = Column(String(128), nullable=False)
+    metadata_json = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_metadata_cache_text_sha256_model", "text_sha256", "model", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MetadataCache {self.model}/{self.text_sha256[:12]}>"
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Chat Session / Message tables
 # ──────────────────────────────────────────────────────────────────────────────
@@ -317,6 +675,11 @@ class ChatSessionRecord(Base):
         order_by="ChatMessageRecord.created_at",
     )
 
+    # keyset pagination order (api/pagination.py)
+    __table_args__ = (
+        Index("ix_chat_sessions_updated_at_id", "updated_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<ChatSession id={self.id} title={self.title}>"
 
@@ -327,7 +690,7 @@ class ChatMessageRecord(Base):
     __tablename__ = "chat_messages"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False, index=True)
     role = Column(String(16), nullable=False)
     content = Column(Text, nullable=False)
     ai_response_json = Column(Text, nullable=True)
@@ -363,7 +726,205 @@ class AnalyticsCache(Base):
 # ──────────────────────────────────────────────────────────────────────────────
 def init_db() -> None:
     """Create all tables if they don't exist (idempotent)."""
+    from evaluation import query_stats  # imports this module
+
+    query_stats.detach_legacy_table()
     Base.metadata.create_all(bind=engine)
+    query_stats.ensure_partitions()
+    copied = query_stats.migrate_legacy_table()
+    if copied:
+        print(f"  Moved {copied} query logs into the partitioned query_logs table")
+    _add_missing_columns()
+    _drop_retired_columns()
+    _add_missing_indexes()
+    _add_missing_enum_values()
+    _prepare_blob_columns()
+    filled = backfill_content_hashes()
+    if filled:
+        print(f"  Backfilled content_sha256 for {filled} stored files")
+    sized = backfill_file_sizes()
+    if sized:
+        print(f"  Backfilled file_size_bytes for {sized} stored files")
+
+    from ingestion import blob_store  # imports this module
+    moved = blob_store.migrate_bytea()
+    if moved:
+        print(f"  Moved {moved} stored files from BYTEA to the blob store")
+
+
+def _add_missing_columns() -> None:
+    """
+    create_all() never alters existing tables, so add any nullable column
+    that the models gained since the table was created. Its index is built
+    by _add_missing_indexes().
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        missing = [col for col in table.columns if col.name not in existing and col.nullable]
+        if not missing:
+            continue
+        with engine.begin() as conn:
+            for col in missing:
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+                print(f"  Added column {table.name}.{col.name}")
+
+
+# (table, column) the models no longer have. NOT NULL columns must go, or
+# inserts that leave them out fail.
+RETIRED_COLUMNS = (
+    ("ingestion_checkpoints", "chunks_json"),   # chunks are streamed, not checkpointed
+)
+
+
+def _drop_retired_columns() -> None:
+    inspector = inspect(engine)
+    for table_name, column in RETIRED_COLUMNS:
+        if not inspector.has_table(table_name):
+            continue
+        if column not in {col["name"] for col in inspector.get_columns(table_name)}:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {column}"))
+        print(f"  Dropped column {table_name}.{column}")
+
+
+def _add_missing_indexes() -> None:
+    """
+    Likewise, indexes declared on columns of existing tables (e.g. foreign
+    keys). On PostgreSQL they are built CONCURRENTLY, outside a transaction,
+    so the table stays writable while a new index is built at startup.
+    """
+    if engine.dialect.name != "postgresql":
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            partitioned = conn.execute(
+                text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": table.name},
+            ).scalar()
+            for index in table.indexes:
+                valid = conn.execute(
+                    text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index)"),
+                    {"index": str(index.name)},
+                ).scalar()
+                if valid:
+                    continue
+                if valid is False:
+                    # Left by an interrupted concurrent build; IF NOT EXISTS would keep it
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                # A partitioned table can't be indexed concurrently
+                keyword = "INDEX IF NOT EXISTS" if partitioned else "INDEX CONCURRENTLY IF NOT EXISTS"
+                ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+                conn.execute(text(ddl.replace("INDEX", keyword, 1)))
+                print(f"  Built index {index.name}")
+
+
+def _add_missing_enum_values() -> None:
+    """PostgreSQL enum types are also fixed at creation; add new members."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            for col in table.columns:
+                if isinstance(col.type, SAEnum) and col.type.name:
+                    for value in col.type.enums:
+                        conn.execute(text(
+                            f"ALTER TYPE {col.type.name} ADD VALUE IF NOT EXISTS '{value}'"
+                        ))
+
+
+# (model, primary key, BYTEA column) for every table whose files are
+# deduplicated by content and kept in the blob store
+BLOB_COLUMNS = (
+    (IngestedFile, IngestedFile.id, IngestedFile.file_data),
+    (CaseFile, CaseFile.file_id, CaseFile.file),
+    (PastCase, PastCase.past_case_id, PastCase.case_file),
+    (Law, Law.id, Law.constitution_file),
+)
+
+
+def _prepare_blob_columns() -> None:
+    """
+    The legacy BYTEA file columns were created NOT NULL; relax them so rows
+    can drop their bytes for the blob store. Values still in them are kept
+    out of line uncompressed (STORAGE EXTERNAL), so substr() reads of a
+    streamed download fetch only the slice's TOAST chunks.
+
+    Each ALTER takes an ACCESS EXCLUSIVE lock on the table, so the catalog
+    is checked first and a column already in shape is left alone.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for model, _pk, blob in BLOB_COLUMNS:
+            state = conn.execute(
+                text(
+                    "SELECT attnotnull, attstorage FROM pg_attribute "
+                    "WHERE attrelid = to_regclass(:table) AND attname = :column AND NOT attisdropped"
+                ),
+                {"table": model.__tablename__, "column": blob.key},
+            ).first()
+            if state is None:
+                continue
+            column = f"ALTER TABLE {model.__tablename__} ALTER COLUMN {blob.key}"
+            if state.attnotnull:
+                conn.execute(text(f"{column} DROP NOT NULL"))
+            if state.attstorage != "e":
+                conn.execute(text(f"{column} SET STORAGE EXTERNAL"))
+
+
+def backfill_content_hashes() -> int:
+    """
+    Fill content_sha256 for rows stored before the column existed.
+    Loads one blob at a time; a no-op once every row has a hash.
+    """
+    filled = 0
+    db = SessionLocal()
+    try:
+        for model, pk, blob in BLOB_COLUMNS:
+            # Rows without bytes get no hash: sha256(b"") would mark them all as one file
+            ids = [
+                row[0] for row in
+                db.query(pk).filter(model.content_sha256.is_(None), blob.isnot(None))
+            ]
+            for row_id in ids:
+                data = db.query(blob).filter(pk == row_id).scalar()
+                db.query(model).filter(pk == row_id).update(
+                    {"content_sha256": hashlib.sha256(data).hexdigest()},
+                    synchronize_session=False,
+                )
+                db.commit()
+                filled += 1
+    finally:
+        db.close()
+    return filled
+
+
+def backfill_file_sizes() -> int:
+    """
+    Fill file_size_bytes for rows stored without it, so listings never need
+    the blob. length() runs in PostgreSQL; no bytes are sent to Python.
+    """
+    filled = 0
+    db = SessionLocal()
+    try:
+        for model, _pk, blob in BLOB_COLUMNS:
+            filled += (
+                db.query(model)
+                .filter(model.file_size_bytes.is_(None))
+                .update({"file_size_bytes": func.length(blob)}, synchronize_session=False)
+            )
+        db.commit()
+    finally:
+        db.close()
+    return filled
 
 
 def get_db():
@@ -377,4 +938,17 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency for async endpoints — yields an AsyncSession, so
+    queries await asyncpg instead of blocking the event loop.
+
+        @router.post("/x")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)): ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
@@ -49,6 +49,69 @@ class Settings(BaseSettings):
     FILE_STORAGE_DIR: str = os.path.join(
         os.path.dirname(os.path.dirname(__file__)), "data", "docs"
     )
+    BLOB_GC_GRACE_SECONDS: int = 24 * 3600   # unreferenced blobs are kept this long
+    BLOB_GC_INTERVAL_SECONDS: int = 3600      # ingest_worker runs the blob collector this often
+    DOWNLOAD_CHUNK_BYTES: int = 1024 * 1024   # bytes per read when streaming a download
+
+    # Chunking – sizes are in embedding-model tokens (mxbai-embed-large: 512)
+    CHUNK_MAX_TOKENS: int = 480
+    CHUNK_OVERLAP_TOKENS: int = 50
+    EMBED_TOKENIZER_PATH: str = ""      # tokenizer.json for exact counts; empty → approximation
+
+    # Embedding / ingestion throughput
+    EMBED_BATCH_SIZE: int = 32          # chunks per ollama.embed() call
+    EMBED_MAX_IN_FLIGHT: int = 4        # concurrent embed batches
+    CHROMA_UPSERT_BATCH_SIZE: int = 512 # vectors per collection.upsert()
+    INGEST_METADATA_CONCURRENCY: int = 2  # concurrent LLM metadata calls (ingest_cli --workers)
+    INGEST_EMBED_CONCURRENCY: int = 2     # files embedding at once (ingest_cli --workers)
+    INGEST_TRACE_MEMORY: bool = True      # tracemalloc peak per file (adds some overhead)
+
+    # Document metadata – regex rules always run; the LLM pass is either
+    # "deferred" (queued for ingest_worker after embedding), "inline", or "off"
+    METADATA_LLM_MODE: str = "deferred"
+
+    # Ingestion job queue (ingest_worker)
+    INGEST_JOB_MAX_ATTEMPTS: int = 3
+    INGEST_JOB_BACKOFF_SECONDS: int = 30     # doubled on every retry
+    INGEST_JOB_LEASE_SECONDS: int = 1800     # running jobs without a heartbeat are re-claimed
+    INGEST_WORKER_POLL_SECONDS: float = 2.0
+
+    # PDF extraction – large PDFs are extracted page-range-parallel
+    PDF_PAGE_WORKERS: int = 0           # 0 → os.cpu_count()
+    PDF_PARALLEL_MIN_PAGES: int = 64    # smaller PDFs are read in-process
+    PDF_PAGE_RANGE_SIZE: int = 16       # pages per worker task
+
+    # OCR – PDF pages with no text layer (scans) are OCR'd with Tesseract
+    OCR_ENABLED: bool = True
+    OCR_WORKERS: int = 0                # 0 → os.cpu_count()
+    OCR_LANG: str = "eng"               # tesseract languages, e.g. "eng+nep"
+    OCR_DPI: int = 300                  # rasterization resolution (pdf2image)
+    OCR_MIN_TEXT_CHARS: int = 16        # pages with less text than this are OCR'd
+    OCR_MAX_PAGES: int = 500            # per-document page budget
+    OCR_TIMEOUT_SECONDS: int = 900      # per-document wall-clock budget
+    OCR_CACHE_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "ocr_cache.sqlite3"
+    )
+
+    # Embedding cache – keyed by (EMBEDDING_MODEL@endpoint, sha256(text))
+    EMBED_CACHE_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "embed_cache.sqlite3"
+    )
+    EMBED_CACHE_MAX_BYTES: int = 2 * 1024 ** 3   # on-disk vector budget
+    EMBED_CACHE_MEMORY_ITEMS: int = 4096          # in-process LRU entries
+
+    # Query logs – /query rows are buffered and inserted in batches
+    QUERY_LOG_QUEUE_SIZE: int = 10000     # rows waiting beyond this are dropped (and counted)
+    QUERY_LOG_BATCH_SIZE: int = 500       # rows per INSERT / commit
+    QUERY_LOG_FLUSH_SECONDS: float = 1.0  # longest a row waits before its batch is written
+    QUERY_LOG_PARTITIONS_AHEAD: int = 2   # monthly partitions created in advance
+    QUERY_LOG_RETENTION_MONTHS: int = 0  # opt-in: drop monthly partitions older than this; 0 keeps all
+    QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS: int = 300  # API and ingest_worker refresh rollups this often
+
+    # Query embedding cache – in-process, keyed by (EMBEDDING_MODEL, normalized query)
+    QUERY_EMBED_CACHE_ENABLED: bool = True
+    QUERY_EMBED_CACHE_ITEMS: int = 2048
+    QUERY_EMBED_CACHE_TTL_SECONDS: int = 3600
 
     # Generation settings
     MAX_RETRIES: int = 3
@@ -1,11 +1,11 @@
 import json
-import ollama
 from typing import Dict, Any
+from config.database import ollama_client
 from config.settings import settings
 
 class EvaluatorJudge:
     @staticmethod
-    def evaluate(query: str, context: str, response: str) -> Dict[str, Any]:
+    async def evaluate(query: str, context: str, response: str) -> Dict[str, Any]:
         """Evaluates a generated response using a judge LLM."""
         
         prompt = f"""Evaluate the following legal AI response. Return ONLY valid JSON, no other text.
@@ -25,7 +25,7 @@ Return EXACTLY this JSON format:
 }}
 """
         try:
-            res = ollama.chat(
+            res = await ollama_client.chat(
                 model=settings.JUDGE_MODEL,
                 messages=[{'role': 'user', 'content': prompt}],
                 format='json'
@@ -0,0 +1,294 @@
+"""
+evaluation/query_stats.py
+─────────────────────────
+Partitions, retention and rollups of query_logs.
+
+query_logs is range-partitioned by month (query_logs_pYYYYMM).
+ensure_partitions() keeps QUERY_LOG_PARTITIONS_AHEAD months created in
+advance. Retention is opt-in: with QUERY_LOG_RETENTION_MONTHS set (default
+0, keep everything), drop_expired_partitions() drops whole months older
+than that — a DROP TABLE, not a DELETE of millions of rows.
+
+Dashboards never scan query_logs: refresh_rollups() folds new rows into
+query_log_hourly, and those into query_log_daily. Each refresh re-aggregates
+only from the latest stored hour (minus one, for rows written late) onward,
+so it reads the newest partition alone however large the table grows.
+Rollups outlive the partitions they were built from.
+
+A DEFAULT partition (query_logs_default) takes rows no monthly partition
+covers, so an insert never fails for want of one; _create_partition()
+moves such rows into their month when it is created.
+
+The API (main.py) and ingest_worker both run maintain() every
+QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS — an advisory lock lets only one
+run at a time; init_db() creates the partitions and moves a
+pre-partitioning table over.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+from sqlalchemy import func, inspect, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from config.postgres import QueryLog, QueryLogDaily, QueryLogHourly, engine
+from config.settings import settings
+
+_TABLE = QueryLog.__tablename__
+_LEGACY_TABLE = f"{_TABLE}_legacy"
+_PARTITION_PREFIX = f"{_TABLE}_p"
+_DEFAULT_PARTITION = f"{_TABLE}_default"
+
+# pg_try_advisory_lock key held while maintain() runs
+_MAINTENANCE_LOCK = 0x716C6F67
+
+_ROLLUP_COLUMNS = (
+    "query_count",
+    "high_confidence_count",
+    "low_confidence_count",
+    "helpful_count",
+    "eval_score_sum",
+    "eval_score_count",
+    "num_sources_sum",
+)
+
+
+def _is_postgres() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _month_start(moment: datetime.datetime) -> datetime.datetime:
+    return datetime.datetime(moment.year, moment.month, 1)
+
+
+def _add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.datetime(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: datetime.datetime) -> str:
+    return f"{_PARTITION_PREFIX}{month:%Y%m}"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Partitions
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _exists(conn, table: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:t)"), {"t": table}).scalar() is not None
+
+
+def _create_partition(conn, month: datetime.datetime) -> None:
+    """
+    Create the partition for month. Rows of that month already caught by
+    the DEFAULT partition are moved into it (PostgreSQL refuses to create
+    a partition whose range the default partition still holds rows of).
+    """
+    name = _partition_name(month)
+    if _exists(conn, name):
+        return
+    lower, upper = f"{month:%Y-%m-%d}", f"{_add_months(month, 1):%Y-%m-%d}"
+    create = f"CREATE TABLE {name} PARTITION OF {_TABLE} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    in_month = f"queried_at >= '{lower}' AND queried_at < '{upper}'"
+
+    stranded = _exists(conn, _DEFAULT_PARTITION) and conn.execute(
+        text(f"SELECT 1 FROM {_DEFAULT_PARTITION} WHERE {in_month} LIMIT 1")
+    ).first()
+    if not stranded:
+        conn.execute(text(create))
+        return
+    conn.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {_DEFAULT_PARTITION}"))
+    conn.execute(text(create))
+    conn.execute(text(f"INSERT INTO {_TABLE} SELECT * FROM {_DEFAULT_PARTITION} WHERE {in_month}"))
+    conn.execute(text(f"DELETE FROM {_DEFAULT_PARTITION} WHERE {in_month}"))
+    conn.execute(text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {_DEFAULT_PARTITION} DEFAULT"))
+
+
+def ensure_partitions(months_ahead: int | None = None) -> None:
+    """
+    Create the DEFAULT partition, this month's partition and the next
+    months_ahead ones.
+    """
+    if not _is_postgres():
+        return
+    ahead = settings.QUERY_LOG_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    this_month = _month_start(datetime.datetime.utcnow())
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {_DEFAULT_PARTITION} PARTITION OF {_TABLE} DEFAULT"))
+        for offset in range(ahead + 1):
+            _create_partition(conn, _add_months(this_month, offset))
+
+
+def list_partitions() -> list[tuple[str, datetime.datetime]]:
+    """(name, first day of month) of every monthly partition, oldest first."""
+    if not _is_postgres():
+        return []
+    with engine.connect() as conn:
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ), {"parent": _TABLE}).scalars().all()
+    partitions = []
+    for name in names:
+        try:
+            month = datetime.datetime.strptime(name.removeprefix(_PARTITION_PREFIX), "%Y%m")
+        except ValueError:
+            continue  # not one of ours
+        partitions.append((name, month))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def drop_expired_partitions(retention_months: int | None = None) -> list[str]:
+    """
+    Drop the partitions wholly older than retention_months (0 keeps all).
+    Call refresh_rollups() first so their rows are already aggregated.
+    """
+    months = settings.QUERY_LOG_RETENTION_MONTHS if retention_months is None else retention_months
+    if months <= 0:
+        return []
+    cutoff = _add_months(_month_start(datetime.datetime.utcnow()), -months)
+    dropped = []
+    for name, month in list_partitions():
+        if month >= cutoff:
+            break
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped.append(name)
+    return dropped
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Moving a pre-partitioning query_logs table over (init_db)
+# ──────────────────────────────────────────────────────────────────────────────
+
+def detach_legacy_table() -> None:
+    """
+    Rename a plain (unpartitioned) query_logs out of the way — with its
+    indexes and id sequence, whose names the new table reuses — so that
+    create_all() can create the partitioned one. Runs before create_all().
+    """
+    if not _is_postgres() or not inspect(engine).has_table(_TABLE):
+        return
+    with engine.begin() as conn:
+        kind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :t AND relkind IN ('r', 'p')"),
+            {"t": _TABLE},
+        ).scalar()
+        if kind != "r":
+            return
+        conn.execute(text(f"ALTER TABLE {_TABLE} RENAME TO {_LEGACY_TABLE}"))
+        indexes = conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :t"), {"t": _LEGACY_TABLE},
+        ).scalars().all()
+        for index in indexes:
+            conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"'))
+        sequence = conn.execute(
+            text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": _LEGACY_TABLE},
+        ).scalar()
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {_LEGACY_TABLE}_id_seq"))
+
+
+def migrate_legacy_table() -> int:
+    """
+    Copy the rows of a detached query_logs_legacy into the partitioned
+    table, keeping their ids, then drop it. Returns the rows copied.
+    """
+    if not _is_postgres() or not inspect(engine).has_table(_LEGACY_TABLE):
+        return 0
+    columns = ", ".join(c.name for c in QueryLog.__table__.columns if c.name != "queried_at")
+    queried_at = "COALESCE(queried_at, now() AT TIME ZONE 'utc')"
+    with engine.begin() as conn:
+        months = conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', {queried_at}) FROM {_LEGACY_TABLE}"
+        )).scalars().all()
+        for month in months:
+            _create_partition(conn, month)
+        copied = conn.execute(text(
+            f"INSERT INTO {_TABLE} ({columns}, queried_at) "
+            f"SELECT {columns}, {queried_at} FROM {_LEGACY_TABLE}"
+        )).rowcount
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{_TABLE}', 'id'), "
+            f"GREATEST((SELECT MAX(id) FROM {_TABLE}), 1))"
+        ))
+        conn.execute(text(f"DROP TABLE {_LEGACY_TABLE}"))
+    return copied
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Rollups
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _upsert(conn, model, rows_select) -> int:
+    stmt = insert(model).from_select(["bucket", *_ROLLUP_COLUMNS, "refreshed_at"], rows_select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.bucket],
+        set_={name: stmt.excluded[name] for name in (*_ROLLUP_COLUMNS, "refreshed_at")},
+    )
+    return conn.execute(stmt).rowcount
+
+
+def refresh_rollups() -> dict:
+    """
+    Re-aggregate query_logs into the hourly rollup from the hour before the
+    latest stored one, then those hours into the daily rollup.
+    Returns {"hours": int, "days": int} — the buckets written.
+    """
+    now = datetime.datetime.utcnow()
+    with engine.begin() as conn:
+        latest = conn.execute(select(func.max(QueryLogHourly.bucket))).scalar()
+        since = latest - datetime.timedelta(hours=1) if latest else None
+
+        hour = func.date_trunc("hour", QueryLog.queried_at)
+        hourly = select(
+            hour,
+            func.count(),
+            func.count().filter(QueryLog.confidence == "High"),
+            func.count().filter(QueryLog.confidence == "Low"),
+            func.count().filter(QueryLog.is_helpful.is_(True)),
+            func.coalesce(func.sum(QueryLog.eval_score), 0.0),
+            func.count(QueryLog.eval_score),
+            func.coalesce(func.sum(QueryLog.num_sources), 0),
+            literal(now),
+        ).group_by(hour)
+        if since is not None:
+            hourly = hourly.where(QueryLog.queried_at >= since)
+        hours = _upsert(conn, QueryLogHourly, hourly)
+
+        day = func.date_trunc("day", QueryLogHourly.bucket)
+        daily = select(
+            day,
+            *(func.sum(getattr(QueryLogHourly, name)) for name in _ROLLUP_COLUMNS),
+            literal(now),
+        ).group_by(day)
+        if since is not None:
+            daily = daily.where(QueryLogHourly.bucket >= since.replace(hour=0))
+        days = _upsert(conn, QueryLogDaily, daily)
+    return {"hours": hours, "days": days}
+
+
+def maintain() -> dict:
+    """
+    Periodic upkeep (API and ingest_worker): create upcoming partitions,
+    refresh the rollups, then drop partitions past retention. Returns at
+    once, with skipped=True, while another process is doing the same.
+    """
+    stats = {"hours": 0, "days": 0, "dropped": [], "skipped": False}
+    if not _is_postgres():
+        return stats
+    with engine.connect() as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _MAINTENANCE_LOCK}).scalar():
+            stats["skipped"] = True
+            return stats
+        try:
+            ensure_partitions()
+            stats.update(refresh_rollups())
+            stats["dropped"] = drop_expired_partitions()
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _MAINTENANCE_LOCK})
+            lock_conn.commit()
+    return stats
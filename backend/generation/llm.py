@@ -1,9 +1,9 @@
-import ollama
+from config.database import ollama_client
 from config.settings import settings
 
 class GeneratorLLM:
     @staticmethod
-    def generate(query: str, assembled_context: str, previous_feedback: str = "") -> str:
+    async def generate(query: str, assembled_context: str, previous_feedback: str = "") -> str:
         """Generates an answer to the legal query using context."""
         
         system_prompt = """You are a legal research assistant. Answer the user's question using ONLY
@@ -21,7 +21,7 @@ QUESTION:
             prompt += f"\nPREVIOUS FEEDBACK TO FIX:\n{previous_feedback}\n"
 
         try:
-            response = ollama.chat(
+            response = await ollama_client.chat(
                 model=settings.GENERATION_MODEL,
                 messages=[
                     {'role': 'system', 'content': system_prompt},
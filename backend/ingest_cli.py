@@ -9,15 +9,25 @@ through the one public function here: ingest_file().
 What ingest_file() does, in order
 ───────────────────────────────────
   1.  Resolve / create a CaseRecord in PostgreSQL (client DB only)
-  2.  Duplicate check  — skip if same filename+target_db already succeeded
-                         (override with overwrite=True)
-  3.  Organise storage — copy/write file to FILE_STORAGE_DIR/<db>/<case_id>/
-  4.  Register row     — write PENDING row to PostgreSQL with BYTEA file content
-  5.  Parse            — extract raw text from PDF / DOCX / TXT
-  6.  Metadata         — call LLM to extract structured metadata
-  7.  Chunk            — split text into sections
-  8.  Embed & store    — generate embeddings → ChromaDB
-  9.  Mark result      — update PostgreSQL row to SUCCESS or FAILED
+  2.  Duplicate check  — skip if the same content (SHA-256) already succeeded
+                         in this target_db / case (override with overwrite=True)
+  3.  Store bytes      — once, in the content-addressed blob store
+                         (FILE_STORAGE_DIR/blobs, ingestion/blob_store.py)
+  4.  Register row     — write PENDING row to PostgreSQL with the content hash
+  5.  Parse + chunk    — extract raw text from PDF / DOCX / TXT, split into sections
+  6.  Metadata         — regex rules (+ cached LLM metadata when available)
+  7.  Embed & store    — generate embeddings → ChromaDB
+  8.  Mark result      — update PostgreSQL row to SUCCESS or FAILED, with the
+                         per-stage timings in ingest_metrics
+  9.  Enrich           — queue the LLM metadata pass for ingest_worker, which
+                         patches the chunks' metadata (METADATA_LLM_MODE)
+
+Steps 5 and 7 are one stream: chunks are cut as they are embedded, a batch
+at a time, so neither the text nor the chunk list of a document is held
+whole. The metadata and every committed embedding batch are checkpointed
+(ingestion/checkpoints.py); with resume=True / --resume an interrupted
+ingestion of the same bytes skips steps 3, 4 and 6 and embeds only what is
+missing.
 
 CLI usage
 ──────────
@@ -25,26 +35,45 @@ CLI usage
   python ingest_cli.py --db cases --folder /path/to/case_docs/
   python ingest_cli.py --db client --file brief.docx --case-id CASE-2024-001
   python ingest_cli.py --db law   --file statute.pdf --overwrite
+  python ingest_cli.py --db law   --file statute.pdf --resume
+  python ingest_cli.py --db law   --rechunk --max-tokens 400 --workers 8
+  python ingest_cli.py --db law   --reembed
+  python ingest_cli.py --db cases --folder /path/to/judgments/ --workers 8
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime
+import hashlib
+import json
 import os
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 from ingestion.parser import DocumentParser
 from ingestion.chunker import SectionAwareChunker
 from ingestion.metadata import MetadataExtractor
 from ingestion.embedder import DocumentEmbedder
+from ingestion.embedding_cache import embedding_space
+from ingestion.ingest_metrics import IngestionMetrics
 from config.settings import settings
 from config.postgres import (
     SessionLocal,
     IngestedFile,
+    CaseFile,
     CaseRecord,
+    DocumentText,
     IngestionStatus,
+    JobType,
     TargetDB,
 )
+from ingestion import blob_store, checkpoints, job_queue, text_store
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -60,6 +89,9 @@ MIME_MAP = {
     ".txt":  "text/plain",
 }
 
+# MetadataExtractor only looks at the first page or so of a document
+METADATA_HEAD_CHARS = 2000
+
 DB_MAPPING: dict[str, tuple[str, TargetDB]] = {
     "law":    (settings.LAW_DB_NAME,    TargetDB.law),
     "cases":  (settings.CASES_DB_NAME,  TargetDB.cases),
@@ -81,63 +113,338 @@ def _get_or_create_case(db_session, case_id: str) -> CaseRecord:
     return record
 
 
-def _is_already_ingested(db_session, filename: str, target_db: TargetDB) -> bool:
+def resolve_case(case_id: str) -> int:
+    """
+    Get or create the CaseRecord for case_id and commit it; returns its id.
+    Run once before ingesting files concurrently (ingest_cli --workers), so
+    the workers never race to create the same case.
+    """
+    db_session = SessionLocal()
+    try:
+        record = _get_or_create_case(db_session, case_id)
+        db_session.commit()
+        return record.id
+    finally:
+        db_session.close()
+
+
+def _find_duplicate(
+    db_session,
+    content_sha256: str,
+    target_db: TargetDB,
+    case_record: CaseRecord | None,
+) -> IngestedFile | None:
     """
-    True if a file with this exact original_filename in this target_db
-    was already successfully ingested.
-    Matches on filename + collection so HTTP uploads (no fixed path) are caught too.
+    Return the successfully ingested file with these exact bytes in this
+    target_db (and client case, if any), or None.
+    Matches on content rather than filename, so a renamed copy is caught and
+    an edited file that kept its name is ingested again.
     """
     return (
-        db_session.query(IngestedFile)
+        db_session.query(IngestedFile.id)
         .filter_by(
-            original_filename=filename,
+            content_sha256=content_sha256,
             target_db=target_db,
             status=IngestionStatus.success,
+            case_record_id=case_record.id if case_record else None,
+        )
+        .first()
+    )
+
+
+def _previous_version(
+    db_session,
+    original_filename: str,
+    target_db: TargetDB,
+    case_record: CaseRecord | None,
+) -> IngestedFile | None:
+    """
+    overwrite=True: the latest row of this filename in this target_db (and
+    client case) — the logical file being replaced, re-ingested in place.
+    """
+    return (
+        db_session.query(IngestedFile)
+        .filter_by(
+            original_filename=original_filename,
+            target_db=target_db,
+            case_record_id=case_record.id if case_record else None,
+        )
+        .order_by(IngestedFile.id.desc())
+        .first()
+    )
+
+
+def _unfinished_row(
+    db_session,
+    content_sha256: str,
+    target_db: TargetDB,
+    case_record: CaseRecord | None,
+) -> IngestedFile | None:
+    """resume=True: the latest row holding these bytes that never succeeded."""
+    return (
+        db_session.query(IngestedFile)
+        .filter(
+            IngestedFile.content_sha256 == content_sha256,
+            IngestedFile.target_db == target_db,
+            IngestedFile.case_record_id == (case_record.id if case_record else None),
+            IngestedFile.status != IngestionStatus.success,
         )
+        .order_by(IngestedFile.id.desc())
         .first()
-    ) is not None
+    )
+
+
+def _doc_id(target_db_key: str, file_id: int) -> str:
+    """
+    Identity of a document's chunks (manifest, checkpoint, stored text):
+    its IngestedFile row, so two files that share a name never share — and
+    delete — each other's vectors. A new version is diffed against the
+    old one's manifest by re-ingesting the old row: overwrite=True, file_id
+    (POST /api/upload replaces_file_id) or resume.
+    """
+    return f"{target_db_key}/file/{file_id}"
+
+
+def _case_file_doc_id(file_id: int) -> str:
+    """
+    Keyed by the CaseFile row: two files of one case that share a filename
+    are separate documents, and never replace each other's chunks. An
+    amended upload (POST /api/upload-file replaces_file_id / overwrite) is
+    stored on the row it replaces, so it is diffed against the old chunks.
+    """
+    return f"case_file/{file_id}"
+
+
+def _initial_metadata(
+    text_head: str,
+    manual_meta: dict,
+    metadata_slots: threading.Semaphore | None = None,
+) -> tuple[dict, bool]:
+    """
+    Metadata available before embedding: the regex fields, plus the LLM's
+    fields when they are cached or METADATA_LLM_MODE is "inline".
+    Returns (metadata, needs_enrichment).
+    """
+    rules_meta = MetadataExtractor.extract_with_rules(text_head)
+    mode = settings.METADATA_LLM_MODE
+    llm_meta = None
+    if mode != "off":
+        llm_meta = MetadataExtractor.cached_llm_metadata(text_head, settings.JUDGE_MODEL)
+        if llm_meta is None and mode == "inline":
+            with metadata_slots or contextlib.nullcontext():
+                llm_meta = MetadataExtractor.extract_with_llm(text_head, settings.JUDGE_MODEL)
+
+    extracted_meta = {**rules_meta, **MetadataExtractor.llm_fields(llm_meta or {}, manual_meta)}
+    final_meta = MetadataExtractor.merge_metadata(extracted_meta, manual_meta)
+    return final_meta, mode == "deferred" and llm_meta is None
+
+
+def _queue_enrichment(db_session, db_name: str, doc_id: str, text_head: str, manual_meta: dict) -> None:
+    """Hand the slow LLM metadata pass to ingest_worker; the document is already searchable."""
+    try:
+        job = job_queue.enqueue(
+            db_session,
+            JobType.enrich_metadata,
+            payload={
+                "db_name": db_name,
+                "doc_id": doc_id,
+                "text_head": text_head,
+                "manual_meta": manual_meta,
+            },
+        )
+        print(f"  Queued LLM metadata enrichment (job {job.id})")
+    except Exception as e:
+        db_session.rollback()
+        print(f"  Could not queue metadata enrichment for {doc_id}: {e}")
+
+
+class _ChunkStream:
+    """
+    One document's chunks, cut lazily as they are iterated: embed_and_store
+    pulls them batch by batch straight from the parser, so neither the text
+    nor the chunk list is ever held whole. On the way it keeps what the rest
+    of the pipeline needs — the head of the text (for metadata), each
+    chunk's offsets (for the text store), the seconds spent parsing and
+    chunking, and the text zlib-compressed as it streamed by.
+
+    In a parse_pool process, spool() cuts every chunk there into a temporary
+    file instead, and the pickled stream reads them back from it.
+    """
+
+    def __init__(
+        self,
+        segments,
+        doc_type: str,
+        max_tokens: int | None = None,
+        overlap: int | None = None,
+        pack: bool = True,
+    ):
+        self.parse_seconds = 0.0
+        self.chunk_seconds = 0.0
+        self.bounds: list[list[int]] = []
+        self.text_zlib: bytes | None = None
+        self.finished = False
+        self._head: list[str] = []
+        self._head_len = 0
+        self._has_text = False
+        self._packer = text_store.TextPacker() if pack else None
+        self._chunks = SectionAwareChunker.iter_chunks(self._tee(segments), doc_type, max_tokens, overlap)
+        self._buffered: deque = deque()
+        self._spool_path: str | None = None
 
+    def _tee(self, segments):
+        segments = iter(segments)
+        while True:
+            started = time.perf_counter()
+            segment = next(segments, None)
+            self.parse_seconds += time.perf_counter() - started
+            if segment is None:
+                return
+            if self._head_len < METADATA_HEAD_CHARS:
+                self._head.append(segment[:METADATA_HEAD_CHARS - self._head_len])
+                self._head_len += len(self._head[-1])
+            self._has_text = self._has_text or bool(segment.strip())
+            if self._packer is not None:
+                self._packer.add(segment)
+            yield segment
 
-def _resolve_storage_path(filename: str, target_db_key: str, case_id: str | None) -> str:
+    def _cut(self) -> dict | None:
+        """The next chunk, or None once the text is exhausted."""
+        if self.finished:
+            return None
+        started = time.perf_counter()
+        parsed = self.parse_seconds
+        chunk = next(self._chunks, None)
+        self.chunk_seconds += time.perf_counter() - started - (self.parse_seconds - parsed)
+        if chunk is None:
+            self.finished = True
+            self._chunks = None
+            if not self._has_text:
+                raise ValueError("Extracted text is empty after parsing.")
+            if self._packer is not None:
+                self.text_zlib = self._packer.finish()
+                self._packer = None
+            return None
+        meta = chunk["metadata"]
+        self.bounds.append([meta["start_offset"], meta["end_offset"]])
+        return chunk
+
+    @property
+    def count(self) -> int:
+        """Chunks cut so far; all of them once finished."""
+        return len(self.bounds)
+
+    def read_head(self) -> str:
+        """
+        The start of the text the metadata extractor reads. Parses ahead
+        until it is complete, keeping the chunks cut meanwhile for __iter__;
+        raises ValueError if the document has no text at all.
+        """
+        while not self.finished and (self._head_len < METADATA_HEAD_CHARS or not self._has_text):
+            chunk = self._cut()
+            if chunk is not None:
+                self._buffered.append(chunk)
+        return "".join(self._head)
+
+    def __iter__(self):
+        if self._spool_path is not None:
+            try:
+                with open(self._spool_path, encoding="utf-8") as fh:
+                    for line in fh:
+                        yield json.loads(line)
+            finally:
+                self.close()
+            return
+        while self._buffered:
+            yield self._buffered.popleft()
+        while (chunk := self._cut()) is not None:
+            yield chunk
+
+    def spool(self) -> "_ChunkStream":
+        """Cut every chunk now, into a temporary file; returns self, ready to pickle."""
+        fd, path = tempfile.mkstemp(prefix="chunks-", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                for chunk in self:
+                    fh.write(json.dumps(chunk) + "\n")
+        except BaseException:
+            os.remove(path)
+            raise
+        self._spool_path = path
+        return self
+
+    def close(self) -> None:
+        """Stop parsing and remove the spool file, if any; safe to call twice."""
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+            self.finished = True
+        if self._spool_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(self._spool_path)
+            self._spool_path = None
+
+    def record(self, metrics: IngestionMetrics, bytes_parsed: int) -> None:
+        """Book the parse and chunk stages, once the stream is exhausted."""
+        metrics.add("parse", self.parse_seconds)
+        metrics.add("chunk", self.chunk_seconds)
+        metrics.count("bytes_parsed", bytes_parsed)
+        metrics.count("chunks", self.count)
+
+
+def _parse_and_chunk(
+    file_bytes: bytes,
+    filename: str,
+    target_db_name: str,
+    page_workers: int | None = None,
+    spool: bool = False,
+) -> _ChunkStream:
     """
-    Return the full destination path inside FILE_STORAGE_DIR:
-        FILE_STORAGE_DIR/law/statute.pdf
-        FILE_STORAGE_DIR/client/CASE-007/brief.pdf
-    Appends a timestamp suffix if the path already exists.
+    CPU-bound stage: parse the bytes already in memory and stream the pages
+    straight into the chunker, so the full text is never assembled and the
+    file is never written out and read back just to be parsed.
+    Top-level so it can run in a ProcessPoolExecutor, with spool=True: the
+    chunks then come back through a temporary file, not the pickled result.
     """
-    dest_dir = os.path.join(settings.FILE_STORAGE_DIR, target_db_key)
-    if case_id:
-        dest_dir = os.path.join(dest_dir, case_id)
-    os.makedirs(dest_dir, exist_ok=True)
+    stream = _ChunkStream(DocumentParser.iter_file(file_bytes, filename, page_workers), target_db_name)
+    return stream.spool() if spool else stream
 
-    dest_path = os.path.join(dest_dir, filename)
-    if os.path.exists(dest_path):
-        ts = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        name, ext = os.path.splitext(filename)
-        dest_path = os.path.join(dest_dir, f"{name}_{ts}{ext}")
 
-    return dest_path
+def _chunk_stored_text(
+    text_zlib: bytes,
+    target_db_name: str,
+    max_tokens: int | None = None,
+    overlap: int | None = None,
+    spool: bool = False,
+) -> _ChunkStream:
+    """
+    CPU-bound stage of --rechunk: chunk a document from the text store, as
+    it is decompressed. Top-level so it can run in a ProcessPoolExecutor.
+    """
+    stream = _ChunkStream(text_store.iter_unpack(text_zlib), target_db_name, max_tokens, overlap, pack=False)
+    return stream.spool() if spool else stream
 
 
 def _register_pg_row(
     db_session,
     original_filename: str,
-    dest_path: str,
     file_bytes: bytes,
+    content_sha256: str,
     target_db: TargetDB,
     case_record: CaseRecord | None,
 ) -> IngestedFile:
     """
-    Insert an IngestedFile row (status=PENDING) with the raw file bytes
-    stored in the PostgreSQL BYTEA column.  Flushes but does not commit.
+    Store the bytes in the blob store and insert an IngestedFile row
+    (status=PENDING) referring to them.  Flushes but does not commit.
     """
     ext = os.path.splitext(original_filename)[1].lower()
+    blob_store.put(db_session, file_bytes, content_sha256)
     row = IngestedFile(
         original_filename=original_filename,
-        stored_path=dest_path,
+        stored_path=blob_store.blob_path(content_sha256),
         mime_type=MIME_MAP.get(ext, "application/octet-stream"),
         file_size_bytes=len(file_bytes),
-        file_data=file_bytes,           # ← raw file stored in PostgreSQL BYTEA
+        content_sha256=content_sha256,
         target_db=target_db,
         status=IngestionStatus.pending,
         case_record_id=case_record.id if case_record else None,
@@ -147,6 +454,34 @@ def _register_pg_row(
     return row
 
 
+def _reset_pg_row(
+    db_session,
+    row: IngestedFile,
+    original_filename: str,
+    file_bytes: bytes,
+    content_sha256: str,
+) -> None:
+    """
+    Point an existing row at new bytes for a fresh ingestion (overwrite):
+    moves its blob reference if the content changed. Flushes, no commit.
+    """
+    if row.content_sha256 != content_sha256:
+        blob_store.put(db_session, file_bytes, content_sha256)
+        if row.content_sha256:
+            blob_store.release(db_session, row.content_sha256)
+    ext = os.path.splitext(original_filename)[1].lower()
+    row.original_filename = original_filename
+    row.stored_path = blob_store.blob_path(content_sha256)
+    row.mime_type = MIME_MAP.get(ext, "application/octet-stream")
+    row.file_size_bytes = len(file_bytes)
+    row.content_sha256 = content_sha256
+    row.status = IngestionStatus.pending
+    row.error_message = None
+    row.chunk_count = None
+    row.ingested_at = None
+    db_session.flush()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # PUBLIC — unified pipeline called by every entry point
 # ──────────────────────────────────────────────────────────────────────────────
@@ -158,6 +493,15 @@ def ingest_file(
     src_path: str | None = None,
     case_id: str | None = None,
     overwrite: bool = False,
+    content_sha256: str | None = None,
+    parse_pool: Executor | None = None,
+    metadata_slots: threading.Semaphore | None = None,
+    embed_slots: threading.Semaphore | None = None,
+    on_progress: Callable[[str], None] | None = None,
+    resume: bool = False,
+    case_record_id: int | None = None,
+    file_id: int | None = None,
+    on_registered: Callable[[int], None] | None = None,
 ) -> dict:
     """
     The single ingestion function used by ALL callers:
@@ -169,14 +513,47 @@ def ingest_file(
     Pipeline
     ────────
       1. Read bytes (from memory or disk)
-      2. Duplicate check against PostgreSQL  — skip if already succeeded
-      3. Write file to FILE_STORAGE_DIR/<db>/<case_id>/
-      4. Insert PENDING row + raw bytes (BYTEA) into PostgreSQL
-      5. Parse text from file
+      2. Duplicate check against PostgreSQL  — skip if the same bytes
+         (SHA-256) already succeeded
+      3. Store the bytes in the blob store (once per distinct content)
+      4. Insert PENDING row + content hash into PostgreSQL — or, with
+         overwrite=True, reset the latest row of the same filename, whose
+         chunks are then diffed and replaced in place
+      5. Parse + chunk text (from the in-memory bytes)
       6. LLM metadata extraction
-      7. Chunk text
-      8. Embed chunks → ChromaDB
-      9. Mark row SUCCESS or FAILED in PostgreSQL
+      7. Embed chunks → ChromaDB
+      8. Mark row SUCCESS or FAILED in PostgreSQL
+
+    Parallel mode (ingest_cli --workers N)
+    ──────────────────────────────────────
+      parse_pool      – executor (a process pool) for CPU-bound parse + chunk
+      metadata_slots  – semaphore bounding concurrent inline LLM metadata calls
+      embed_slots     – semaphore bounding concurrent embed + upsert stages
+    All three default to None, which runs every stage inline.
+
+    content_sha256 may be passed when the caller already hashed the bytes
+    (POST /api/upload hashes while the upload streams in).
+
+    on_progress, when given, is called with the name of each stage as it
+    starts (used by ingest_worker to report job progress).
+
+    case_record_id is the CaseRecord of case_id when the caller has already
+    resolved it (resolve_case); otherwise it is looked up or created here.
+
+    file_id re-ingests that IngestedFile row instead of registering a new
+    one; on_registered is called with the row's id once it is committed.
+    ingest_worker uses the pair so that every attempt of a job works on the
+    row its first attempt created, and POST /api/upload passes the row an
+    amended upload replaces (replaces_file_id): the new bytes are diffed
+    against that row's chunks under the same doc_id.
+
+    resume=True continues an interrupted ingestion of the same bytes from its
+    checkpoint: the unfinished row, metadata and committed embedding batches
+    are reused (ingest_cli --resume, ingest_worker retries).
+
+    Wall time per stage, peak memory and embedding throughput are stored on
+    the row's ingest_metrics column (see ingestion/ingest_metrics.py) and
+    returned as "metrics".
 
     Returns
     ───────
@@ -184,8 +561,9 @@ def ingest_file(
             "success": bool,
             "chunks":  int,
             "error":   str | None,
-            "file_id": int | None,   # PostgreSQL row id
+            "file_id": int | None,   # PostgreSQL row id (the original's, if skipped)
             "skipped": bool,         # True when duplicate was detected
+            "metrics": dict | None,  # ingest_metrics record (None if skipped)
         }
     """
     # ── 1. Resolve bytes ──────────────────────────────────────────────────────
@@ -199,6 +577,9 @@ def ingest_file(
         with open(src_path, "rb") as fh:
             file_bytes = fh.read()
 
+    if content_sha256 is None:
+        content_sha256 = hashlib.sha256(file_bytes).hexdigest()
+
     if target_db_key not in DB_MAPPING:
         return {
             "success": False, "chunks": 0,
@@ -207,79 +588,166 @@ def ingest_file(
         }
 
     target_db_name, target_db_enum = DB_MAPPING[target_db_key]
+    report = on_progress or (lambda stage: None)
+    metrics = IngestionMetrics()
     db_session = SessionLocal()
+    file_row = None
+    chunks = None
 
     try:
         # ── 2. Case record (client DB only) ───────────────────────────────────
         case_record = None
-        if case_id:
+        if case_record_id is not None:
+            case_record = db_session.get(CaseRecord, case_record_id)
+        elif case_id:
             case_record = _get_or_create_case(db_session, case_id)
 
         # ── 3. Duplicate check ────────────────────────────────────────────────
-        if not overwrite and _is_already_ingested(db_session, original_filename, target_db_enum):
-            print(f"  ⚠  '{original_filename}' already ingested in '{target_db_key}' — skipping.")
-            return {"success": True, "chunks": 0, "error": None, "file_id": None, "skipped": True}
-
-        # ── 4. Organise on-disk storage ───────────────────────────────────────
-        dest_path = _resolve_storage_path(original_filename, target_db_key, case_id)
-        with open(dest_path, "wb") as fh:
-            fh.write(file_bytes)
-        print(f"  Saved to disk → {dest_path}")
-
-        # ── 5. Register PENDING row in PostgreSQL + store BYTEA ───────────────
-        file_row = _register_pg_row(
-            db_session, original_filename, dest_path,
-            file_bytes, target_db_enum, case_record,
-        )
-        file_row.status = IngestionStatus.processing
-        db_session.commit()
-        print(f"  Registered in PostgreSQL (file_id={file_row.id}, {len(file_bytes):,} bytes)")
-
-        # ── 6. Parse text ─────────────────────────────────────────────────────
-        text = DocumentParser.parse_file(dest_path)
-        if not text.strip():
-            raise ValueError("Extracted text is empty after parsing.")
+        if not overwrite and file_id is None:
+            duplicate = _find_duplicate(db_session, content_sha256, target_db_enum, case_record)
+            if duplicate is not None:
+                print(f"  ⚠  '{original_filename}' already ingested in '{target_db_key}' "
+                      f"(file_id={duplicate.id}, same content) — skipping.")
+                metrics.finish()
+                return {
+                    "success": True, "chunks": 0, "error": None,
+                    "file_id": duplicate.id, "skipped": True, "metrics": None,
+                }
 
-        # ── 7. LLM metadata extraction ────────────────────────────────────────
-        extracted_meta = MetadataExtractor.extract_with_llm(text, settings.JUDGE_MODEL)
         manual_meta: dict = {"source_file": original_filename}
         if case_id:
             manual_meta["client_case_id"] = case_id
-        final_meta = MetadataExtractor.merge_metadata(extracted_meta, manual_meta)
 
-        # ── 8. Chunk ──────────────────────────────────────────────────────────
-        chunks = SectionAwareChunker.chunk_document(text, doc_type=target_db_name)
-        print(f"  Created {len(chunks)} chunks")
+        # An existing row is re-ingested in place: the file being overwritten,
+        # or the unfinished ingestion being resumed
+        if file_id is not None:
+            file_row = db_session.get(IngestedFile, file_id)
+        elif overwrite:
+            file_row = _previous_version(db_session, original_filename, target_db_enum, case_record)
+        elif resume:
+            file_row = _unfinished_row(db_session, content_sha256, target_db_enum, case_record)
+
+        checkpoint = None
+        if file_row is not None and resume:
+            checkpoint = checkpoints.load(
+                db_session, target_db_name, _doc_id(target_db_key, file_row.id), content_sha256,
+            )
+            if checkpoint is not None and checkpoint.file_id != file_row.id:
+                checkpoint = None
+
+        if checkpoint is not None:
+            # ── 4–5. Resume: row and metadata from the checkpoint ─────────────
+            doc_id = _doc_id(target_db_key, file_row.id)
+            final_meta, text_head, enrich_later = checkpoints.resumed(db_session, checkpoint)
+            file_row.status = IngestionStatus.processing
+            file_row.error_message = None
+            db_session.commit()
+            metrics.count("resumed")
+            print(f"  Resuming file_id={file_row.id} — {checkpoint.chunks_committed}/"
+                  f"{checkpoint.chunks_total} chunks already committed")
+        else:
+            # ── 4–5. Blob store + PENDING row in PostgreSQL ───────────────────
+            with metrics.stage("store"):
+                if file_row is None:
+                    file_row = _register_pg_row(
+                        db_session, original_filename,
+                        file_bytes, content_sha256, target_db_enum, case_record,
+                    )
+                else:
+                    _reset_pg_row(db_session, file_row, original_filename, file_bytes, content_sha256)
+                file_row.status = IngestionStatus.processing
+                db_session.commit()
+            doc_id = _doc_id(target_db_key, file_row.id)
+            if on_registered is not None:
+                on_registered(file_row.id)
+            print(f"  Registered in PostgreSQL (file_id={file_row.id}, {len(file_bytes):,} bytes "
+                  f"→ {file_row.stored_path})")
+
+        # ── 6. Parse + chunk (CPU-bound; runs in parse_pool when given) ──────
+        # Chunks are cut as step 8 embeds them; a parse_pool cuts them all
+        # up front and hands them back through a spool file.
+        report("parsing")
+        metrics.current_stage = "parse"
+        if parse_pool is not None:
+            # Files are already parallel across the pool; don't nest page pools
+            chunks = parse_pool.submit(
+                _parse_and_chunk, file_bytes, original_filename, target_db_name, 1, True,
+            ).result()
+        else:
+            chunks = _parse_and_chunk(file_bytes, original_filename, target_db_name)
+
+        if checkpoint is None:
+            # ── 7. Metadata (rules now; LLM now only if cached or inline) ────
+            text_head = chunks.read_head()
+            report("extracting metadata")
+            with metrics.stage("metadata"):
+                final_meta, enrich_later = _initial_metadata(text_head, manual_meta, metadata_slots)
+            checkpoints.save(
+                db_session, target_db_name, doc_id, content_sha256, file_row.id,
+                final_meta, text_head, enrich_later,
+            )
 
-        # ── 9. Embed & store → ChromaDB ───────────────────────────────────────
-        DocumentEmbedder.embed_and_store(chunks, target_db_name, final_meta)
+        # ── 8. Embed & store → ChromaDB (checkpointed per batch) ──────────────
+        report("embedding")
+        metrics.current_stage = "embed"
+
+        def committed(done: int, total: int) -> None:
+            checkpoints.record_progress(target_db_name, doc_id, done, total)
+            report(f"embedding {done}/{total}")
+
+        with embed_slots or contextlib.nullcontext():
+            chunk_count = DocumentEmbedder.embed_and_store(
+                chunks, target_db_name, final_meta, doc_id=doc_id,
+                metrics=metrics, on_checkpoint=committed,
+            )
+        chunks.record(metrics, len(file_bytes))
+        text_store.save(
+            db_session, target_db_name, doc_id, content_sha256,
+            text_store.SOURCE_INGESTED_FILES, file_row.id, manual_meta,
+            chunks.text_zlib, chunks.bounds, SectionAwareChunker.config_signature(),
+        )
 
-        # ── 10. Mark SUCCESS in PostgreSQL ────────────────────────────────────
+        # ── 9. Mark SUCCESS in PostgreSQL ─────────────────────────────────────
         file_row.status = IngestionStatus.success
-        file_row.chunk_count = len(chunks)
+        file_row.chunk_count = chunk_count
         file_row.ingested_at = datetime.datetime.utcnow()
+        file_row.ingest_metrics = metrics.finish()
+        checkpoints.clear(db_session, target_db_name, doc_id)
         db_session.commit()
+        print(f"  Timings: {metrics.summary_line()}")
+
+        # ── 10. Deferred LLM metadata ─────────────────────────────────────────
+        if enrich_later:
+            _queue_enrichment(db_session, target_db_name, doc_id, text_head, manual_meta)
 
         return {
             "success": True,
-            "chunks": len(chunks),
+            "chunks": chunk_count,
             "error": None,
             "file_id": file_row.id,
             "skipped": False,
+            "metrics": file_row.ingest_metrics,
         }
 
     except Exception as exc:
         db_session.rollback()
+        record = metrics.finish(failed=True)
         try:
-            if "file_row" in locals():
+            if file_row is not None:
                 file_row.status = IngestionStatus.failed
                 file_row.error_message = str(exc)[:1024]
+                file_row.ingest_metrics = record
                 db_session.commit()
         except Exception:
             db_session.rollback()
-        return {"success": False, "chunks": 0, "error": str(exc), "file_id": None, "skipped": False}
+        return {
+            "success": False, "chunks": 0, "error": str(exc),
+            "file_id": None, "skipped": False, "metrics": record,
+        }
 
     finally:
+        if chunks is not None:
+            chunks.close()
         db_session.close()
 
 
@@ -293,6 +761,8 @@ def ingest_case_file(
     file_bytes: bytes,
     case_id: int,
     db_session,
+    on_progress: Callable[[str], None] | None = None,
+    resume: bool = False,
 ) -> dict:
     """
     Ingest a case file from the new case_file_table into ChromaDB.
@@ -308,97 +778,306 @@ def ingest_case_file(
         file_bytes : Raw file content
         case_id    : ID of the parent Case
         db_session : Active SQLAlchemy session
+        on_progress: Optional callback receiving each stage name
+        resume     : Continue from this file's checkpoint, as in ingest_file()
     
+    Stage timings are stored on the row's ingest_metrics column, as in
+    ingest_file().
+
     Returns
     ───────
         {
             "success": bool,
             "chunks":  int,
             "error":   str | None,
+            "metrics": dict | None,
         }
     """
     from config.postgres import CaseFile, IngestionStatus
-    
+
+    report = on_progress or (lambda stage: None)
+    metrics = IngestionMetrics()
+    chunks = None
     try:
         # Get the CaseFile record
         case_file = db_session.query(CaseFile).filter(CaseFile.file_id == file_id).first()
         if not case_file:
-            return {"success": False, "chunks": 0, "error": f"CaseFile {file_id} not found"}
+            metrics.finish()
+            return {"success": False, "chunks": 0, "error": f"CaseFile {file_id} not found", "metrics": None}
         
         # Update status to processing
         case_file.status = IngestionStatus.processing
         db_session.commit()
         
-        # Save to temporary file for parsing
-        ext = os.path.splitext(filename)[1].lower()
-        temp_path = os.path.join(settings.FILE_STORAGE_DIR, f"temp_{file_id}{ext}")
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            f.write(file_bytes)
-        
-        try:
-            # ── Parse text ────────────────────────────────────────────────────
-            text = DocumentParser.parse_file(temp_path)
-            if not text.strip():
-                raise ValueError("Extracted text is empty after parsing.")
-            
-            # ── LLM metadata extraction ───────────────────────────────────────
-            extracted_meta = MetadataExtractor.extract_with_llm(text, settings.JUDGE_MODEL)
-            manual_meta: dict = {
-                "source_file": filename,
-                "case_file_id": file_id,
-                "case_id": str(case_id),
-                "client_case_id": str(case_id),
-            }
-            final_meta = MetadataExtractor.merge_metadata(extracted_meta, manual_meta)
-            
-            # ── Chunk ─────────────────────────────────────────────────────────
-            target_db_name = settings.CLIENT_DB_NAME
-            chunks = SectionAwareChunker.chunk_document(text, doc_type=target_db_name)
-            print(f"  Created {len(chunks)} chunks for case_file_id={file_id}")
-            
-            # ── Embed & store → ChromaDB ──────────────────────────────────────
-            DocumentEmbedder.embed_and_store(chunks, target_db_name, final_meta)
-            
-            # ── Mark SUCCESS ──────────────────────────────────────────────────
-            case_file.status = IngestionStatus.success
-            case_file.chunk_count = len(chunks)
-            case_file.ingested_at = datetime.datetime.utcnow()
-            db_session.commit()
-            
-            return {
-                "success": True,
-                "chunks": len(chunks),
-                "error": None,
-            }
-        
-        finally:
-            # Cleanup temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-    
+        target_db_name = settings.CLIENT_DB_NAME
+        doc_id = _case_file_doc_id(file_id)
+        content_sha256 = case_file.content_sha256 or hashlib.sha256(file_bytes).hexdigest()
+        manual_meta: dict = {
+            "source_file": filename,
+            "case_file_id": file_id,
+            "case_id": str(case_id),
+            "client_case_id": str(case_id),
+        }
+
+        checkpoint = None
+        if resume:
+            checkpoint = checkpoints.load(db_session, target_db_name, doc_id, content_sha256)
+        if checkpoint is not None and checkpoint.file_id != file_id:
+            checkpoint = None
+
+        # ── Parse + chunk (straight from the bytes; cut as they are embedded) ─
+        report("parsing")
+        metrics.current_stage = "parse"
+        chunks = _parse_and_chunk(file_bytes, filename, target_db_name)
+
+        if checkpoint is not None:
+            # ── Resume: metadata from the checkpoint ──────────────────────────
+            final_meta, text_head, enrich_later = checkpoints.resumed(db_session, checkpoint)
+            metrics.count("resumed")
+            print(f"  Resuming case_file_id={file_id} — {checkpoint.chunks_committed}/"
+                  f"{checkpoint.chunks_total} chunks already committed")
+        else:
+            # ── Metadata (rules now; LLM now only if cached or inline) ────────
+            text_head = chunks.read_head()
+            report("extracting metadata")
+            with metrics.stage("metadata"):
+                final_meta, enrich_later = _initial_metadata(text_head, manual_meta)
+            checkpoints.save(
+                db_session, target_db_name, doc_id, content_sha256, file_id,
+                final_meta, text_head, enrich_later,
+            )
+
+        # ── Embed & store → ChromaDB (checkpointed per batch) ─────────────────
+        report("embedding")
+        metrics.current_stage = "embed"
+
+        def committed(done: int, total: int) -> None:
+            checkpoints.record_progress(target_db_name, doc_id, done, total)
+            report(f"embedding {done}/{total}")
+
+        chunk_count = DocumentEmbedder.embed_and_store(
+            chunks, target_db_name, final_meta, doc_id=doc_id,
+            metrics=metrics, on_checkpoint=committed,
+        )
+        chunks.record(metrics, len(file_bytes))
+        text_store.save(
+            db_session, target_db_name, doc_id, content_sha256,
+            text_store.SOURCE_CASE_FILES, file_id, manual_meta,
+            chunks.text_zlib, chunks.bounds, SectionAwareChunker.config_signature(),
+        )
+
+        # ── Mark SUCCESS ──────────────────────────────────────────────────────
+        case_file.status = IngestionStatus.success
+        case_file.chunk_count = chunk_count
+        case_file.ingested_at = datetime.datetime.utcnow()
+        case_file.ingest_metrics = metrics.finish()
+        checkpoints.clear(db_session, target_db_name, doc_id)
+        db_session.commit()
+        print(f"  Timings: {metrics.summary_line()}")
+
+        # ── Deferred LLM metadata ─────────────────────────────────────────────
+        if enrich_later:
+            _queue_enrichment(db_session, target_db_name, doc_id, text_head, manual_meta)
+
+        return {
+            "success": True,
+            "chunks": chunk_count,
+            "error": None,
+            "metrics": case_file.ingest_metrics,
+        }
+
     except Exception as exc:
         db_session.rollback()
+        record = metrics.finish(failed=True)
         try:
             if "case_file" in locals() and case_file:
                 case_file.status = IngestionStatus.failed
                 case_file.error_message = str(exc)[:1024]
+                case_file.ingest_metrics = record
                 db_session.commit()
         except Exception:
             db_session.rollback()
-        return {"success": False, "chunks": 0, "error": str(exc)}
+        return {"success": False, "chunks": 0, "error": str(exc), "metrics": record}
+
+    finally:
+        if chunks is not None:
+            chunks.close()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PUBLIC — re-chunk a stored document without parsing it again
+# ──────────────────────────────────────────────────────────────────────────────
+
+def rechunk_document(
+    text_id: int,
+    max_tokens: int | None = None,
+    overlap: int | None = None,
+    chunk_pool: Executor | None = None,
+    metadata_slots: threading.Semaphore | None = None,
+    embed_slots: threading.Semaphore | None = None,
+) -> dict:
+    """
+    Re-chunk one document from the text store (document_texts) with the
+    current chunker configuration — or max_tokens / overlap — and bring its
+    vectors in line. Chunk IDs are content-addressed, so chunks whose text
+    is unchanged keep their vectors (at most chunk_index is re-labelled) and
+    new chunk text is looked up in the embedding cache before Ollama.
+
+    Documents whose file is not successfully ingested are skipped.
+    chunk_pool / metadata_slots / embed_slots work as in ingest_file().
+
+    Returns
+    ───────
+        {"success": bool, "chunks": int, "error": str | None,
+         "doc_id": str | None, "skipped": bool}
+    """
+    db_session = SessionLocal()
+    doc_id = None
+    chunks = None
+    try:
+        row = db_session.get(DocumentText, text_id)
+        if row is None:
+            return {"success": False, "chunks": 0, "error": f"Stored text {text_id} not found",
+                    "doc_id": None, "skipped": False}
+        doc_id = row.doc_id
+
+        if row.source == text_store.SOURCE_CASE_FILES:
+            source_rows = db_session.query(CaseFile).filter(CaseFile.file_id == row.file_id)
+            status = db_session.query(CaseFile.status).filter(CaseFile.file_id == row.file_id).scalar()
+        else:
+            source_rows = db_session.query(IngestedFile).filter(IngestedFile.id == row.file_id)
+            status = db_session.query(IngestedFile.status).filter(IngestedFile.id == row.file_id).scalar()
+        if status != IngestionStatus.success:
+            return {"success": True, "chunks": 0, "error": None, "doc_id": doc_id, "skipped": True}
+
+        # ── Chunk (CPU-bound; runs in chunk_pool when given) ──────────────────
+        if chunk_pool is not None:
+            chunks = chunk_pool.submit(
+                _chunk_stored_text, row.text_zlib, row.collection, max_tokens, overlap, True,
+            ).result()
+        else:
+            chunks = _chunk_stored_text(row.text_zlib, row.collection, max_tokens, overlap)
+
+        # ── Metadata (regex + cached LLM fields) ──────────────────────────────
+        text_head = chunks.read_head()
+        manual_meta = json.loads(row.manual_meta_json)
+        final_meta, enrich_later = _initial_metadata(text_head, manual_meta, metadata_slots)
+
+        # ── Embed what changed → ChromaDB ─────────────────────────────────────
+        with embed_slots or contextlib.nullcontext():
+            chunk_count = DocumentEmbedder.embed_and_store(chunks, row.collection, final_meta, doc_id=doc_id)
+
+        row.chunk_bounds_json = json.dumps(chunks.bounds)
+        row.chunker_config = SectionAwareChunker.config_signature(max_tokens, overlap)
+        source_rows.update({"chunk_count": chunk_count}, synchronize_session=False)
+        db_session.commit()
+
+        if enrich_later:
+            _queue_enrichment(db_session, row.collection, doc_id, text_head, manual_meta)
+
+        return {"success": True, "chunks": chunk_count, "error": None, "doc_id": doc_id, "skipped": False}
+
+    except Exception as exc:
+        db_session.rollback()
+        return {"success": False, "chunks": 0, "error": str(exc), "doc_id": doc_id, "skipped": False}
+
+    finally:
+        if chunks is not None:
+            chunks.close()
+        db_session.close()
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # CLI entry point
 # ──────────────────────────────────────────────────────────────────────────────
 
+class _Progress:
+    """Thread-safe running totals for --workers mode, printed after every file."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.chunks = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, result: dict) -> None:
+        with self._lock:
+            self.done += 1
+            self.chunks += result.get("chunks", 0)
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            print(
+                f"  [{self.done}/{self.total}] "
+                f"{self.done / elapsed:.2f} files/s · {self.chunks / elapsed:.1f} chunks/s · "
+                f"{elapsed:.0f}s elapsed"
+            )
+
+
+def _rechunk_collection(args) -> None:
+    """--rechunk: rebuild a collection's chunks from the text store."""
+    db_name = DB_MAPPING[args.db][0]
+    signature = SectionAwareChunker.config_signature(args.max_tokens, args.overlap)
+    db_session = SessionLocal()
+    try:
+        text_ids = text_store.document_ids(db_session, db_name, None if args.overwrite else signature)
+    finally:
+        db_session.close()
+
+    print(f"Re-chunking {len(text_ids)} documents in '{db_name}' with chunker config {signature}")
+    if not text_ids:
+        return
+
+    progress = _Progress(len(text_ids))
+    counts = {"rechunked": 0, "skipped": 0, "failed": 0}
+    workers = max(1, args.workers)
+    metadata_slots = threading.BoundedSemaphore(max(1, args.metadata_concurrency))
+    embed_slots = threading.BoundedSemaphore(max(1, args.embed_concurrency))
+
+    with ProcessPoolExecutor(max_workers=workers) as chunk_pool, \
+         ThreadPoolExecutor(max_workers=workers) as doc_pool:
+        futures = [
+            doc_pool.submit(
+                rechunk_document,
+                text_id,
+                max_tokens=args.max_tokens,
+                overlap=args.overlap,
+                chunk_pool=chunk_pool if workers > 1 else None,
+                metadata_slots=metadata_slots,
+                embed_slots=embed_slots,
+            )
+            for text_id in text_ids
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result["skipped"]:
+                counts["skipped"] += 1
+            elif result["success"]:
+                counts["rechunked"] += 1
+            else:
+                print(f"  ✘ {result['doc_id']} — {result['error']}")
+                counts["failed"] += 1
+            progress.record(result)
+
+    print(f"\n{'─'*52}")
+    print(f"  Done. ✔ {counts['rechunked']} re-chunked  ⚠ {counts['skipped']} skipped  "
+          f"✘ {counts['failed']}  of {len(text_ids)}")
+    print(f"{'─'*52}")
+
+
+def _reembed_collection(args) -> None:
+    """--reembed: move a collection's vectors to the current embedding space."""
+    db_name = DB_MAPPING[args.db][0]
+    print(f"Re-embedding '{db_name}' in {embedding_space()}")
+    count = DocumentEmbedder.reembed_collection(db_name)
+    print(f"  Done. ✔ {count} chunks re-embedded")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
             "Ingest legal documents into ChromaDB + PostgreSQL.\n"
-            "Stores the raw file in BYTEA, vectors in ChromaDB."
+            "Stores the raw file once in the content-addressed blob store\n"
+            "(FILE_STORAGE_DIR/blobs), vectors in ChromaDB."
         )
     )
     parser.add_argument("--db", required=True, choices=["law", "cases", "client"],
@@ -409,8 +1088,34 @@ def main():
                         help="Client case ID (required when --db=client).")
     parser.add_argument("--overwrite", action="store_true",
                         help="Re-ingest even if already successfully processed.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue interrupted ingestions from their last committed batch.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Files processed concurrently; >1 parses in a process pool.")
+    parser.add_argument("--metadata-concurrency", type=int, default=settings.INGEST_METADATA_CONCURRENCY,
+                        help="Max concurrent LLM metadata calls in --workers mode.")
+    parser.add_argument("--embed-concurrency", type=int, default=settings.INGEST_EMBED_CONCURRENCY,
+                        help="Max files embedding concurrently in --workers mode.")
+    parser.add_argument("--rechunk", action="store_true",
+                        help="Re-chunk the collection from stored text instead of ingesting files "
+                             "(with --overwrite, also documents already at this chunker config).")
+    parser.add_argument("--reembed", action="store_true",
+                        help="Re-embed the collection's stored chunks with the current embedding "
+                             "endpoint (needed once for collections built with /api/embeddings).")
+    parser.add_argument("--max-tokens", type=int, default=None,
+                        help="Chunk size for --rechunk (default CHUNK_MAX_TOKENS).")
+    parser.add_argument("--overlap", type=int, default=None,
+                        help="Chunk overlap for --rechunk (default CHUNK_OVERLAP_TOKENS).")
     args = parser.parse_args()
 
+    if args.rechunk:
+        _rechunk_collection(args)
+        return
+
+    if args.reembed:
+        _reembed_collection(args)
+        return
+
     if args.db == "client" and not args.case_id:
         print("Error: --case-id is required when --db is 'client'.")
         return
@@ -433,29 +1138,75 @@ def main():
 
     success_count = skipped_count = fail_count = 0
 
-    for fp in files_to_process:
-        print(f"\n▶  {fp}")
-        result = ingest_file(
-            original_filename=os.path.basename(fp),
-            target_db_key=args.db,
-            src_path=fp,
-            case_id=args.case_id,
-            overwrite=args.overwrite,
-        )
-        if result["skipped"]:
-            skipped_count += 1
-        elif result["success"]:
-            print(f"  ✔ Success — {result['chunks']} chunks | file_id={result['file_id']}")
-            success_count += 1
-        else:
-            print(f"  ✘ Failed  — {result['error']}")
-            fail_count += 1
+    # Create the case up front; concurrent workers would race to insert it
+    case_record_id = resolve_case(args.case_id) if args.case_id else None
+
+    if args.workers > 1:
+        progress = _Progress(len(files_to_process))
+        metadata_slots = threading.BoundedSemaphore(max(1, args.metadata_concurrency))
+        embed_slots = threading.BoundedSemaphore(max(1, args.embed_concurrency))
+
+        with ProcessPoolExecutor(max_workers=args.workers) as parse_pool, \
+             ThreadPoolExecutor(max_workers=args.workers) as file_pool:
+            futures = {
+                file_pool.submit(
+                    ingest_file,
+                    original_filename=os.path.basename(fp),
+                    target_db_key=args.db,
+                    src_path=fp,
+                    case_id=args.case_id,
+                    case_record_id=case_record_id,
+                    overwrite=args.overwrite,
+                    resume=args.resume,
+                    parse_pool=parse_pool,
+                    metadata_slots=metadata_slots,
+                    embed_slots=embed_slots,
+                ): fp
+                for fp in files_to_process
+            }
+            for future in as_completed(futures):
+                fp = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    result = {
+                        "success": False, "chunks": 0, "error": str(exc),
+                        "file_id": None, "skipped": False, "metrics": None,
+                    }
+                if result["skipped"]:
+                    skipped_count += 1
+                elif result["success"]:
+                    print(f"  ✔ {fp} — {result['chunks']} chunks | file_id={result['file_id']}")
+                    success_count += 1
+                else:
+                    print(f"  ✘ {fp} — {result['error']}")
+                    fail_count += 1
+                progress.record(result)
+    else:
+        for fp in files_to_process:
+            print(f"\n▶  {fp}")
+            result = ingest_file(
+                original_filename=os.path.basename(fp),
+                target_db_key=args.db,
+                src_path=fp,
+                case_id=args.case_id,
+                case_record_id=case_record_id,
+                overwrite=args.overwrite,
+                resume=args.resume,
+            )
+            if result["skipped"]:
+                skipped_count += 1
+            elif result["success"]:
+                print(f"  ✔ Success — {result['chunks']} chunks | file_id={result['file_id']}")
+                success_count += 1
+            else:
+                print(f"  ✘ Failed  — {result['error']}")
+                fail_count += 1
 
     total = len(files_to_process)
     print(f"\n{'─'*52}")
     print(f"  Done. ✔ {success_count}  ⚠ {skipped_count} skipped  ✘ {fail_count}  of {total}")
     print(f"{'─'*52}")
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
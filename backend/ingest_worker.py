@@ -0,0 +1,236 @@
+"""
+ingest_worker.py
+────────────────
+Standalone worker that drains the ingestion_jobs queue filled by
+POST /api/upload and POST /api/upload-file, including the deferred LLM
+metadata passes queued after each document is embedded.
+
+Jobs are claimed with SELECT … FOR UPDATE SKIP LOCKED, so any number of
+workers — several processes per machine, on as many machines as can reach
+PostgreSQL — can run side by side. Failed jobs are retried with exponential
+backoff (INGEST_JOB_MAX_ATTEMPTS / INGEST_JOB_BACKOFF_SECONDS), and a
+retried ingestion resumes from its last committed embedding batch.
+
+When the queue is idle, a worker also garbage-collects unreferenced files
+from the blob store every BLOB_GC_INTERVAL_SECONDS, and maintains the
+query_logs partitions and rollups every QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS.
+
+CLI usage
+──────────
+  python ingest_worker.py
+  python ingest_worker.py --worker-id ingest-box-2
+  python ingest_worker.py --once          # drain the queue, then exit
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+import time
+
+from config.settings import settings
+from config.postgres import SessionLocal, CaseFile, IngestionJob, JobType, init_db
+from evaluation import query_stats
+from ingestion import blob_store, job_queue
+from ingestion.embedder import DocumentEmbedder
+from ingestion.metadata import MetadataExtractor
+from ingest_cli import ingest_file, ingest_case_file
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Job execution
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _run_job(db_session, job: IngestionJob) -> dict:
+    """Dispatch a claimed job to the matching pipeline; returns its result dict."""
+    payload = json.loads(job.payload_json)
+
+    def report(stage: str) -> None:
+        job_queue.heartbeat(job.id, stage)
+
+    if job.job_type == JobType.ingest_file:
+        def registered(file_id: int) -> None:
+            if payload.get("file_id") != file_id:
+                job_queue.update_payload(job.id, file_id=file_id)
+
+        return ingest_file(
+            original_filename=payload["original_filename"],
+            target_db_key=payload["target_db_key"],
+            file_bytes=job.file_data,
+            case_id=payload.get("case_id"),
+            overwrite=payload.get("overwrite", False),
+            content_sha256=payload.get("content_sha256"),
+            on_progress=report,
+            resume=True,
+            # Retries re-use the row of the first attempt instead of adding one
+            file_id=payload.get("file_id"),
+            on_registered=registered,
+        )
+
+    if job.job_type == JobType.case_file:
+        case_file = (
+            db_session.query(CaseFile)
+            .filter(CaseFile.file_id == payload["case_file_id"])
+            .first()
+        )
+        if not case_file:
+            return {"success": False, "chunks": 0, "error": f"CaseFile {payload['case_file_id']} not found"}
+        return ingest_case_file(
+            file_id=case_file.file_id,
+            filename=case_file.filename,
+            file_bytes=blob_store.load(case_file.content_sha256, lambda: case_file.file),
+            case_id=case_file.case_id,
+            db_session=db_session,
+            on_progress=report,
+            resume=True,
+        )
+
+    if job.job_type == JobType.enrich_metadata:
+        return _enrich_metadata(payload, report)
+
+    return {"success": False, "chunks": 0, "error": f"Unknown job type: {job.job_type}"}
+
+
+def _enrich_metadata(payload: dict, report) -> dict:
+    """
+    Deferred LLM pass for a document that is already embedded with its
+    rule-based metadata: extract (or reuse cached) LLM metadata and patch
+    it onto the document's chunks. Model errors propagate so the job retries.
+    """
+    report("extracting metadata")
+    extracted = MetadataExtractor.llm_metadata(payload["text_head"], settings.JUDGE_MODEL)
+    patch = MetadataExtractor.llm_fields(extracted, payload.get("manual_meta"))
+
+    report("patching metadata")
+    patched = DocumentEmbedder.patch_metadata(payload["db_name"], payload["doc_id"], patch)
+    return {"success": True, "chunks": patched, "error": None}
+
+
+class _LeaseKeeper(threading.Thread):
+    """Extends the current job's lease while a long stage (e.g. embedding) runs."""
+
+    def __init__(self, job_id: int):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        interval = max(settings.INGEST_JOB_LEASE_SECONDS / 3, 1)
+        while not self.stopped.wait(interval):
+            try:
+                job_queue.heartbeat(self.job_id)
+            except Exception as e:
+                print(f"  Heartbeat failed for job {self.job_id}: {e}")
+
+
+def process_one(worker_id: str) -> bool:
+    """Claim and run a single job. Returns False when the queue had nothing runnable."""
+    db_session = SessionLocal()
+    try:
+        job = job_queue.claim(db_session, worker_id)
+        if job is None:
+            return False
+
+        print(f"\n▶  job {job.id} ({job.job_type.value}) attempt {job.attempts}/{job.max_attempts}")
+        if job.attempts > job.max_attempts:
+            # Re-claimed after its worker died on the final attempt
+            job_queue.fail(db_session, job, job.last_error or "Worker lost the job on its final attempt.")
+            return True
+
+        lease = _LeaseKeeper(job.id)
+        lease.start()
+        try:
+            result = _run_job(db_session, job)
+        except Exception as exc:
+            db_session.rollback()
+            result = {"success": False, "chunks": 0, "error": str(exc)}
+        finally:
+            lease.stopped.set()
+
+        if result.get("success"):
+            job_queue.complete(db_session, job, result)
+            print(f"  ✔ job {job.id} done — {result.get('chunks', 0)} chunks")
+        else:
+            job_queue.fail(db_session, job, result.get("error") or "Unknown error")
+            print(f"  ✘ job {job.id} failed — {result.get('error')} (state={job.state.value})")
+        return True
+    finally:
+        db_session.close()
+
+
+def collect_blobs() -> None:
+    """Run the blob store garbage collector; errors are reported, not raised."""
+    try:
+        stats = blob_store.collect_garbage()
+    except Exception as e:
+        print(f"  Blob GC failed: {e}")
+        return
+    if stats["deleted"] or stats["recounted"]:
+        print(f"  Blob GC: {stats['deleted']} deleted ({stats['bytes_freed']:,} bytes), "
+              f"{stats['recounted']} recounted")
+
+
+def maintain_query_logs() -> None:
+    """Refresh the query_logs rollups and partitions; errors are reported, not raised."""
+    try:
+        stats = query_stats.maintain()
+    except Exception as e:
+        print(f"  Query log maintenance failed: {e}")
+        return
+    if stats["dropped"]:
+        print(f"  Query logs: dropped expired partitions {', '.join(stats['dropped'])}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CLI entry point
+# ──────────────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an ingestion worker against the ingestion_jobs queue.")
+    parser.add_argument("--worker-id", type=str, default=f"{socket.gethostname()}:{os.getpid()}",
+                        help="Identifier recorded on claimed jobs.")
+    parser.add_argument("--poll-interval", type=float, default=settings.INGEST_WORKER_POLL_SECONDS,
+                        help="Seconds to sleep when the queue is empty.")
+    parser.add_argument("--once", action="store_true",
+                        help="Exit as soon as the queue has no runnable jobs.")
+    args = parser.parse_args()
+
+    init_db()
+
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        print("\nStopping after the current job…")
+        stopping.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    print(f"Ingestion worker {args.worker_id} started.")
+    last_gc = time.monotonic()
+    last_query_stats = time.monotonic() - settings.QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS  # due at once
+    while not stopping.is_set():
+        try:
+            worked = process_one(args.worker_id)
+        except Exception as e:
+            print(f"  Worker error: {e}")
+            worked = False
+        if not worked:
+            if args.once:
+                break
+            if time.monotonic() - last_gc >= settings.BLOB_GC_INTERVAL_SECONDS:
+                collect_blobs()
+                last_gc = time.monotonic()
+            if time.monotonic() - last_query_stats >= settings.QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS:
+                maintain_query_logs()
+                last_query_stats = time.monotonic()
+            stopping.wait(args.poll_interval)
+    print(f"Ingestion worker {args.worker_id} stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+ingestion/blob_store.py
+───────────────────────
+Content-addressed store for uploaded file bytes (table: file_blobs).
+
+Every file — ingested, case file, past case or law — is written once to
+FILE_STORAGE_DIR/blobs/<ab>/<cd>/<sha256>, however many rows refer to it;
+the rows keep only content_sha256, so PostgreSQL backups carry no file
+bytes. file_blobs counts the rows referring to each blob, and
+collect_garbage() deletes the blobs nothing has referred to for
+BLOB_GC_GRACE_SECONDS (ingest_worker runs it every BLOB_GC_INTERVAL_SECONDS).
+
+put() takes a row lock on the blob's file_blobs row before writing, and
+the caller's commit releases it together with the row that references the
+blob, so the collector can never delete a file an upload is about to use.
+Files are written to a temp file in the same directory, fsynced and renamed
+into place: a blob path either holds the complete bytes or does not exist.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert
+
+from config.postgres import BLOB_COLUMNS, FileBlob, IngestedFile, SessionLocal
+from config.settings import settings
+
+_TMP_PREFIX = ".tmp-"
+
+
+def _root() -> str:
+    return os.path.join(settings.FILE_STORAGE_DIR, "blobs")
+
+
+def blob_path(sha256: str) -> str:
+    """Where the blob with this hash lives (sharded by its first two bytes)."""
+    return os.path.join(_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def exists(sha256: str | None) -> bool:
+    return bool(sha256) and os.path.exists(blob_path(sha256))
+
+
+def _write(sha256: str, data: bytes) -> None:
+    """Atomically create the blob file: temp file → fsync → rename."""
+    dest = blob_path(sha256)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=os.path.dirname(dest))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, dest)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def put(db_session, data: bytes, sha256: str | None = None) -> str:
+    """
+    Store data (if not already stored) and count one more reference to it;
+    returns its hash. The reference is part of the caller's transaction:
+    commit it together with the row that holds content_sha256.
+    """
+    if sha256 is None:
+        sha256 = hashlib.sha256(data).hexdigest()
+    db_session.execute(
+        insert(FileBlob)
+        .values(
+            sha256=sha256,
+            size_bytes=len(data),
+            ref_count=1,
+            created_at=datetime.datetime.utcnow(),
+        )
+        .on_conflict_do_update(
+            index_elements=[FileBlob.sha256],
+            set_={"ref_count": FileBlob.ref_count + 1, "unreferenced_at": None},
+        )
+    )
+    if not exists(sha256):
+        _write(sha256, data)
+    return sha256
+
+
+def release(db_session, sha256: str) -> None:
+    """Drop one reference (a file row was deleted). Not committed here."""
+    db_session.query(FileBlob).filter(FileBlob.sha256 == sha256).update(
+        {
+            "ref_count": func.greatest(FileBlob.ref_count - 1, 0),
+            "unreferenced_at": case(
+                (FileBlob.ref_count <= 1, datetime.datetime.utcnow()), else_=None,
+            ),
+        },
+        synchronize_session=False,
+    )
+
+
+def read(sha256: str) -> bytes:
+    with open(blob_path(sha256), "rb") as fh:
+        return fh.read()
+
+
+def load(sha256: str | None, legacy: Callable[[], bytes | None]) -> bytes:
+    """
+    The bytes of a file row: from the blob store, or — for a row not yet
+    moved there — from its legacy BYTEA column via legacy().
+    """
+    if exists(sha256):
+        return read(sha256)
+    data = legacy()
+    if data is None:
+        raise FileNotFoundError(f"Blob {sha256} is missing from {_root()}")
+    return data
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Maintenance (init_db, ingest_worker)
+# ──────────────────────────────────────────────────────────────────────────────
+
+def migrate_bytea() -> int:
+    """
+    Move file bytes still held in BYTEA columns into the blob store and
+    NULL the column. One row per transaction; a no-op once all are moved.
+    """
+    moved = 0
+    db = SessionLocal()
+    try:
+        for model, pk, blob in BLOB_COLUMNS:
+            ids = [row[0] for row in db.query(pk).filter(blob.isnot(None))]
+            for row_id in ids:
+                data, sha256 = db.query(blob, model.content_sha256).filter(pk == row_id).one()
+                sha256 = put(db, data, sha256)
+                values = {blob.key: None, "content_sha256": sha256}
+                if model is IngestedFile:
+                    values["stored_path"] = blob_path(sha256)
+                db.query(model).filter(pk == row_id).update(values, synchronize_session=False)
+                db.commit()
+                moved += 1
+    finally:
+        db.close()
+    return moved
+
+
+def _reference_count(db_session, sha256: str) -> int:
+    return sum(
+        db_session.query(func.count()).filter(model.content_sha256 == sha256).scalar()
+        for model, _pk, _blob in BLOB_COLUMNS
+    )
+
+
+def collect_garbage(grace_seconds: int | None = None) -> dict:
+    """
+    Recount references from the file tables, then delete blobs that have
+    been unreferenced for longer than the grace period, and files on disk
+    that no file_blobs row knows about (e.g. from a crashed upload).
+
+    Returns {"recounted": int, "deleted": int, "bytes_freed": int}.
+    """
+    grace = settings.BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    now = datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(seconds=grace)
+    stats = {"recounted": 0, "deleted": 0, "bytes_freed": 0}
+
+    db = SessionLocal()
+    try:
+        # ── 1. Repair ref_count drift (rows deleted or added outside put()) ──
+        actual: dict[str, int] = {}
+        for model, _pk, _blob in BLOB_COLUMNS:
+            q = (
+                db.query(model.content_sha256, func.count())
+                .filter(model.content_sha256.isnot(None))
+                .group_by(model.content_sha256)
+            )
+            for sha256, count in q:
+                actual[sha256] = actual.get(sha256, 0) + count
+
+        stale = [
+            sha256 for sha256, ref_count in db.query(FileBlob.sha256, FileBlob.ref_count)
+            if actual.get(sha256, 0) != ref_count
+        ]
+        for sha256 in stale:
+            # Lock, then count; rows an in-flight put() holds are left for the next run
+            row = (
+                db.query(FileBlob).filter(FileBlob.sha256 == sha256)
+                .with_for_update(skip_locked=True).first()
+            )
+            if row is not None:
+                row.ref_count = _reference_count(db, sha256)
+                if row.ref_count == 0 and row.unreferenced_at is None:
+                    row.unreferenced_at = now
+                elif row.ref_count > 0:
+                    row.unreferenced_at = None
+                stats["recounted"] += 1
+            db.commit()
+
+        # ── 2. Delete blobs unreferenced for longer than the grace period ────
+        expired = [
+            row[0] for row in db.query(FileBlob.sha256).filter(
+                FileBlob.ref_count == 0, FileBlob.unreferenced_at < cutoff,
+            )
+        ]
+        for sha256 in expired:
+            row = (
+                db.query(FileBlob).filter(FileBlob.sha256 == sha256)
+                .with_for_update(skip_locked=True).first()
+            )
+            if row is not None and _reference_count(db, sha256) == 0:
+                try:
+                    os.remove(blob_path(sha256))
+                    stats["bytes_freed"] += row.size_bytes
+                except FileNotFoundError:
+                    pass
+                db.delete(row)
+                stats["deleted"] += 1
+            db.commit()
+
+        known = {row[0] for row in db.query(FileBlob.sha256)}
+    finally:
+        db.close()
+
+    # ── 3. Orphaned files and abandoned temp files ────────────────────────────
+    oldest = time.time() - grace
+    for dirpath, _dirs, files in os.walk(_root()):
+        for name in files:
+            if name in known:
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < oldest:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    stats["deleted"] += 1
+                    stats["bytes_freed"] += size
+            except FileNotFoundError:
+                pass
+
+    return stats
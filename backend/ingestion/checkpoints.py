@@ -0,0 +1,114 @@
+"""
+ingestion/checkpoints.py
+────────────────────────
+Resumable ingestion (table: ingestion_checkpoints).
+
+Once the head of a document has been parsed and its metadata extracted,
+that metadata is saved here before embedding starts. Chunks are streamed
+from the parser into DocumentEmbedder.embed_and_store, which commits the
+chunk manifest after every ChromaDB batch, so when Ollama or the worker
+dies part-way a retry with resume=True:
+
+  1. reloads the metadata instead of extracting it (or calling the LLM) again
+  2. re-uses the file's existing PostgreSQL row instead of storing it again
+  3. parses the file again and diffs its chunks against the checkpointed
+     manifest, so only the chunks after the last committed batch are
+     embedded (OCR'd pages come from the OCR cache)
+
+A checkpoint is only used for the exact bytes it was made from, and is
+deleted once the document is ingested successfully.
+"""
+
+from __future__ import annotations
+
+import json
+
+from config.postgres import SessionLocal, IngestionCheckpoint
+
+
+def load(db_session, collection: str, doc_id: str, content_sha256: str) -> IngestionCheckpoint | None:
+    """
+    The checkpoint of an unfinished ingestion of these bytes, or None.
+    A checkpoint made from other bytes is stale and is deleted.
+    """
+    checkpoint = (
+        db_session.query(IngestionCheckpoint)
+        .filter_by(collection=collection, doc_id=doc_id)
+        .first()
+    )
+    if checkpoint is not None and checkpoint.content_sha256 != content_sha256:
+        db_session.delete(checkpoint)
+        db_session.commit()
+        return None
+    return checkpoint
+
+
+def save(
+    db_session,
+    collection: str,
+    doc_id: str,
+    content_sha256: str,
+    file_id: int,
+    metadata: dict,
+    text_head: str,
+    enrich_later: bool,
+) -> IngestionCheckpoint:
+    """Record the metadata of a document about to be embedded."""
+    checkpoint = (
+        db_session.query(IngestionCheckpoint)
+        .filter_by(collection=collection, doc_id=doc_id)
+        .first()
+    )
+    if checkpoint is None:
+        checkpoint = IngestionCheckpoint(collection=collection, doc_id=doc_id, attempts=0)
+        db_session.add(checkpoint)
+    checkpoint.content_sha256 = content_sha256
+    checkpoint.file_id = file_id
+    checkpoint.metadata_json = json.dumps(metadata)
+    checkpoint.text_head = text_head
+    checkpoint.enrich_later = enrich_later
+    checkpoint.chunks_committed = 0
+    checkpoint.chunks_total = 0
+    checkpoint.attempts = 1
+    db_session.commit()
+    return checkpoint
+
+
+def resumed(db_session, checkpoint: IngestionCheckpoint) -> tuple[dict, str, bool]:
+    """Count another attempt; returns (metadata, text_head, enrich_later)."""
+    checkpoint.attempts += 1
+    db_session.commit()
+    return (
+        json.loads(checkpoint.metadata_json),
+        checkpoint.text_head,
+        checkpoint.enrich_later,
+    )
+
+
+def record_progress(collection: str, doc_id: str, committed: int, total: int) -> None:
+    """
+    Store how many chunks are committed to ChromaDB, out of the chunks cut
+    so far (the total is known once parsing ends). Uses its own short
+    session, like job_queue.heartbeat, so it never commits the caller's work.
+    """
+    db_session = SessionLocal()
+    try:
+        db_session.query(IngestionCheckpoint).filter_by(
+            collection=collection, doc_id=doc_id,
+        ).update(
+            {"chunks_committed": committed, "chunks_total": total},
+            synchronize_session=False,
+        )
+        db_session.commit()
+    finally:
+        db_session.close()
+
+
+def clear(db_session, collection: str, doc_id: str) -> None:
+    """
+    Drop the checkpoint of a document that is now fully ingested. Not
+    committed here, so it lands in the same transaction as the SUCCESS status.
+    """
+    db_session.query(IngestionCheckpoint).filter_by(
+        collection=collection, doc_id=doc_id,
+    ).delete(synchronize_session=False)
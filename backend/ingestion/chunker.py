@@ -1,32 +1,350 @@
+import hashlib
+import os
 import re
-from typing import List, Dict, Any
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from config.settings import settings
+from ingestion.token_counter import token_counter
+
+# Zero-width split points before "Article N" / "Section N"
+LAW_SECTION_PATTERN = re.compile(r"(?i)(?=Article\s+\d+|Section\s+\d+)")
+
+# The marker a law section starts with, used as its header
+SECTION_HEADER_PATTERN = re.compile(r"(?i)(?:Article|Section)\s+\d+\S*")
+
+# Where to split a section that is too long to embed, coarsest first; past
+# the last level the section is cut into overlapping token windows.
+SPLIT_LEVELS = (
+    re.compile(r"\n(?=[ \t]*(?:\(\w{1,4}\)|\d{1,3}[.)]\s))"),  # sub-sections / clauses
+    re.compile(r"\n[ \t]*\n"),                                   # paragraphs
+    re.compile(r"(?<=[.;:?!])\s+"),                              # sentences
+)
+
+_TRAILING_WORD = re.compile(r"\S+\Z")
+
+# How far back into the carried-over tail a section marker can start and
+# still be completed by the next segment ("Section" | "\n12 ...").
+_MARKER_LOOKBACK = 256
+
+# Longest section header recorded / repeated on the parts of a split section
+_MAX_HEADER_CHARS = 120
+
+# Token windows end at content-defined boundaries: after a token whose last
+# _CUT_CONTEXT tokens hash to 0, so after an insertion or deletion the
+# boundaries fall back into the same places as soon as the text matches
+# again, and only the windows around the edit change.
+_CUT_CONTEXT = 4
+
+
+def _cut_at(text: str, base: int, starts: array, ends: array, j: int, divisor: int) -> bool:
+    """Whether a window may end after token j (token j + 1 must be known)."""
+    if ends[j] == starts[j + 1]:
+        return False  # never inside a word
+    first = max(0, j - _CUT_CONTEXT + 1)
+    context = text[starts[first] - base:ends[j] - base]
+    return zlib.crc32(context.encode("utf-8")) % divisor == 0
+
+
+def _next_cut(
+    text: str,
+    base: int,
+    starts: array,
+    ends: array,
+    body_start: int,
+    scan_from: int,
+    step: int,
+    final: bool,
+    limit: Optional[int] = None,
+) -> Tuple[Optional[int], int]:
+    """
+    End (exclusive token index) of the window whose own tokens start at
+    body_start: the first content-defined boundary at least step // 2
+    tokens in, or step tokens in if there is none. Tokens up to limit
+    (default: all) are known; unless final, more may follow, and None is
+    returned while they are needed. The second value is where the next
+    call may resume scanning. text[0] is at document offset base.
+    """
+    limit = len(starts) if limit is None else limit
+    divisor = max(1, step // 4)
+    j = max(scan_from, body_start + max(1, step // 2) - 1)
+    while j + 1 < limit:
+        if j + 1 - body_start >= step or _cut_at(text, base, starts, ends, j, divisor):
+            return j + 1, j + 1
+        j += 1
+    if final:
+        return limit, limit
+    return None, j
+
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Offsets of text[start:end] with surrounding whitespace removed."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _tail(parts: List[str], size: int) -> str:
+    """The last `size` characters of "".join(parts), without joining it all."""
+    out: List[str] = []
+    need = size
+    for part in reversed(parts):
+        out.append(part[-need:])
+        need -= len(out[-1])
+        if need <= 0:
+            break
+    return "".join(reversed(out))
+
 
 class SectionAwareChunker:
-    """Chunks documents based on structural markers."""
-    
+    """
+    Chunks documents based on structural markers.
+
+    Every chunk is a single slice of the document text (a continuation of a
+    split law section is prefixed with the section header) and records its
+    start_offset / end_offset in the document. Sizes are measured in
+    embedding-model tokens (see ingestion/token_counter.py).
+    """
+
     @staticmethod
-    def chunk_by_tokens(text: str, chunk_size: int = 512, overlap: int = 50) -> List[Dict[str, Any]]:
-        """Fallback chunker if no structural markers are found."""
-        # Simple word-based chunking for demonstration purposes
-        words = text.split()
-        chunks = []
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_text = " ".join(words[i:i + chunk_size])
-            chunks.append({
-                "text": chunk_text,
-                "metadata": {
-                    "chunk_type": "text",
+    def iter_token_chunks(
+        segments: Iterable[str],
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Token-window chunking over a stream of text segments (e.g. PDF pages).
+        Only the text of the current window is held in memory.
+
+        Each window holds at most max_tokens - overlap tokens of its own,
+        ending at a content-defined boundary (see _next_cut), and repeats
+        the last `overlap` tokens of the window before it.
+        """
+        max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        overlap = settings.CHUNK_OVERLAP_TOKENS if overlap is None else overlap
+        step = max(1, max_tokens - overlap)
+
+        buf = ""        # document text from offset `base` onwards
+        base = 0
+        scanned = 0     # document offset up to which buf has been tokenized
+        starts, ends = array("q"), array("q")
+        body_start = 0  # first token of the current window after its overlap
+        scan_from = 0   # first token not yet tested as a window boundary
+
+        def tokenize(upto: int):
+            nonlocal scanned
+            if upto > scanned:
+                s, e = token_counter.spans(buf, scanned - base, upto - base)
+                starts.extend(x + base for x in s)
+                ends.extend(x + base for x in e)
+                scanned = upto
+
+        def windows(final: bool):
+            nonlocal buf, base, body_start, scan_from
+            while body_start < len(starts):
+                cut, scan_from = _next_cut(buf, base, starts, ends, body_start, scan_from, step, final)
+                if cut is None:
+                    return  # the boundary depends on tokens still to come
+                start, end = starts[0], ends[cut - 1]
+                yield {
+                    "text": buf[start - base:end - base],
+                    "metadata": {"chunk_type": "text", "start_offset": start, "end_offset": end},
                 }
-            })
-            if i + chunk_size >= len(words):
-                break
-                
-        # Update metadata indices
+                keep = max(0, cut - overlap)
+                del starts[:keep]
+                del ends[:keep]
+                body_start = scan_from = cut - keep
+                new_base = starts[0] if starts else end
+                buf = buf[new_base - base:]
+                base = new_base
+
+        for segment in segments:
+            if not segment:
+                continue
+            buf += segment
+            # A segment that doesn't end in whitespace may end mid-word
+            match = _TRAILING_WORD.search(buf, scanned - base)
+            tokenize(base + (match.start() if match else len(buf)))
+            yield from windows(final=False)
+
+        tokenize(base + len(buf))
+        yield from windows(final=True)
+
+    @staticmethod
+    def split_range(
+        text: str,
+        start: int,
+        end: int,
+        starts: array,
+        ends: array,
+        max_tokens: int,
+        overlap: int,
+        level: int = 0,
+    ) -> List[Tuple[int, int]]:
+        """
+        Splits text[start:end] into ranges of at most max_tokens tokens,
+        cutting at the coarsest SPLIT_LEVELS boundary that works and merging
+        neighbouring pieces back up to the limit. starts / ends are the token
+        offsets of the enclosing section.
+        """
+        def count(a: int, b: int) -> int:
+            return bisect_left(starts, b) - bisect_left(starts, a)
+
+        if count(start, end) <= max_tokens:
+            return [(start, end)]
+
+        if level == len(SPLIT_LEVELS):
+            # Content-defined token windows, as in iter_token_chunks
+            first, last = bisect_left(starts, start), bisect_left(starts, end)
+            step = max(1, max_tokens - overlap)
+            windows = []
+            body_start = first
+            while body_start < last:
+                cut, _ = _next_cut(text, 0, starts, ends, body_start, body_start, step, True, last)
+                windows.append((starts[max(first, body_start - overlap)], ends[cut - 1]))
+                body_start = cut
+            return windows
+
+        cuts = [start] + [m.end() for m in SPLIT_LEVELS[level].finditer(text, start, end)] + [end]
+        pieces = [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+        if len(pieces) <= 1:
+            return SectionAwareChunker.split_range(text, start, end, starts, ends, max_tokens, overlap, level + 1)
+
+        ranges: List[Tuple[int, int]] = []
+        current: Optional[Tuple[int, int]] = None
+        for a, b in pieces:
+            if count(a, b) > max_tokens:
+                if current:
+                    ranges.append(current)
+                    current = None
+                ranges.extend(SectionAwareChunker.split_range(text, a, b, starts, ends, max_tokens, overlap, level + 1))
+            elif current is None:
+                current = (a, b)
+            elif count(current[0], b) <= max_tokens:
+                current = (current[0], b)
+            else:
+                ranges.append(current)
+                current = (a, b)
+        if current:
+            ranges.append(current)
+
+        stripped = [_strip(text, a, b) for a, b in ranges]
+        return [(a, b) for a, b in stripped if a < b]
+
+    @staticmethod
+    def split_section(
+        text: str,
+        start: int,
+        end: int,
+        base: int,
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the chunks of the law section text[start:end], which begins at
+        document offset base + start. A section over the token limit is
+        split hierarchically; every part after the first repeats its header.
+        """
+        max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        overlap = settings.CHUNK_OVERLAP_TOKENS if overlap is None else overlap
+        start, end = _strip(text, start, end)
+        if start == end:
+            return
+
+        starts, ends = token_counter.spans(text, start, end)
+        if len(starts) <= max_tokens:
+            yield {
+                "text": text[start:end],
+                "metadata": {"chunk_type": "law_section", "start_offset": base + start, "end_offset": base + end},
+            }
+            return
+
+        # Repeat the first line (or just the marker) on every later part, as
+        # long as it takes at most a quarter of the token budget
+        header, prefix, budget = "", "", max_tokens
+        marker = SECTION_HEADER_PATTERN.match(text, start)
+        if marker:
+            line_end = text.find("\n", start, end)
+            header = text[start:line_end if line_end != -1 else end].strip()[:_MAX_HEADER_CHARS]
+            for candidate in (header, marker.group()):
+                cost = token_counter.count(candidate) + 1
+                if cost <= max_tokens // 4:
+                    prefix, budget = candidate, max_tokens - cost
+                    break
+
+        ranges = SectionAwareChunker.split_range(text, start, end, starts, ends, budget, overlap)
+        for part, (a, b) in enumerate(ranges, 1):
+            body = text[a:b]
+            meta = {
+                "chunk_type": "law_section",
+                "start_offset": base + a,
+                "end_offset": base + b,
+                "section_part": part,
+                "section_parts": len(ranges),
+            }
+            if header:
+                meta["section_header"] = header
+            yield {"text": body if a == start or not prefix else f"{prefix}\n{body}", "metadata": meta}
+
+    @staticmethod
+    def iter_law_sections(
+        segments: Iterable[str],
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Splits a stream of text segments on 'Article X' / 'Section Y' markers.
+        Only the unfinished trailing section is carried between segments, as
+        a list of parts that is joined only once a marker ends it.
+        """
+        parts: List[str] = []
+        parts_len = 0
+        base = 0        # document offset of the carried section
+
+        for segment in segments:
+            if not segment:
+                continue
+            lookback = _tail(parts, _MARKER_LOOKBACK)
+            # Never split at the very start of the carried section
+            probe_from = 1 if len(lookback) == parts_len else 0
+            if not LAW_SECTION_PATTERN.search(lookback + segment, probe_from):
+                parts.append(segment)
+                parts_len += len(segment)
+                continue
+
+            parts.append(segment)
+            tail = "".join(parts)  # one join per marker-bearing segment
+            start = 0
+            for match in LAW_SECTION_PATTERN.finditer(tail, max(1, parts_len - len(lookback))):
+                yield from SectionAwareChunker.split_section(tail, start, match.start(), base, max_tokens, overlap)
+                start = match.start()
+            parts = [tail[start:]]
+            parts_len = len(parts[0])
+            base += start
+
+        tail = "".join(parts)
+        yield from SectionAwareChunker.split_section(tail, 0, len(tail), base, max_tokens, overlap)
+
+    @staticmethod
+    def number_chunks(chunks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Fills in chunk_index as the stream goes by. The total is only known
+        once the stream ends: it is the length of the document's chunk
+        manifest (and the chunk_count of its file row).
+        """
         for idx, chunk in enumerate(chunks):
             chunk["metadata"]["chunk_index"] = idx + 1
-            chunk["metadata"]["chunk_total"] = len(chunks)
-            
-        return chunks
+            yield chunk
+
+    @staticmethod
+    def chunk_by_tokens(text: str, max_tokens: Optional[int] = None, overlap: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fallback chunker if no structural markers are found."""
+        return list(SectionAwareChunker.number_chunks(
+            SectionAwareChunker.iter_token_chunks([text], max_tokens, overlap)
+        ))
 
     @staticmethod
     def chunk_law_document(text: str) -> List[Dict[str, Any]]:
@@ -34,28 +352,59 @@ class SectionAwareChunker:
         Splits by Article, Section.
         Regex matches 'Article X' or 'Section Y'
         """
-        # Split by "Article" or "Section"
-        pattern = r"(?i)(?=Article\s+\d+|Section\s+\d+)"
-        sections = re.split(pattern, text)
-        sections = [s.strip() for s in sections if s.strip()]
-        
-        chunks = []
-        for idx, sec in enumerate(sections):
-            chunks.append({
-                "text": sec,
-                "metadata": {
-                    "chunk_type": "law_section",
-                    "chunk_index": idx + 1,
-                    "chunk_total": len(sections)
-                }
-            })
-            
-        return chunks if chunks else SectionAwareChunker.chunk_by_tokens(text)
+        return SectionAwareChunker.chunk_stream([text], doc_type="law_reference_db")
 
     @staticmethod
-    def chunk_document(text: str, doc_type: str = "general") -> List[Dict[str, Any]]:
+    def iter_chunks(
+        segments: Iterable[str],
+        doc_type: str = "general",
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Chunks a document delivered as a stream of text segments whose
+        concatenation is the full text (see DocumentParser.iter_file),
+        yielding each chunk as soon as it is cut.
+        """
         if doc_type == "law_reference_db":
-            return SectionAwareChunker.chunk_law_document(text)
+            return SectionAwareChunker.number_chunks(
+                SectionAwareChunker.iter_law_sections(segments, max_tokens, overlap)
+            )
         else:
             # For cases and clients, fall back to simple chunking for now
-            return SectionAwareChunker.chunk_by_tokens(text)
+            return SectionAwareChunker.number_chunks(
+                SectionAwareChunker.iter_token_chunks(segments, max_tokens, overlap)
+            )
+
+    @staticmethod
+    def chunk_stream(
+        segments: Iterable[str],
+        doc_type: str = "general",
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """iter_chunks(), materialised."""
+        return list(SectionAwareChunker.iter_chunks(segments, doc_type, max_tokens, overlap))
+
+    @staticmethod
+    def config_signature(max_tokens: Optional[int] = None, overlap: Optional[int] = None) -> str:
+        """
+        Identifies the chunking a document was cut with: token limits,
+        tokenizer, the section / split patterns and how token windows are
+        cut. Stored per document so re-chunking can skip documents that are
+        already up to date.
+        """
+        max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        overlap = settings.CHUNK_OVERLAP_TOKENS if overlap is None else overlap
+        patterns = "\x00".join(
+            [LAW_SECTION_PATTERN.pattern, SECTION_HEADER_PATTERN.pattern]
+            + [level.pattern for level in SPLIT_LEVELS]
+            + [f"content-defined windows/{_CUT_CONTEXT}"]
+        )
+        tokenizer = os.path.basename(settings.EMBED_TOKENIZER_PATH) or "approx"
+        digest = hashlib.sha256(f"{tokenizer}\x00{patterns}".encode("utf-8")).hexdigest()[:12]
+        return f"{max_tokens}/{overlap}/{digest}"
+
+    @staticmethod
+    def chunk_document(text: str, doc_type: str = "general") -> List[Dict[str, Any]]:
+        return SectionAwareChunker.chunk_stream([text], doc_type)
@@ -1,54 +1,480 @@
+import hashlib
+import json
+import time
 import uuid
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple
 import ollama
 from config.database import db_client
+from config.postgres import SessionLocal, ChunkManifest
 from config.settings import settings
+from ingestion.embedding_cache import embedding_cache, embedding_space
+from ingestion.ingest_metrics import IngestionMetrics
 
 class DocumentEmbedder:
     @staticmethod
-    def embed_and_store(chunks: List[Dict[str, Any]], db_name: str, common_metadata: Dict[str, Any]):
-        """Generates embeddings and stores in the appropriate ChromaDB collection."""
-        
+    def get_collection(db_name: str):
+        """Maps a logical DB name to its ChromaDB collection."""
         if db_name == settings.LAW_DB_NAME:
-            collection = db_client.get_law_db()
+            return db_client.get_law_db()
         elif db_name == settings.CASES_DB_NAME:
-            collection = db_client.get_cases_db()
+            return db_client.get_cases_db()
         elif db_name == settings.CLIENT_DB_NAME:
-            collection = db_client.get_client_db()
-        else:
-            raise ValueError(f"Unknown DB: {db_name}")
-
-        for chunk in chunks:
-            text = chunk["text"]
-            # Combine chunk specific metadata with common document metadata
-            meta = {**common_metadata, **chunk.get("metadata", {})}
-            
-            # Ensure metadata values are str, int, float, or bool for ChromaDB
-            clean_meta = {}
-            for k, v in meta.items():
-                if isinstance(v, (str, int, float, bool)):
-                    clean_meta[k] = v
-                elif isinstance(v, list):
-                    clean_meta[k] = ", ".join([str(x) for x in v])
-                elif v is None:
-                    clean_meta[k] = "None"
-                else:
-                    clean_meta[k] = str(v)
+            return db_client.get_client_db()
+        raise ValueError(f"Unknown DB: {db_name}")
 
+    @staticmethod
+    def collection_space(collection) -> Optional[str]:
+        """The embedding space recorded on a collection, or None if it predates them."""
+        return (collection.metadata or {}).get("embedding_space")
+
+    @staticmethod
+    def mark_collection(collection) -> None:
+        """Records that every vector in the collection is in the current embedding space."""
+        # Chroma rejects hnsw:* keys in modify(); they can't change anyway
+        metadata = {k: v for k, v in (collection.metadata or {}).items() if not k.startswith("hnsw:")}
+        collection.modify(metadata={**metadata, "embedding_space": embedding_space()})
+
+    @staticmethod
+    def reembed_collection(db_name: str) -> int:
+        """
+        Re-embeds every chunk of a collection from its stored text in the
+        current embedding space, keeping IDs and metadata, then marks the
+        collection (ingest_cli.py --reembed). Collections ingested with the
+        legacy /api/embeddings endpoint need this once: queries use
+        EMBED_ENDPOINT. Vectors already in the embedding cache are reused,
+        so an interrupted run is cheap to repeat. Returns the chunk count.
+        """
+        collection = DocumentEmbedder.get_collection(db_name)
+        page_size = max(1, settings.CHROMA_UPSERT_BATCH_SIZE)
+        batch_size = max(1, settings.EMBED_BATCH_SIZE)
+        done = 0
+        while True:
+            page = collection.get(include=["documents"], limit=page_size, offset=done)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            texts = page["documents"]
+            vectors = embedding_cache.get_many(texts)
+            misses = [i for i, vector in enumerate(vectors) if vector is None]
+            for start in range(0, len(misses), batch_size):
+                part = misses[start:start + batch_size]
+                for i, vector in zip(part, DocumentEmbedder.embed_batch([texts[i] for i in part])):
+                    vectors[i] = vector
+            collection.update(ids=ids, embeddings=vectors)
+            done += len(ids)
+            print(f"  Re-embedded {done} chunks ({len(misses)} of this page not cached)")
+        DocumentEmbedder.mark_collection(collection)
+        return done
+
+    @staticmethod
+    def clean_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Ensure metadata values are str, int, float, or bool for ChromaDB."""
+        clean_meta = {}
+        for k, v in meta.items():
+            if isinstance(v, (str, int, float, bool)):
+                clean_meta[k] = v
+            elif isinstance(v, list):
+                clean_meta[k] = ", ".join([str(x) for x in v])
+            elif v is None:
+                clean_meta[k] = "None"
+            else:
+                clean_meta[k] = str(v)
+        return clean_meta
+
+    @staticmethod
+    def chunk_id(db_name: str, doc_id: str, text_hash: str, occurrence: int) -> str:
+        """
+        Content-addressed chunk ID: stays the same while a chunk's text is
+        unchanged, wherever it moves within the document. occurrence tells
+        repeated identical chunks apart.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{db_name}/{doc_id}/{text_hash}/{occurrence}"))
+
+    @staticmethod
+    def metadata_hash(meta: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def load_manifest(db_name: str, doc_id: str) -> Optional[List[List[str]]]:
+        """Returns the [[chunk_id, metadata_hash], …] last stored for doc_id, or None."""
+        return DocumentEmbedder.load_manifest_state(db_name, doc_id)[0]
+
+    @staticmethod
+    def load_manifest_state(db_name: str, doc_id: str) -> Tuple[Optional[List[List[str]]], bool]:
+        """Returns (manifest or None, whether it lists every stored chunk of doc_id)."""
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(ChunkManifest.chunks_json, ChunkManifest.complete)
+                .filter_by(collection=db_name, doc_id=doc_id)
+                .first()
+            )
+            if row is None:
+                return None, False
+            return json.loads(row.chunks_json), row.complete is not False
+        finally:
+            db.close()
+
+    @staticmethod
+    def save_manifest(
+        db_name: str,
+        doc_id: str,
+        entries: List[List[str]],
+        complete: Optional[bool] = None,
+    ) -> None:
+        """Stores the manifest; complete=None leaves the flag as it was."""
+        db = SessionLocal()
+        try:
+            row = db.query(ChunkManifest).filter_by(collection=db_name, doc_id=doc_id).first()
+            if row is None:
+                row = ChunkManifest(collection=db_name, doc_id=doc_id)
+                db.add(row)
+            row.chunks_json = json.dumps(entries)
+            if complete is not None:
+                row.complete = complete
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def delete_stale_chunks(collection, doc_id: str, keep_ids: List[str]) -> int:
+        """Removes chunks left over from a previous, longer version of the document."""
+        existing = collection.get(where={"doc_id": doc_id}, include=[])
+        keep = set(keep_ids)
+        stale = [i for i in existing.get("ids", []) if i not in keep]
+        if stale:
+            collection.delete(ids=stale)
+        return len(stale)
+
+    @staticmethod
+    def patch_metadata(db_name: str, doc_id: str, patch: Dict[str, Any]) -> int:
+        """
+        Merges patch into the metadata of every stored chunk of doc_id
+        without re-embedding (used for deferred LLM metadata), and records
+        the new metadata hashes in the chunk manifest. Returns the number of
+        chunks patched.
+        """
+        collection = DocumentEmbedder.get_collection(db_name)
+        existing = collection.get(where={"doc_id": doc_id}, include=["metadatas"])
+        ids = existing.get("ids", [])
+        if not ids or not patch:
+            return 0
+
+        clean_patch = DocumentEmbedder.clean_metadata(patch)
+        metadatas = [{**(meta or {}), **clean_patch} for meta in existing["metadatas"]]
+        batch_size = max(1, settings.CHROMA_UPSERT_BATCH_SIZE)
+        for i in range(0, len(ids), batch_size):
+            collection.update(ids=ids[i:i + batch_size], metadatas=metadatas[i:i + batch_size])
+
+        manifest = DocumentEmbedder.load_manifest(db_name, doc_id)
+        if manifest is not None:
+            patched = {chunk_id: DocumentEmbedder.metadata_hash(meta) for chunk_id, meta in zip(ids, metadatas)}
+            DocumentEmbedder.save_manifest(
+                db_name, doc_id, [[chunk_id, patched.get(chunk_id, h)] for chunk_id, h in manifest],
+            )
+        return len(ids)
+
+    @staticmethod
+    def embed_batch(texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a batch of texts with a single multi-input Ollama call to
+        EMBED_ENDPOINT (/api/embed), the endpoint queries are embedded with.
+        """
+        response = ollama.embed(model=settings.EMBEDDING_MODEL, input=texts)
+        embeddings = response.get('embeddings') or []
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        embedding_cache.put_many(texts, embeddings)
+        return embeddings
+
+    @staticmethod
+    def embed_and_store(
+        chunks: Iterable[Dict[str, Any]],
+        db_name: str,
+        common_metadata: Dict[str, Any],
+        doc_id: Optional[str] = None,
+        metrics: Optional[IngestionMetrics] = None,
+        on_checkpoint: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Generates embeddings and stores in the appropriate ChromaDB collection.
+
+        doc_id identifies the logical document across re-ingests and defaults
+        to a hash of its content. Each chunk's ID is derived from its text, and
+        the ordered list of IDs is kept in a ChunkManifest. On re-ingest the
+        new chunks are diffed against that manifest:
+
+          new text                 → embedded and upserted
+          same text, new metadata  → metadata updated in place (e.g. moved,
+                                     so chunk_index changed)
+          unchanged                → left alone
+          no longer present        → deleted
+
+        chunks may be any iterable, e.g. a document streamed from the parser:
+        it is consumed CHROMA_UPSERT_BATCH_SIZE chunks at a time, and only the
+        IDs and metadata hashes of chunks already stored are kept, so memory
+        does not grow with the text. Time spent producing the chunks is not
+        counted as embedding.
+
+        Vectors already in the embedding cache are reused; the remaining
+        chunks are embedded EMBED_BATCH_SIZE at a time with at most
+        EMBED_MAX_IN_FLIGHT batches outstanding. Returns the number of
+        chunks the collection holds for the document afterwards — the
+        length of its manifest.
+
+        The manifest is checkpointed after every committed batch, and
+        on_checkpoint (if given) is called with (chunks stored, chunks seen
+        so far). If any chunk could not be embedded or stored, no new batches
+        are started, the manifest keeps what was committed and RuntimeError
+        is raised — a retry then only embeds the chunks that are still
+        missing. An error raised by chunks itself is re-raised after the
+        same checkpoint.
+
+        When metrics is given, time spent writing to Chroma is recorded as the
+        "upsert" stage and the rest as "embed", along with the chunk counts.
+        """
+        started = time.perf_counter()
+        upsert_seconds = 0.0
+        source_seconds = 0.0
+        collection = DocumentEmbedder.get_collection(db_name)
+        if DocumentEmbedder.collection_space(collection) is None and collection.count() == 0:
+            # A new collection holds only current-space vectors from the start
+            DocumentEmbedder.mark_collection(collection)
+
+        if doc_id is None:
+            chunks = list(chunks)
+            digest = hashlib.sha256()
+            for chunk in chunks:
+                digest.update(chunk["text"].encode("utf-8"))
+                digest.update(b"\x00")
+            doc_id = digest.hexdigest()
+
+        # ── The manifest of the previous version ──────────────────────────────
+        try:
+            manifest, manifest_complete = DocumentEmbedder.load_manifest_state(db_name, doc_id)
+        except Exception as e:
+            print(f"Error loading chunk manifest for doc_id={doc_id}: {e}")
+            manifest, manifest_complete = None, False
+        previous = dict(manifest or [])
+
+        order: List[str] = []            # chunk IDs seen so far, in document order
+        meta_hashes: Dict[str, str] = {}
+        occurrences: Dict[str, int] = {}
+        written = set()                  # hold the new version
+        present = set()                  # hold an older version
+        counts = {"embedded": 0, "cache_hits": 0, "relabelled": 0, "unchanged": 0}
+        failed = False
+
+        def windows():
+            """The chunks as (chunk_id, text, metadata) records, a batch at a time."""
+            nonlocal source_seconds
+            window_size = max(1, settings.CHROMA_UPSERT_BATCH_SIZE)
+            source = iter(chunks)
+            window = []
+            while True:
+                pulled = time.perf_counter()
+                chunk = next(source, None)
+                source_seconds += time.perf_counter() - pulled
+                if chunk is None:
+                    break
+                # Combine chunk specific metadata with common document metadata
+                meta = DocumentEmbedder.clean_metadata(
+                    {**common_metadata, **chunk.get("metadata", {}), "doc_id": doc_id}
+                )
+                text_hash = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
+                occurrence = occurrences.get(text_hash, 0)
+                occurrences[text_hash] = occurrence + 1
+                chunk_id = DocumentEmbedder.chunk_id(db_name, doc_id, text_hash, occurrence)
+                order.append(chunk_id)
+                meta_hashes[chunk_id] = DocumentEmbedder.metadata_hash(meta)
+                window.append((chunk_id, chunk["text"], meta))
+                if len(window) >= window_size:
+                    yield window
+                    window = []
+            if window:
+                yield window
+
+        def checkpoint():
+            """
+            Manifest of what the collection holds right now: new chunks as
+            written, older versions of the rest, and previous chunks not seen
+            yet (still to come, or removed).
+            """
+            entries = []
+            for chunk_id in order:
+                if chunk_id in written:
+                    entries.append([chunk_id, meta_hashes[chunk_id]])
+                elif chunk_id in present:
+                    entries.append([chunk_id, previous[chunk_id]])
+            entries += [[chunk_id, h] for chunk_id, h in previous.items() if chunk_id not in meta_hashes]
             try:
-                # Generate embedding
-                response = ollama.embeddings(model=settings.EMBEDDING_MODEL, prompt=text)
-                embedding = response.get('embedding')
-                
-                if embedding:
-                    # Generate a unique ID for the chunk (can be deterministic if needed)
-                    doc_id = str(uuid.uuid4())
-                    
-                    collection.upsert(
-                        ids=[doc_id],
-                        embeddings=[embedding],
-                        documents=[text],
-                        metadatas=[clean_meta]
-                    )
+                DocumentEmbedder.save_manifest(db_name, doc_id, entries, complete=manifest_complete)
+                if on_checkpoint is not None:
+                    on_checkpoint(len(written), len(order))
             except Exception as e:
-                print(f"Error embedding/storing chunk: {e}")
+                print(f"Error checkpointing chunk manifest for doc_id={doc_id}: {e}")
+
+        # ── Embed + upsert new chunks ────────────────────────────────────────
+        pending = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+
+        def add(chunk_id, text, meta, embedding):
+            pending["ids"].append(chunk_id)
+            pending["embeddings"].append(embedding)
+            pending["documents"].append(text)
+            pending["metadatas"].append(meta)
+
+        def flush():
+            nonlocal upsert_seconds, failed
+            if not pending["ids"]:
+                return
+            write_started = time.perf_counter()
+            try:
+                collection.upsert(**pending)
+                written.update(pending["ids"])
+                checkpoint()
+            except Exception as e:
+                print(f"Error storing {len(pending['ids'])} chunks: {e}")
+                failed = True
+            upsert_seconds += time.perf_counter() - write_started
+            for values in pending.values():
+                values.clear()
+
+        def relabel(records):
+            """Metadata-only updates of chunks whose text is already stored."""
+            nonlocal upsert_seconds
+            write_started = time.perf_counter()
+            try:
+                collection.update(ids=[r[0] for r in records], metadatas=[r[2] for r in records])
+                written.update(r[0] for r in records)
+            except Exception as e:
+                print(f"Error updating metadata of {len(records)} chunks: {e}")
+            upsert_seconds += time.perf_counter() - write_started
+
+        source_error = None
+        embed_size = max(1, settings.EMBED_BATCH_SIZE)
+        max_in_flight = max(1, settings.EMBED_MAX_IN_FLIGHT)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            in_flight = deque()
+
+            def drain(limit: int) -> None:
+                """
+                Consume finished batches, oldest first, until at most limit
+                are outstanding, so only that many are ever buffered.
+                """
+                nonlocal failed
+                while len(in_flight) > limit:
+                    batch, future = in_flight.popleft()
+                    try:
+                        embeddings = future.result()
+                    except Exception as e:
+                        print(f"Error embedding batch of {len(batch)} chunks: {e}")
+                        failed = True
+                        continue
+                    for record, embedding in zip(batch, embeddings):
+                        add(*record, embedding)
+                    if len(pending["ids"]) >= settings.CHROMA_UPSERT_BATCH_SIZE:
+                        flush()
+
+            try:
+                for window in windows():
+                    # Trust the manifest only for chunks the collection still holds
+                    known = [r[0] for r in window if r[0] in previous]
+                    if known:
+                        try:
+                            present.update(collection.get(ids=known, include=[]).get("ids", []))
+                        except Exception as e:
+                            print(f"Error checking existing chunks for doc_id={doc_id}: {e}")
+
+                    to_embed, to_update = [], []
+                    for record in window:
+                        chunk_id = record[0]
+                        if chunk_id not in present:
+                            to_embed.append(record)
+                        elif previous[chunk_id] != meta_hashes[chunk_id]:
+                            to_update.append(record)
+                        else:
+                            written.add(chunk_id)
+                            counts["unchanged"] += 1
+                    if to_update:
+                        relabel(to_update)
+                        counts["relabelled"] += len(to_update)
+
+                    counts["embedded"] += len(to_embed)
+                    cached = embedding_cache.get_many([text for _, text, _ in to_embed])
+                    misses = []
+                    for record, embedding in zip(to_embed, cached):
+                        if embedding is None:
+                            misses.append(record)
+                        else:
+                            counts["cache_hits"] += 1
+                            add(*record, embedding)
+                    if len(pending["ids"]) >= settings.CHROMA_UPSERT_BATCH_SIZE:
+                        flush()
+
+                    for i in range(0, len(misses), embed_size):
+                        if failed:
+                            break
+                        batch = misses[i:i + embed_size]
+                        in_flight.append((batch, pool.submit(DocumentEmbedder.embed_batch, [t for _, t, _ in batch])))
+                        drain(max_in_flight - 1)
+                    if failed:
+                        break
+            except Exception as e:
+                source_error = e
+            drain(0)
+
+        flush()
+
+        def record_metrics(removed: int) -> None:
+            if metrics is None:
+                return
+            metrics.add("upsert", upsert_seconds)
+            metrics.add("embed", max(time.perf_counter() - started - upsert_seconds - source_seconds, 0.0))
+            metrics.count("chunks_embedded", counts["embedded"])
+            metrics.count("embed_cache_hits", counts["cache_hits"])
+            metrics.count("chunks_relabelled", counts["relabelled"])
+            metrics.count("chunks_unchanged", counts["unchanged"])
+            metrics.count("chunks_removed", removed)
+
+        missing = len(order) - len(written)
+        if source_error is not None or failed or missing:
+            # Keep the committed batches; the next run embeds only the rest
+            checkpoint()
+            record_metrics(0)
+            if source_error is not None:
+                raise source_error
+            raise RuntimeError(
+                f"{missing} of {len(order)} chunks seen could not be embedded or stored "
+                f"(progress checkpointed at {len(written)})"
+            )
+
+        # ── Record the new manifest, then drop removed chunks ────────────────
+        # If the manifest can't be saved the removed chunks are kept, so the
+        # old manifest still describes what the collection holds.
+        removed = [chunk_id for chunk_id in previous if chunk_id not in meta_hashes]
+        entries = [[chunk_id, meta_hashes[chunk_id]] for chunk_id in order]
+        write_started = time.perf_counter()
+        try:
+            DocumentEmbedder.save_manifest(db_name, doc_id, entries, complete=True)
+            if manifest is None or not manifest_complete:
+                # First full manifest for this document: sweep chunks written
+                # by older versions (position-based IDs) by their doc_id instead
+                swept = DocumentEmbedder.delete_stale_chunks(collection, doc_id, list(written))
+            elif removed:
+                collection.delete(ids=removed)
+                swept = len(removed)
+            else:
+                swept = 0
+        except Exception as e:
+            print(f"Error updating chunk manifest for doc_id={doc_id}: {e}")
+            swept = 0
+        upsert_seconds += time.perf_counter() - write_started
+        record_metrics(swept)
+
+        print(
+            f"  Chunks: {counts['embedded']} embedded, {counts['relabelled']} re-labelled, "
+            f"{counts['unchanged']} unchanged, {swept} removed"
+        )
+        return len(written)
@@ -0,0 +1,236 @@
+"""
+ingestion/embedding_cache.py
+────────────────────────────
+Content-addressed embedding cache shared by ingestion and retrieval.
+
+Vectors are keyed by (embedding space, sha256(text)) so identical text is
+only ever embedded once per model — re-ingesting a document after a chunker
+tweak only pays for the chunks whose text actually changed.
+
+The embedding space is EMBEDDING_MODEL plus the Ollama endpoint that made
+the vector (see embedding_space). Queries and documents must come from the
+same space: /api/embed returns unit-length vectors, the legacy
+/api/embeddings did not, and Chroma's default L2 distance tells them apart.
+
+Tiers
+─────
+  1. In-process LRU (EMBED_CACHE_MEMORY_ITEMS entries)
+  2. Local SQLite file (EMBED_CACHE_PATH), float32 BLOBs, evicted
+     least-recently-used once the stored vectors exceed EMBED_CACHE_MAX_BYTES
+
+Cache failures are never fatal: a broken cache behaves like a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from config.settings import settings
+
+# SQLite caps the number of bound parameters per statement
+_SQL_BATCH = 500
+
+# The Ollama endpoint every vector is embedded with, for documents and
+# queries alike. Changing it means re-embedding: ingest_cli.py --reembed.
+EMBED_ENDPOINT = "embed"
+
+
+def embedding_space(model: Optional[str] = None) -> str:
+    """"<model>@<endpoint>": vectors are only comparable within one space."""
+    return f"{model or settings.EMBEDDING_MODEL}@{EMBED_ENDPOINT}"
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_bytes: int, memory_items: int):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._memory_items = memory_items
+        self._lru: OrderedDict[tuple[str, str], List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._approx_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ── Keys ──────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    # ── Storage ───────────────────────────────────────────────────────────────
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open lazily, and re-open after fork so worker processes never share a handle."""
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                       model     TEXT    NOT NULL,
+                       text_hash TEXT    NOT NULL,
+                       vector    BLOB    NOT NULL,
+                       last_used REAL    NOT NULL,
+                       PRIMARY KEY (model, text_hash)
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+            # Rows keyed by model name alone predate embedding spaces; the
+            # cache has only ever stored /api/embed vectors, so adopt them
+            conn.execute(
+                "UPDATE OR IGNORE embeddings SET model = model || ? WHERE model NOT LIKE '%@%'",
+                (f"@{EMBED_ENDPOINT}",),
+            )
+            conn.execute("DELETE FROM embeddings WHERE model NOT LIKE '%@%'")
+            conn.commit()
+            self._approx_bytes = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key: tuple[str, str], vector: List[float]) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._memory_items:
+            self._lru.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least-recently-used vectors until the store is under 90% of its budget."""
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        self._approx_bytes = total
+        if total <= self._max_bytes:
+            return
+
+        target = int(self._max_bytes * 0.9)
+        victims = []
+        for model, text_hash, size in conn.execute(
+            "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            if total <= target:
+                break
+            victims.append((model, text_hash))
+            total -= size
+
+        conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+        conn.commit()
+        for key in victims:
+            self._lru.pop(key, None)
+        self.evictions += len(victims)
+        self._approx_bytes = total
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def get_many(self, texts: Sequence[str], model: Optional[str] = None) -> List[Optional[List[float]]]:
+        """Returns one vector (or None on a miss) per input text, in order."""
+        model = embedding_space(model)
+        keys = [(model, self.text_hash(t)) for t in texts]
+        found: Dict[tuple[str, str], List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                    self.memory_hits += 1
+
+            wanted = {k[1] for k in keys if k not in found}
+            if wanted:
+                try:
+                    conn = self._connection()
+                    now = time.time()
+                    pending = list(wanted)
+                    for i in range(0, len(pending), _SQL_BATCH):
+                        part = pending[i:i + _SQL_BATCH]
+                        marks = ",".join("?" * len(part))
+                        rows = conn.execute(
+                            f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                            [model, *part],
+                        ).fetchall()
+                        for text_hash, blob in rows:
+                            vector = array("f", blob).tolist()
+                            found[(model, text_hash)] = vector
+                            self._remember((model, text_hash), vector)
+                        if rows:
+                            conn.execute(
+                                f"UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash IN ({marks})",
+                                [now, model, *part],
+                            )
+                    conn.commit()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Embedding cache read failed: {e}")
+
+            results = []
+            for key in keys:
+                vector = found.get(key)
+                if vector is None:
+                    self.misses += 1
+                elif key[1] in wanted:
+                    self.disk_hits += 1
+                results.append(vector)
+            return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[List[float]], model: Optional[str] = None) -> None:
+        model = embedding_space(model)
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model, self.text_hash(text))
+                self._remember(key, list(vector))
+                rows.append((model, key[1], array("f", vector).tobytes(), now))
+
+            if not rows:
+                return
+            try:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+                self._approx_bytes += sum(len(r[2]) for r in rows)
+                if self._approx_bytes > self._max_bytes:
+                    self._evict(conn)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Embedding cache write failed: {e}")
+
+    def get(self, text: str, model: Optional[str] = None) -> Optional[List[float]]:
+        return self.get_many([text], model)[0]
+
+    def put(self, text: str, vector: List[float], model: Optional[str] = None) -> None:
+        self.put_many([text], [vector], model)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_items": len(self._lru),
+            "stored_bytes": self._approx_bytes,
+            "max_bytes": self._max_bytes,
+        }
+
+
+embedding_cache = EmbeddingCache(
+    path=settings.EMBED_CACHE_PATH,
+    max_bytes=settings.EMBED_CACHE_MAX_BYTES,
+    memory_items=settings.EMBED_CACHE_MEMORY_ITEMS,
+)
@@ -0,0 +1,142 @@
+"""
+ingestion/ingest_metrics.py
+───────────────────────────
+Per-file ingestion instrumentation: wall time per pipeline stage, peak
+Python heap (tracemalloc), bytes parsed, chunk counts and embedding
+throughput. ingest_file / ingest_case_file store the result in the
+ingest_metrics JSON column; GET /api/ingestion-metrics aggregates it.
+
+Stages
+──────
+  store     – write to the blob store
+  parse     – text extraction (PDF / DOCX / TXT)
+  chunk     – chunking, excluding the parser time it streams from
+  metadata  – regex (and cached / inline LLM) metadata
+  embed     – cache lookups and waiting on Ollama embeddings
+  upsert    – ChromaDB writes, deletes and the chunk manifest
+
+Peak memory is process-wide: with several files ingesting at once
+(ingest_cli --workers) it covers all of them, and parsing that runs in a
+process pool is not included.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.settings import settings
+
+STAGES = ("store", "parse", "chunk", "metadata", "embed", "upsert")
+
+# tracemalloc is process-global; keep it running while any ingestion is
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+
+class IngestionMetrics:
+    """Collects the timings and counters of one file's ingestion."""
+
+    def __init__(self, trace_memory: Optional[bool] = None):
+        global _trace_users
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.current_stage: Optional[str] = None
+        self._started = time.perf_counter()
+        self._trace = settings.INGEST_TRACE_MEMORY if trace_memory is None else trace_memory
+        if self._trace:
+            with _trace_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                _trace_users += 1
+                tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block and adds it to stage `name`."""
+        self.current_stage = name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self, failed: bool = False) -> Dict[str, Any]:
+        """Stops memory tracing (if last user) and returns the JSON-ready record."""
+        global _trace_users
+        peak = None
+        if self._trace:
+            with _trace_lock:
+                if tracemalloc.is_tracing():
+                    peak = tracemalloc.get_traced_memory()[1]
+                _trace_users -= 1
+                if _trace_users <= 0:
+                    _trace_users = 0
+                    tracemalloc.stop()
+            self._trace = False
+
+        embed_seconds = self.stages.get("embed", 0.0)
+        embedded = self.counters.get("chunks_embedded", 0)
+        record: Dict[str, Any] = {
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "peak_memory_bytes": peak,
+            **self.counters,
+            "embed_chunks_per_second": round(embedded / embed_seconds, 2) if embed_seconds and embedded else None,
+        }
+        if failed:
+            record["failed_stage"] = self.current_stage
+        return record
+
+    def summary_line(self) -> str:
+        return " · ".join(f"{name} {seconds:.2f}s" for name, seconds in self.stages.items())
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0–100) of an ascending list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def _distribution(values: Iterable[float]) -> Optional[Dict[str, float]]:
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 50), 4),
+        "p95": round(percentile(ordered, 95), 4),
+        "p99": round(percentile(ordered, 99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """p50 / p95 / p99 per stage and overall, over a set of ingest_metrics records."""
+    stage_names = [s for s in STAGES if any(s in r.get("stages", {}) for r in records)]
+    stage_names += sorted({s for r in records for s in r.get("stages", {})} - set(stage_names))
+    return {
+        "files": len(records),
+        "failed": sum(1 for r in records if r.get("failed_stage")),
+        "stages": {
+            name: _distribution(r["stages"][name] for r in records if name in r.get("stages", {}))
+            for name in stage_names
+        },
+        "total_seconds": _distribution(r.get("total_seconds") for r in records),
+        "peak_memory_bytes": _distribution(r.get("peak_memory_bytes") for r in records),
+        "bytes_parsed": _distribution(r.get("bytes_parsed") for r in records),
+        "embed_chunks_per_second": _distribution(r.get("embed_chunks_per_second") for r in records),
+    }
@@ -0,0 +1,187 @@
+"""
+ingestion/job_queue.py
+──────────────────────
+PostgreSQL-backed queue of ingestion work (table: ingestion_jobs).
+
+The API enqueues a job and returns immediately; ingest_worker processes
+claim jobs with SELECT … FOR UPDATE SKIP LOCKED, so several workers on one
+or more machines never pick up the same job.
+
+Job lifecycle
+─────────────
+  queued ──claim──▶ running ──▶ succeeded
+     ▲                 │
+     └── retry with ◀──┴──▶ failed   (after max_attempts)
+         backoff
+
+A running job whose worker stops heart-beating for INGEST_JOB_LEASE_SECONDS
+is treated as abandoned and becomes claimable again.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+from config.postgres import SessionLocal, IngestionJob, JobState, JobType
+from config.settings import settings
+
+
+def _new_job(job_type: JobType, payload: dict, file_data: bytes | None) -> IngestionJob:
+    return IngestionJob(
+        job_type=job_type,
+        state=JobState.queued,
+        payload_json=json.dumps(payload),
+        file_data=file_data,
+        max_attempts=settings.INGEST_JOB_MAX_ATTEMPTS,
+        run_after=datetime.datetime.utcnow(),
+    )
+
+
+def enqueue(
+    db_session,
+    job_type: JobType,
+    payload: dict,
+    file_data: bytes | None = None,
+    commit: bool = True,
+) -> IngestionJob:
+    """
+    Insert a QUEUED job and commit so workers can see it immediately.
+    With commit=False it is only flushed, so the caller can commit it in one
+    transaction with the row the job works on — never one without the other.
+    """
+    job = _new_job(job_type, payload, file_data)
+    db_session.add(job)
+    if commit:
+        db_session.commit()
+    else:
+        db_session.flush()
+    return job
+
+
+async def aenqueue(
+    db_session,
+    job_type: JobType,
+    payload: dict,
+    file_data: bytes | None = None,
+) -> IngestionJob:
+    """enqueue() on an AsyncSession (get_async_db): awaits the INSERT and commit."""
+    job = _new_job(job_type, payload, file_data)
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+def claim(db_session, worker_id: str) -> IngestionJob | None:
+    """
+    Atomically claim the oldest runnable job, or return None.
+    Rows locked by other workers are skipped rather than waited on.
+    """
+    now = datetime.datetime.utcnow()
+    lease_expired = now - datetime.timedelta(seconds=settings.INGEST_JOB_LEASE_SECONDS)
+
+    job = (
+        db_session.query(IngestionJob)
+        .filter(
+            or_(
+                and_(IngestionJob.state == JobState.queued, IngestionJob.run_after <= now),
+                and_(IngestionJob.state == JobState.running, IngestionJob.locked_at < lease_expired),
+            )
+        )
+        .order_by(IngestionJob.run_after, IngestionJob.id)
+        .with_for_update(skip_locked=True)
+        .limit(1)
+        .first()
+    )
+    if job is None:
+        db_session.rollback()
+        return None
+
+    job.state = JobState.running
+    job.locked_by = worker_id
+    job.locked_at = now
+    job.attempts += 1
+    job.progress = "claimed"
+    db_session.commit()
+    return job
+
+
+def heartbeat(job_id: int, progress: str | None = None) -> None:
+    """
+    Extend a running job's lease and optionally record its pipeline stage.
+    Uses its own short session so it is safe to call from a heartbeat thread.
+    """
+    values = {"locked_at": datetime.datetime.utcnow()}
+    if progress is not None:
+        values["progress"] = progress
+    db_session = SessionLocal()
+    try:
+        db_session.query(IngestionJob).filter(
+            IngestionJob.id == job_id, IngestionJob.state == JobState.running,
+        ).update(values, synchronize_session=False)
+        db_session.commit()
+    finally:
+        db_session.close()
+
+
+def update_payload(job_id: int, **fields) -> None:
+    """
+    Merge fields into a job's payload (e.g. the row its first attempt
+    created, for the retries). Own short session, committed at once.
+    """
+    db_session = SessionLocal()
+    try:
+        job = db_session.get(IngestionJob, job_id)
+        if job is not None:
+            job.payload_json = json.dumps({**json.loads(job.payload_json), **fields})
+            db_session.commit()
+    finally:
+        db_session.close()
+
+
+def complete(db_session, job: IngestionJob, result: dict) -> None:
+    job.state = JobState.succeeded
+    job.progress = "done"
+    job.result_json = json.dumps(result)
+    job.last_error = None
+    job.file_data = None
+    job.finished_at = datetime.datetime.utcnow()
+    db_session.commit()
+
+
+def fail(db_session, job: IngestionJob, error: str) -> None:
+    """Re-queue with exponential backoff, or mark FAILED once attempts are exhausted."""
+    job.last_error = error[:1024]
+    job.locked_by = None
+    if job.attempts < job.max_attempts:
+        delay = settings.INGEST_JOB_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        job.state = JobState.queued
+        job.progress = f"retrying in {delay}s"
+        job.run_after = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+    else:
+        job.state = JobState.failed
+        job.progress = "failed"
+        job.file_data = None
+        job.finished_at = datetime.datetime.utcnow()
+    db_session.commit()
+
+
+def job_status(job: IngestionJob) -> dict:
+    """Serialisable view of a job for the status endpoint."""
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type.value if hasattr(job.job_type, "value") else str(job.job_type),
+        "state": job.state.value if hasattr(job.state, "value") else str(job.state),
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "payload": json.loads(job.payload_json),
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
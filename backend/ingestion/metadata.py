@@ -1,11 +1,119 @@
+import hashlib
 import json
+import re
 import ollama
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from config.postgres import SessionLocal, MetadataCache
+
+# ── Rule-based patterns (compiled once) ──────────────────────────────────────
+_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|"
+    r"Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+DATE_PATTERN = re.compile(
+    r"\b(\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"                     # 2081-04-15, 2024/07/30
+    r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{4}"                       # 30/07/2024
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTHS}\.?,?\s+\d{{4}}"  # 30th July, 2024
+    rf"|{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}})\b",  # July 30, 2024
+    re.IGNORECASE,
+)
+COURT_PATTERN = re.compile(
+    r"\b((?:Supreme|High|District|Appellate|Special|Administrative|Federal|"
+    r"Constitutional|Commercial|Family|Labour|Labor|Magistrate'?s?)\s+Court"
+    r"(?:\s+of\s+[A-Z][\w.]*(?:\s+[A-Z][\w.]*){0,3}|,\s*[A-Z][a-z]+)?)"
+)
+CASE_NUMBER_PATTERN = re.compile(
+    r"\b(?:Case|Writ|Civil|Criminal|Appeal|Petition|Suit|Reference)?\s*"
+    r"(?:No\.?|Number|#)\s*[:.]?\s*(\d[\w/-]*\d|\d)\b",
+    re.IGNORECASE,
+)
+VERSUS_PATTERN = re.compile(
+    r"^\s*(.{3,150}?)\s+(?:v\.?|vs\.?|versus)\s+(.{3,150}?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+PLAINTIFF_PATTERN = re.compile(
+    r"^\s*(?:Plaintiff|Petitioner|Appellant|Complainant|Applicant)s?\s*[:\-–]\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+DEFENDANT_PATTERN = re.compile(
+    r"^\s*(?:Defendant|Respondent|Accused|Opposite\s+Party)s?\s*[:\-–]\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Keys set per chunk by the chunker / embedder; never taken from the LLM
+_RESERVED_KEYS = {"doc_id", "chunk_index", "chunk_total", "chunk_type"}
+
+
+def _unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(v for v in values if v))
+
 
 class MetadataExtractor:
     @staticmethod
-    def extract_with_llm(text: str, model_name: str = "llama3.2") -> Dict[str, Any]:
-        """Uses Ollama to extract metadata from the first page of a document."""
+    def extract_with_rules(text: str) -> Dict[str, Any]:
+        """
+        Fast regex pass over the first page of a document: title, date,
+        court, case number and parties. Only fields that were found are
+        returned.
+        """
+        head = text[:2000]
+        meta: Dict[str, Any] = {}
+
+        for line in head.splitlines():
+            if line.strip():
+                meta["title"] = line.strip()[:200]
+                break
+
+        match = DATE_PATTERN.search(head)
+        if match:
+            meta["date"] = match.group(1)
+        match = COURT_PATTERN.search(head)
+        if match:
+            meta["court"] = match.group(1).strip()
+        match = CASE_NUMBER_PATTERN.search(head)
+        if match:
+            meta["case_number"] = match.group(1)
+
+        plaintiffs = PLAINTIFF_PATTERN.findall(head)
+        defendants = DEFENDANT_PATTERN.findall(head)
+        match = VERSUS_PATTERN.search(head)
+        if match:
+            plaintiffs.append(match.group(1).strip())
+            defendants.append(match.group(2).strip())
+        if plaintiffs:
+            meta["plaintiff"] = _unique(plaintiffs)
+        if defendants:
+            meta["defendant"] = _unique(defendants)
+        return meta
+
+    @staticmethod
+    def cached_llm_metadata(text: str, model_name: str) -> Optional[Dict[str, Any]]:
+        """Previously extracted LLM metadata for exactly this text, or None."""
+        text_hash = hashlib.sha256(text[:2000].encode("utf-8")).hexdigest()
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(MetadataCache.metadata_json)
+                .filter_by(text_sha256=text_hash, model=model_name)
+                .first()
+            )
+            return json.loads(row.metadata_json) if row else None
+        except Exception as e:
+            print(f"Error reading metadata cache: {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def llm_metadata(text: str, model_name: str = "llama3.2") -> Dict[str, Any]:
+        """
+        LLM extraction with a cache keyed by the hash of the text the model
+        sees. Raises if the model call or its JSON fails, so callers can retry.
+        """
+        cached = MetadataExtractor.cached_llm_metadata(text, model_name)
+        if cached is not None:
+            return cached
+
         prompt = f"""Extract the following fields from this legal document header and return as JSON:
 title, date, court, judge (list), plaintiff (list), plaintiff_atty (list),
 defendant (list), defendant_atty (list), case_type, subject_tags (list of keywords).
@@ -13,18 +121,53 @@ defendant (list), defendant_atty (list), case_type, subject_tags (list of keywor
 Document:
 {text[:2000]}
 """
+        response = ollama.chat(
+            model=model_name,
+            messages=[{'role': 'user', 'content': prompt}],
+            format='json'
+        )
+        content = response.get('message', {}).get('content', '{}')
+        extracted = json.loads(content)
+        if not isinstance(extracted, dict):
+            raise ValueError(f"Expected a JSON object, got {type(extracted).__name__}")
+
+        db = SessionLocal()
         try:
-            response = ollama.chat(
+            db.add(MetadataCache(
+                text_sha256=hashlib.sha256(text[:2000].encode("utf-8")).hexdigest(),
                 model=model_name,
-                messages=[{'role': 'user', 'content': prompt}],
-                format='json'
-            )
-            content = response.get('message', {}).get('content', '{}')
-            return json.loads(content)
+                metadata_json=json.dumps(extracted),
+            ))
+            db.commit()
+        except Exception as e:
+            # Another worker may have cached the same text first
+            db.rollback()
+            print(f"Error writing metadata cache: {e}")
+        finally:
+            db.close()
+        return extracted
+
+    @staticmethod
+    def extract_with_llm(text: str, model_name: str = "llama3.2") -> Dict[str, Any]:
+        """Uses Ollama to extract metadata from the first page of a document."""
+        try:
+            return MetadataExtractor.llm_metadata(text, model_name)
         except Exception as e:
             print(f"Error extracting metadata: {e}")
             return {}
 
+    @staticmethod
+    def llm_fields(extracted: Dict[str, Any], manual: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        The LLM fields that should override rule-based values: non-empty,
+        not a per-chunk key, and not already supplied as a manual input.
+        """
+        manual = manual or {}
+        return {
+            k: v for k, v in extracted.items()
+            if v not in (None, "", [], {}) and k not in _RESERVED_KEYS and not manual.get(k)
+        }
+
     @staticmethod
     def merge_metadata(extracted: Dict[str, Any], manual: Dict[str, Any]) -> Dict[str, Any]:
         """Merges LLM extracted metadata with manual inputs/defaults."""
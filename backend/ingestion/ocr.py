@@ -0,0 +1,244 @@
+"""
+ingestion/ocr.py
+────────────────
+OCR fallback for scanned PDFs (FIRs, affidavits, stamped copies).
+
+DocumentParser.iter_pdf passes the text layer of every page through
+fill_missing_pages(). Pages with (almost) no text layer are rasterized and
+run through Tesseract in a process pool; their text is slotted back in page
+order, so the chunker still receives the document as one ordered stream.
+
+Rasterizing uses pdf2image (poppler) when it is available; otherwise the
+page's embedded images — which is all a scanned page is — are OCR'd as-is.
+
+Per-document limits
+───────────────────
+  OCR_MAX_PAGES        – pages past this budget keep their (empty) text layer
+  OCR_TIMEOUT_SECONDS  – wall-clock budget; pages not done by then are dropped
+
+OCR output is cached per (page fingerprint, OCR_LANG, OCR_DPI) in a local
+SQLite file (OCR_CACHE_PATH), so re-ingesting a scan never OCRs a page
+twice. Cache failures are never fatal: a broken cache behaves like a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from io import BytesIO
+from typing import Iterable, Iterator, List, Optional, Union
+
+from pypdf import PdfReader
+
+from config.settings import settings
+
+# Per-process state for OCR workers, built once per worker by _init_ocr_worker
+_worker_source: Optional[Union[str, bytes]] = None
+_worker_reader: Optional[PdfReader] = None
+
+_cache_lock = threading.Lock()
+_cache_conn: Optional[sqlite3.Connection] = None
+_cache_pid: Optional[int] = None
+
+
+def needs_ocr(text: str) -> bool:
+    """True when a page's text layer is too thin to be the real content."""
+    return len(text.strip()) < settings.OCR_MIN_TEXT_CHARS
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+def _cache_key() -> str:
+    return f"{settings.OCR_LANG}@{settings.OCR_DPI}"
+
+
+def _connection() -> sqlite3.Connection:
+    """Open lazily, and re-open after fork so worker processes never share a handle."""
+    global _cache_conn, _cache_pid
+    if _cache_conn is None or _cache_pid != os.getpid():
+        os.makedirs(os.path.dirname(settings.OCR_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(settings.OCR_CACHE_PATH, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS ocr_pages (
+                   page_hash TEXT NOT NULL,
+                   config    TEXT NOT NULL,
+                   text      TEXT NOT NULL,
+                   PRIMARY KEY (page_hash, config)
+               )"""
+        )
+        conn.commit()
+        _cache_conn = conn
+        _cache_pid = os.getpid()
+    return _cache_conn
+
+
+def _cache_get(page_hash: str) -> Optional[str]:
+    with _cache_lock:
+        try:
+            row = _connection().execute(
+                "SELECT text FROM ocr_pages WHERE page_hash = ? AND config = ?",
+                (page_hash, _cache_key()),
+            ).fetchone()
+            return row[0] if row else None
+        except (sqlite3.Error, OSError) as e:
+            print(f"OCR cache read failed: {e}")
+            return None
+
+
+def _cache_put(page_hash: str, text: str) -> None:
+    with _cache_lock:
+        try:
+            conn = _connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_pages (page_hash, config, text) VALUES (?, ?, ?)",
+                (page_hash, _cache_key(), text),
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            print(f"OCR cache write failed: {e}")
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+def _init_ocr_worker(source: Union[str, bytes]) -> None:
+    global _worker_source, _worker_reader
+    _worker_source = source
+    _worker_reader = PdfReader(source if isinstance(source, str) else BytesIO(source))
+
+
+def page_fingerprint(page) -> str:
+    """SHA-256 of a page's content stream and the bytes of its images."""
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    for image in page.images:
+        digest.update(image.data)
+    return digest.hexdigest()
+
+
+def _page_images(page, index: int) -> List:
+    """The page rendered at OCR_DPI, or its embedded images without poppler."""
+    try:
+        from pdf2image import convert_from_bytes, convert_from_path
+        convert = convert_from_path if isinstance(_worker_source, str) else convert_from_bytes
+        return convert(_worker_source, dpi=settings.OCR_DPI, first_page=index + 1, last_page=index + 1)
+    except Exception:
+        # pdf2image or poppler missing — fall back to the scan images themselves
+        return [image.image for image in page.images]
+
+
+def _ocr_page(index: int, deadline: float) -> tuple[str, bool]:
+    """OCR one page of the worker's PDF. Returns (text, served_from_cache)."""
+    import pytesseract
+
+    page = _worker_reader.pages[index]
+    page_hash = page_fingerprint(page)
+    cached = _cache_get(page_hash)
+    if cached is not None:
+        return cached, True
+
+    texts = []
+    for image in _page_images(page, index):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError("OCR time budget exhausted")
+        texts.append(pytesseract.image_to_string(image, lang=settings.OCR_LANG, timeout=remaining))
+    text = "\n".join(t.strip() for t in texts if t.strip())
+    _cache_put(page_hash, text)
+    return text, False
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def fill_missing_pages(
+    source: Union[str, bytes],
+    pages: Iterable[str],
+    workers: int,
+) -> Iterator[str]:
+    """
+    Yields the text of each page in order ("\\n"-terminated, blank pages
+    dropped), OCR-ing the pages whose text layer needs_ocr(). At most
+    2 × workers pages are buffered ahead of the one being yielded.
+    workers <= 1 OCRs in-process, one page at a time.
+    """
+    deadline = time.time() + settings.OCR_TIMEOUT_SECONDS
+    limit = 2 * max(workers, 1)
+    window: deque = deque()    # page text, or (text layer, OCR future), in page order
+    pool: Optional[ProcessPoolExecutor] = None
+    submitted = cached = failed = over_budget = 0
+    expired = False
+
+    def resolve(item) -> str:
+        nonlocal cached, failed, expired
+        if isinstance(item, str):
+            return item
+        fallback, future = item
+        try:
+            text, hit = future.result(timeout=max(deadline - time.time(), 0))
+        except (FutureTimeout, TimeoutError):
+            expired = True
+            failed += 1
+            return fallback
+        except Exception as e:
+            if not failed:
+                print(f"  OCR failed: {e}")
+            failed += 1
+            return fallback
+        cached += hit
+        return text
+
+    def run_inline(index: int) -> Future:
+        if _worker_source is not source:
+            _init_ocr_worker(source)
+        future: Future = Future()
+        try:
+            future.set_result(_ocr_page(index, deadline))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    try:
+        for index, text in enumerate(pages):
+            if not needs_ocr(text) or expired:
+                window.append(text)
+            elif submitted >= settings.OCR_MAX_PAGES:
+                over_budget += 1
+                window.append(text)
+            else:
+                submitted += 1
+                if workers <= 1:
+                    window.append((text, run_inline(index)))
+                else:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(
+                            max_workers=workers,
+                            initializer=_init_ocr_worker,
+                            initargs=(source,),
+                        )
+                    window.append((text, pool.submit(_ocr_page, index, deadline)))
+
+            while window and (len(window) > limit or isinstance(window[0], str) or window[0][1].done()):
+                page_text = resolve(window.popleft())
+                if page_text:
+                    yield page_text + "\n"
+
+        while window:
+            page_text = resolve(window.popleft())
+            if page_text:
+                yield page_text + "\n"
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if submitted or over_budget:
+            print(
+                f"  OCR: {submitted} pages ({cached} cached, {failed} failed), "
+                f"{over_budget} over the {settings.OCR_MAX_PAGES}-page budget"
+                + (" — timed out" if expired else "")
+            )
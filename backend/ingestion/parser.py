@@ -1,58 +1,194 @@
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from typing import BinaryIO, Iterator, List, Optional, Union
 from pypdf import PdfReader
 from docx import Document
+from config.settings import settings
+from ingestion import ocr
+
+# A file path, raw file bytes, or any readable binary buffer
+Source = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+# Per-process PdfReader for page-parallel extraction, built once per worker
+_worker_reader: Optional[PdfReader] = None
+
+
+def _as_stream(source: Source):
+    """pypdf / python-docx accept a path or a binary stream; wrap raw bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    return source
+
+
+def _describe(source: Source) -> str:
+    return source if isinstance(source, str) else f"<{type(source).__name__}>"
+
+
+def _init_pdf_worker(source: Union[str, bytes]) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(_as_stream(source))
+
+
+def _extract_page_range(start: int, end: int) -> List[str]:
+    """Worker for page-parallel extraction; top-level so it can be pickled."""
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, end)]
+
 
 class DocumentParser:
     @staticmethod
-    def parse_pdf(file_path: str) -> str:
-        """Parses a digital PDF and returns extracted text."""
-        text = ""
+    def iter_pdf(source: Source, page_workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields the text of a PDF one page at a time.
+
+        PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into
+        PDF_PAGE_RANGE_SIZE ranges and extracted across a process pool. At
+        most page_workers ranges are in flight, so memory is bounded by that
+        window of pages rather than by the size of the document.
+
+        Pages without a usable text layer (scans) are OCR'd when OCR_ENABLED;
+        see ingestion/ocr.py. An explicit page_workers also sizes the OCR pool.
+
+        Errors are logged and re-raised: a failure part-way (e.g. a broken
+        worker pool) must fail the ingestion, not end the document early.
+        """
+        ocr_workers = page_workers
+        if page_workers is None:
+            page_workers = settings.PDF_PAGE_WORKERS or os.cpu_count() or 1
+            ocr_workers = settings.OCR_WORKERS or os.cpu_count() or 1
         try:
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
+            if hasattr(source, "read"):
+                source = source.read()
+            # Workers get the path or bytes once, via the initializer, not per task
+            worker_source = source if isinstance(source, str) else bytes(source)
+            pages = DocumentParser._iter_pdf_pages(worker_source, page_workers)
+            if settings.OCR_ENABLED:
+                yield from ocr.fill_missing_pages(worker_source, pages, ocr_workers)
+            else:
+                for extracted in pages:
+                    if extracted:
+                        yield extracted + "\n"
         except Exception as e:
-            print(f"Error parsing PDF {file_path}: {e}")
-        return text
+            print(f"Error parsing PDF {_describe(source)}: {e}")
+            raise
 
     @staticmethod
-    def parse_docx(file_path: str) -> str:
-        """Parses a DOCX file and returns extracted text."""
-        text = ""
+    def _iter_pdf_pages(source: Union[str, bytes], page_workers: int) -> Iterator[str]:
+        """The text layer of every page, in order; "" for a page without one."""
+        reader = PdfReader(_as_stream(source))
+        num_pages = len(reader.pages)
+
+        if page_workers <= 1 or num_pages < settings.PDF_PARALLEL_MIN_PAGES:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+
+        step = max(1, settings.PDF_PAGE_RANGE_SIZE)
+        ranges = iter([(s, min(s + step, num_pages)) for s in range(0, num_pages, step)])
+        with ProcessPoolExecutor(
+            max_workers=page_workers,
+            initializer=_init_pdf_worker,
+            initargs=(source,),
+        ) as pool:
+            in_flight = deque()
+            for start, end in ranges:
+                in_flight.append(pool.submit(_extract_page_range, start, end))
+                if len(in_flight) >= page_workers:
+                    break
+            while in_flight:
+                pages = in_flight.popleft().result()
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    in_flight.append(pool.submit(_extract_page_range, *next_range))
+                yield from pages
+
+    @staticmethod
+    def iter_docx(source: Source) -> Iterator[str]:
+        """Yields the paragraphs of a DOCX file."""
         try:
-            doc = Document(file_path)
+            doc = Document(_as_stream(source))
             for para in doc.paragraphs:
-                text += para.text + "\n"
+                yield para.text + "\n"
         except Exception as e:
-            print(f"Error parsing DOCX {file_path}: {e}")
-        return text
+            print(f"Error parsing DOCX {_describe(source)}: {e}")
+            raise
 
     @staticmethod
-    def parse_txt(file_path: str) -> str:
-        """Parses a standard plain text file."""
-        text = ""
+    def iter_txt(source: Source, block_size: int = 1 << 16) -> Iterator[str]:
+        """Yields a UTF-8 text file in line-aligned blocks of roughly block_size characters."""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                text = f.read()
+            if isinstance(source, str):
+                with open(source, "r", encoding="utf-8") as f:
+                    block = []
+                    size = 0
+                    for line in f:
+                        block.append(line)
+                        size += len(line)
+                        if size >= block_size:
+                            yield "".join(block)
+                            block, size = [], 0
+                    if block:
+                        yield "".join(block)
+                return
+
+            data = memoryview(source.read() if hasattr(source, "read") else source)
+            raw = data.obj if isinstance(data.obj, bytes) else bytes(data)
+            # Cut on b"\n", which never occurs inside a multi-byte UTF-8
+            # sequence, so each block decodes on its own
+            pos = 0
+            while pos < len(raw):
+                cut = raw.find(b"\n", pos + block_size)
+                end = len(raw) if cut == -1 else cut + 1
+                block = str(data[pos:end], "utf-8")
+                # Match text-mode universal newlines used for paths
+                yield block.replace("\r\n", "\n").replace("\r", "\n")
+                pos = end
         except Exception as e:
-            print(f"Error parsing TXT {file_path}: {e}")
-        return text
-        
+            print(f"Error parsing TXT {_describe(source)}: {e}")
+            raise
+
     @staticmethod
-    def parse_file(file_path: str) -> str:
-        """Routes file to correct parser based on extension."""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-            
-        ext = os.path.splitext(file_path)[1].lower()
+    def iter_file(source: Source, filename: Optional[str] = None, page_workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Routes a file path, raw bytes or binary buffer to the correct
+        streaming parser. The extension is taken from filename, or from the
+        path itself. The yielded segments concatenate to what parse_file
+        returns.
+        """
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            filename = filename or source
+        elif not filename:
+            raise ValueError("filename is required to parse bytes or a buffer")
+
+        ext = os.path.splitext(filename)[1].lower()
         if ext == ".pdf":
-            return DocumentParser.parse_pdf(file_path)
+            return DocumentParser.iter_pdf(source, page_workers)
         elif ext in [".doc", ".docx"]:
-            return DocumentParser.parse_docx(file_path)
+            return DocumentParser.iter_docx(source)
         elif ext == ".txt":
-            return DocumentParser.parse_txt(file_path)
+            return DocumentParser.iter_txt(source)
         else:
             raise ValueError(f"Unsupported file extension: {ext}")
+
+    @staticmethod
+    def parse_pdf(source: Source) -> str:
+        """Parses a PDF (OCR-ing scanned pages) and returns extracted text."""
+        return "".join(DocumentParser.iter_pdf(source))
+
+    @staticmethod
+    def parse_docx(source: Source) -> str:
+        """Parses a DOCX file and returns extracted text."""
+        return "".join(DocumentParser.iter_docx(source))
+
+    @staticmethod
+    def parse_txt(source: Source) -> str:
+        """Parses a standard plain text file."""
+        return "".join(DocumentParser.iter_txt(source))
+
+    @staticmethod
+    def parse_file(source: Source, filename: Optional[str] = None) -> str:
+        """Routes file to correct parser based on extension."""
+        return "".join(DocumentParser.iter_file(source, filename))
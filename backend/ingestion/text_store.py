@@ -0,0 +1,97 @@
+"""
+ingestion/text_store.py
+───────────────────────
+Extracted text of every embedded document (table: document_texts).
+
+The parser's output is compressed with zlib as it streams into the chunker,
+so the full text is never held uncompressed, and stored next to the chunk
+boundaries it was cut at. Stored text is read back the same way, in
+decompressed segments (iter_unpack). Changing CHUNK_MAX_TOKENS or the law-section
+patterns then only needs `ingest_cli.py --rechunk`, which re-chunks this
+text instead of parsing every stored PDF again.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import zlib
+from typing import Iterator
+
+from config.postgres import DocumentText
+
+# zlib level: legal text compresses ~4x at 6; higher levels gain little
+COMPRESS_LEVEL = 6
+
+SOURCE_INGESTED_FILES = "ingested_files"
+SOURCE_CASE_FILES = "case_file_table"
+
+
+class TextPacker:
+    """Compresses a document's text segment by segment as it is parsed."""
+
+    def __init__(self):
+        self._packer = zlib.compressobj(COMPRESS_LEVEL)
+        self._parts: list[bytes] = []
+
+    def add(self, segment: str) -> None:
+        self._parts.append(self._packer.compress(segment.encode("utf-8")))
+
+    def finish(self) -> bytes:
+        self._parts.append(self._packer.flush())
+        return b"".join(self._parts)
+
+
+def iter_unpack(text_zlib: bytes, block_size: int = 1 << 16) -> Iterator[str]:
+    """The stored text as segments, decompressed as they are read."""
+    inflater = zlib.decompressobj()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for i in range(0, len(text_zlib), block_size):
+        segment = decoder.decode(inflater.decompress(text_zlib[i:i + block_size]))
+        if segment:
+            yield segment
+    tail = decoder.decode(inflater.flush(), final=True)
+    if tail:
+        yield tail
+
+
+def save(
+    db_session,
+    collection: str,
+    doc_id: str,
+    content_sha256: str,
+    source: str,
+    file_id: int,
+    manual_meta: dict,
+    text_zlib: bytes,
+    chunk_bounds: list[list[int]],
+    chunker_config: str,
+) -> DocumentText:
+    """
+    Insert or replace the stored text of a document, and commit.
+    chunk_bounds is [[start_offset, end_offset], …] of its chunks.
+    """
+    row = db_session.query(DocumentText).filter_by(collection=collection, doc_id=doc_id).first()
+    if row is None:
+        row = DocumentText(collection=collection, doc_id=doc_id)
+        db_session.add(row)
+    row.content_sha256 = content_sha256
+    row.source = source
+    row.file_id = file_id
+    row.manual_meta_json = json.dumps(manual_meta)
+    row.text_zlib = text_zlib
+    row.chunk_bounds_json = json.dumps(chunk_bounds)
+    row.chunker_config = chunker_config
+    db_session.commit()
+    return row
+
+
+def document_ids(db_session, collection: str, stale_for: str | None = None) -> list[int]:
+    """
+    Ids of the stored documents of a collection, without loading any text.
+    With stale_for, only those not already chunked with that configuration.
+    """
+    q = db_session.query(DocumentText.id).filter(DocumentText.collection == collection)
+    if stale_for is not None:
+        q = q.filter(DocumentText.chunker_config != stale_for)
+    return [row[0] for row in q.order_by(DocumentText.id)]
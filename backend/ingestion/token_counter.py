@@ -0,0 +1,72 @@
+"""
+ingestion/token_counter.py
+──────────────────────────
+Token spans as the embedding model sees them, so the chunker can keep every
+chunk inside EMBEDDING_MODEL's context window instead of letting Ollama
+silently truncate it.
+
+When EMBED_TOKENIZER_PATH points at the model's tokenizer.json (for
+mxbai-embed-large: mixedbread-ai/mxbai-embed-large-v1 on Hugging Face) the
+`tokenizers` package gives exact counts. Otherwise a WordPiece-like
+approximation is used: runs of up to 8 letters, up to 4 digits, and every
+punctuation mark / combining sign count as one token each.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from array import array
+
+from config.settings import settings
+
+_APPROX_TOKEN = re.compile(r"[^\W\d_]{1,8}|\d{1,4}|[^\w\s]|_")
+
+
+class TokenCounter:
+    def __init__(self, tokenizer_path: str = ""):
+        self.tokenizer_path = tokenizer_path
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _get_tokenizer(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.tokenizer_path:
+                        try:
+                            from tokenizers import Tokenizer
+                            self._tokenizer = Tokenizer.from_file(self.tokenizer_path)
+                        except Exception as e:
+                            print(f"Could not load tokenizer {self.tokenizer_path}: {e} — approximating token counts")
+                    self._loaded = True
+        return self._tokenizer
+
+    def spans(self, text: str, start: int = 0, end: int | None = None) -> tuple[array, array]:
+        """
+        Start and end offsets (into text) of the tokens of text[start:end].
+        Stored as two flat integer arrays, so memory stays at ~16 bytes per token.
+        """
+        end = len(text) if end is None else end
+        starts, ends = array("q"), array("q")
+        tokenizer = self._get_tokenizer()
+        if tokenizer is not None:
+            encoding = tokenizer.encode(text[start:end], add_special_tokens=False)
+            for tok_start, tok_end in encoding.offsets:
+                starts.append(start + tok_start)
+                ends.append(start + tok_end)
+        else:
+            for match in _APPROX_TOKEN.finditer(text, start, end):
+                starts.append(match.start())
+                ends.append(match.end())
+        return starts, ends
+
+    def count(self, text: str) -> int:
+        tokenizer = self._get_tokenizer()
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False).ids)
+        return sum(1 for _ in _APPROX_TOKEN.finditer(text))
+
+
+token_counter = TokenCounter(settings.EMBED_TOKENIZER_PATH)
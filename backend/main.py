@@ -1,12 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
 from api.routes import router as api_router
+from api.query_log_writer import query_log_writer
+from evaluation import query_stats
+
+
+async def maintain_query_logs() -> None:
+    """Keep query_logs partitions and the dashboard rollups current."""
+    while True:
+        try:
+            await asyncio.to_thread(query_stats.maintain)
+        except Exception as e:
+            print(f"Query log maintenance failed: {e}")
+        await asyncio.sleep(settings.QUERY_LOG_MAINTENANCE_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    query_log_writer.start()
+    maintenance = asyncio.create_task(maintain_query_logs())
+    yield
+    maintenance.cancel()
+    await query_log_writer.stop()  # drain buffered query logs
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="Local Agentic RAG — Legal Intelligence System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
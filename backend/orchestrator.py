@@ -7,14 +7,14 @@ from config.settings import settings
 
 class RAGOrchestrator:
     @staticmethod
-    def process_query(query: str, db_names: List[str] = None, case_id: int = None) -> Dict[str, Any]:
+    async def process_query(query: str, db_names: List[str] = None, case_id: int = None) -> Dict[str, Any]:
         """Runs the full RAG pipeline: retrieval, generation, evaluation, and retry loop."""
         if db_names is None:
             db_names = [settings.LAW_DB_NAME, settings.CASES_DB_NAME, settings.CLIENT_DB_NAME]
             
         # 1. Retrieval
         client_case_id = str(case_id) if case_id else None
-        raw_results = QuerySearcher.search(query, db_names=db_names, client_case_id=client_case_id)
+        raw_results = await QuerySearcher.asearch(query, db_names=db_names, client_case_id=client_case_id)
         ranked_results = ResultRanker.rank_and_filter(raw_results)
         
         if not ranked_results:
@@ -28,8 +28,8 @@ class RAGOrchestrator:
         
         for attempt in range(settings.MAX_RETRIES):
             print(f"Generation attempt {attempt + 1}...")
-            response_text = GeneratorLLM.generate(query, context, previous_feedback)
-            evaluation = EvaluatorJudge.evaluate(query, context, response_text)
+            response_text = await GeneratorLLM.generate(query, context, previous_feedback)
+            evaluation = await EvaluatorJudge.evaluate(query, context, response_text)
             
             attempts.append({"response": response_text, "score": evaluation["score"], "eval": evaluation})
             
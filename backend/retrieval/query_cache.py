@@ -0,0 +1,103 @@
+"""
+retrieval/query_cache.py
+────────────────────────
+In-process cache of query embeddings for QuerySearcher.
+
+Keyed by (EMBEDDING_MODEL, normalized query), so repeats that differ only in
+case, spacing or trailing punctuation ("What is bail?" / "what is  bail")
+share one vector and skip both Ollama and the on-disk embedding cache.
+Entries expire after QUERY_EMBED_CACHE_TTL_SECONDS and the least recently
+used are evicted beyond QUERY_EMBED_CACHE_ITEMS. QUERY_EMBED_CACHE_ENABLED
+turns it off.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config.settings import settings
+
+_SPACES = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.;:,"
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a query."""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    return _SPACES.sub(" ", text).strip().rstrip(_TRAILING_PUNCTUATION).rstrip()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_items: int, ttl_seconds: float, enabled: bool = True):
+        self._max_items = max_items
+        self._ttl = ttl_seconds
+        self.enabled = enabled
+        # Vectors are stored as tuples so no caller can change a cached entry
+        self._entries: OrderedDict[tuple[str, str], tuple[float, tuple[float, ...]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, query: str, model: Optional[str] = None) -> Optional[List[float]]:
+        if not self.enabled:
+            return None
+        key = (model or settings.EMBEDDING_MODEL, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(entry[1])
+
+    def put(self, query: str, vector: List[float], model: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        key = (model or settings.EMBEDDING_MODEL, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, tuple(vector))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            expired, evictions, items = self.expired, self.evictions, len(self._entries)
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "expired": expired,
+            "evictions": evictions,
+            "items": items,
+            "max_items": self._max_items,
+            "ttl_seconds": self._ttl,
+        }
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    max_items=settings.QUERY_EMBED_CACHE_ITEMS,
+    ttl_seconds=settings.QUERY_EMBED_CACHE_TTL_SECONDS,
+    enabled=settings.QUERY_EMBED_CACHE_ENABLED,
+)
@@ -1,7 +1,28 @@
+import asyncio
 from typing import List, Dict, Any, Optional
 import ollama
-from config.database import db_client
+from config.database import db_client, ollama_client
 from config.settings import settings
+from ingestion.embedder import DocumentEmbedder
+from ingestion.embedding_cache import embedding_cache, embedding_space
+from retrieval.query_cache import query_embedding_cache
+
+# Collections already checked for vectors from another embedding space
+_space_checked: set = set()
+
+
+def _check_embedding_space(db_name: str, collection) -> None:
+    """Warn once per collection whose vectors queries can't be compared with."""
+    if db_name in _space_checked:
+        return
+    _space_checked.add(db_name)
+    space = DocumentEmbedder.collection_space(collection)
+    if space != embedding_space() and collection.count():
+        print(
+            f"Warning: collection {db_name} was embedded in {space or 'the legacy /api/embeddings space'}, "
+            f"queries in {embedding_space()}; re-embed it with "
+            f"`python ingest_cli.py --db <law|cases|client> --reembed`"
+        )
 
 class QuerySearcher:
     @staticmethod
@@ -17,16 +38,49 @@ class QuerySearcher:
     @staticmethod
     def search(query: str, db_names: List[str], top_k: int = 5, filters: Optional[Dict[str, Any]] = None, client_case_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Embedded query search across specified databases."""
+        query_embedding = query_embedding_cache.get(query)
+        if query_embedding is None:
+            query_embedding = embedding_cache.get(query)
+            if query_embedding is None:
+                try:
+                    # EMBED_ENDPOINT, as for documents: vectors from another
+                    # endpoint aren't comparable (see embedding_cache.py)
+                    response = ollama.embed(model=settings.EMBEDDING_MODEL, input=query)
+                    query_embedding = response.get('embeddings')[0]
+                except Exception as e:
+                    print(f"Error embedding query: {e}")
+                    return []
+                embedding_cache.put(query, query_embedding)
+            query_embedding_cache.put(query, query_embedding)
+
+        return QuerySearcher.query_collections(query, query_embedding, db_names, top_k, filters, client_case_id)
+
+    @staticmethod
+    async def asearch(query: str, db_names: List[str], top_k: int = 5, filters: Optional[Dict[str, Any]] = None, client_case_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """search() for the async request path: awaits Ollama, runs ChromaDB in a worker thread."""
+        query_embedding = query_embedding_cache.get(query)
+        if query_embedding is None:
+            query_embedding = await asyncio.to_thread(embedding_cache.get, query)
+            if query_embedding is None:
+                try:
+                    response = await ollama_client.embed(model=settings.EMBEDDING_MODEL, input=query)
+                    query_embedding = response.get('embeddings')[0]
+                except Exception as e:
+                    print(f"Error embedding query: {e}")
+                    return []
+                await asyncio.to_thread(embedding_cache.put, query, query_embedding)
+            query_embedding_cache.put(query, query_embedding)
+
+        return await asyncio.to_thread(
+            QuerySearcher.query_collections, query, query_embedding, db_names, top_k, filters, client_case_id,
+        )
+
+    @staticmethod
+    def query_collections(query: str, query_embedding: List[float], db_names: List[str], top_k: int = 5, filters: Optional[Dict[str, Any]] = None, client_case_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Nearest-neighbour query of each named ChromaDB collection (blocking)."""
         if not filters:
             filters = QuerySearcher.preprocess_query(query)
-            
-        try:
-            response = ollama.embeddings(model=settings.EMBEDDING_MODEL, prompt=query)
-            query_embedding = response.get('embedding')
-        except Exception as e:
-            print(f"Error embedding query: {e}")
-            return []
-            
+
         results_list = []
         
         for db_name in db_names:
@@ -40,6 +94,7 @@ class QuerySearcher:
                 continue
 
             try:
+                _check_embedding_space(db_name, collection)
                 # Query the collection
                 clargs = {
                     "query_embeddings": [query_embedding],
@@ -0,0 +1,37 @@
+"""
+tests/conftest.py
+─────────────────
+Shared fixtures. Database tests run against POSTGRES_URL inside one
+transaction that is rolled back afterwards, so they leave no rows behind.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from config.postgres import engine, get_db
+from main import app
+
+
+@pytest.fixture
+def db():
+    """A Session whose writes are rolled back when the test ends."""
+    connection = engine.connect()
+    outer = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        outer.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def api(db):
+    """TestClient whose endpoints use the db fixture's session."""
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
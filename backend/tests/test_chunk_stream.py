@@ -0,0 +1,51 @@
+"""
+tests/test_chunk_stream.py
+──────────────────────────
+A document's chunks are cut lazily as embed_and_store pulls them, and a
+parse_pool process hands them back through a spool file; either way they
+are the chunks chunk_stream() cuts from the whole text.
+"""
+
+import pickle
+import zlib
+
+from ingest_cli import METADATA_HEAD_CHARS, _chunk_stored_text, _parse_and_chunk
+from ingestion.chunker import SectionAwareChunker
+
+TEXT = "\n\n".join(
+    f"Paragraph {i}. The court held that the lease was breached and damages were owed. " * 3
+    for i in range(400)
+)
+
+
+def _expected() -> list[str]:
+    return [c["text"] for c in SectionAwareChunker.chunk_stream([TEXT], "case_history_db")]
+
+
+def test_lazy_stream_matches_chunk_stream():
+    stream = _parse_and_chunk(TEXT.encode("utf-8"), "doc.txt", "case_history_db")
+    assert stream.read_head() == TEXT[:METADATA_HEAD_CHARS]
+    # Only the chunks needed to read the head have been cut so far
+    assert stream.count < len(_expected())
+
+    assert [c["text"] for c in stream] == _expected()
+    assert stream.count == len(_expected())
+    assert zlib.decompress(stream.text_zlib).decode("utf-8") == TEXT
+    for (start, end), text in zip(stream.bounds, _expected()):
+        assert TEXT[start:end] == text
+
+
+def test_spooled_stream_survives_pickling():
+    spooled = pickle.loads(pickle.dumps(
+        _parse_and_chunk(TEXT.encode("utf-8"), "doc.txt", "case_history_db", 1, True)
+    ))
+    assert spooled.read_head() == TEXT[:METADATA_HEAD_CHARS]
+    assert [c["text"] for c in spooled] == _expected()
+
+
+def test_stored_text_rechunks_to_the_same_chunks():
+    stream = _parse_and_chunk(TEXT.encode("utf-8"), "doc.txt", "case_history_db")
+    chunks = [c["text"] for c in stream]
+    stored = _chunk_stored_text(stream.text_zlib, "case_history_db")
+    assert [c["text"] for c in stored] == chunks
+    assert stored.bounds == stream.bounds
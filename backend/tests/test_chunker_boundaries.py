@@ -0,0 +1,57 @@
+"""
+tests/test_chunker_boundaries.py
+────────────────────────────────
+Token windows end at content-defined boundaries, so a small edit changes
+only the chunks around it — and chunk IDs are derived from chunk text, so
+only those are embedded again on re-ingest.
+"""
+
+import random
+
+from ingestion.chunker import SectionAwareChunker
+from ingestion.token_counter import token_counter
+
+MAX_TOKENS = 200
+OVERLAP = 20
+WORDS = (
+    "the court held that plaintiff defendant appeal judgment contract breach "
+    "damages statute clause evidence witness order tenant lease notice"
+).split()
+
+
+def _document(paragraphs: int = 150) -> str:
+    rng = random.Random(7)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    return "\n\n".join(" ".join(sentence() for _ in range(rng.randint(3, 7))) for _ in range(paragraphs))
+
+
+def _chunks(text: str, page_chars: int | None = None) -> list[str]:
+    pages = [text] if page_chars is None else [text[i:i + page_chars] for i in range(0, len(text), page_chars)]
+    return [c["text"] for c in SectionAwareChunker.chunk_stream(pages, "general", MAX_TOKENS, OVERLAP)]
+
+
+def test_small_insertion_changes_only_nearby_chunks():
+    text = _document()
+    before = _chunks(text)
+    middle = text.index(". ", len(text) // 2) + 2
+    after = _chunks(text[:middle] + "The parties settled the matter out of court. " + text[middle:])
+
+    assert len(before) > 30
+    new_texts = [t for t in after if t not in set(before)]
+    assert len(new_texts) <= 3, f"{len(new_texts)} of {len(after)} chunks changed"
+
+
+def test_windows_respect_token_limit_and_offsets():
+    text = _document(60)
+    for chunk in SectionAwareChunker.chunk_stream([text], "general", MAX_TOKENS, OVERLAP):
+        meta = chunk["metadata"]
+        assert text[meta["start_offset"]:meta["end_offset"]] == chunk["text"]
+        assert token_counter.count(chunk["text"]) <= MAX_TOKENS
+
+
+def test_windows_do_not_depend_on_page_breaks():
+    text = _document(60)
+    assert _chunks(text, page_chars=777) == _chunks(text)
@@ -0,0 +1,102 @@
+"""
+tests/test_list_query_count.py
+──────────────────────────────
+Regression test for N+1 relationship loads: each list endpoint must issue
+the same number of SQL statements whether it lists N rows or 10N.
+"""
+
+import contextlib
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from config.postgres import (
+    Case,
+    CaseFile,
+    CaseRecord,
+    ChatMessageRecord,
+    ChatSessionRecord,
+    Client,
+    IngestedFile,
+    IngestionStatus,
+    TargetDB,
+)
+
+N = 3
+CHILDREN = 2    # files / messages per listed row
+
+
+def _seed(db, rows: int) -> dict:
+    """
+    rows clients with a case each, one more client owning rows cases, and
+    rows case records and chat sessions; every case, case record and chat
+    session has CHILDREN children.
+    """
+    tag = uuid.uuid4().hex[:8]
+    owner = Client(client_name=f"owner {tag}")
+    for i in range(rows):
+        client = Client(client_name=f"client {tag} {i}")
+        for case_client in (client, owner):
+            case = Case(client=case_client, description=f"case {i}")
+            case.files = [
+                CaseFile(filename=f"f{j}.pdf", file_size_bytes=10) for j in range(CHILDREN)
+            ]
+            db.add(case)
+        record = CaseRecord(case_id=f"{tag}-{i}")
+        record.files = [
+            IngestedFile(
+                original_filename=f"f{j}.pdf",
+                target_db=TargetDB.client,
+                status=IngestionStatus.success,
+            )
+            for j in range(CHILDREN)
+        ]
+        session = ChatSessionRecord(title=f"chat {i}")
+        session.messages_rel = [
+            ChatMessageRecord(role="user", content=f"m{j}") for j in range(CHILDREN)
+        ]
+        db.add_all([record, session])
+    db.flush()
+    ids = {"client_id": owner.client_id, "case_id": owner.cases[0].case_id}
+    # Forget the loaded collections, so a per-row lazy load would show up as SQL
+    db.expire_all()
+    return ids
+
+
+@contextlib.contextmanager
+def _count_statements(db):
+    statements = []
+    connection = db.connection()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", count)
+
+
+PATHS = [
+    "/api/clients?limit=200",
+    "/api/clients/{client_id}/cases?limit=200",
+    "/api/cases-new/{case_id}",
+    "/api/cases-new/{case_id}/files?limit=200",
+    "/api/all-cases?limit=200",
+    "/api/cases/pg?limit=200",
+    "/api/chat-sessions?limit=200",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_statement_count_does_not_grow_with_rows(db, api, path):
+    counts = []
+    for rows in (N, 10 * N):
+        ids = _seed(db, rows)
+        with _count_statements(db) as statements:
+            response = api.get(path.format(**ids))
+        assert response.status_code == 200, response.text
+        counts.append(len(statements))
+    assert counts[0] == counts[1], f"{path}: {counts[0]} statements for {N} rows, {counts[1]} for {10 * N}"
@@ -0,0 +1,95 @@
+"""
+tests/test_listing_blob_size.py
+───────────────────────────────
+Listings must not touch file bytes: the same number of rows is listed once
+with 1 KB and once with 1 MB in their (deferred) BYTEA columns, and the
+listing endpoints' latency and peak memory must not grow with the blobs.
+"""
+
+import statistics
+import time
+import tracemalloc
+import uuid
+
+import pytest
+
+from config.postgres import (
+    Case,
+    CaseFile,
+    CaseRecord,
+    Client,
+    IngestedFile,
+    IngestionStatus,
+    Law,
+    PastCase,
+    TargetDB,
+)
+
+ROWS = 20
+SMALL = 1024
+LARGE = 1024 * 1024
+RUNS = 5
+
+
+def _seed(db, blob_size: int) -> dict:
+    """ROWS rows of every listed file table, each holding blob_size bytes."""
+    tag = uuid.uuid4().hex[:8]
+    blob = b"\x00" * blob_size
+    case = Case(client=Client(client_name=f"client {tag}"))
+    record = CaseRecord(case_id=f"blob-{tag}")
+    for i in range(ROWS):
+        name = f"f{i}.pdf"
+        case.files.append(CaseFile(filename=name, file=blob, file_size_bytes=blob_size))
+        record.files.append(IngestedFile(
+            original_filename=name,
+            file_data=blob,
+            file_size_bytes=blob_size,
+            target_db=TargetDB.client,
+            status=IngestionStatus.success,
+        ))
+        db.add(PastCase(case_name=f"{tag} {i}", filename=name, case_file=blob, file_size_bytes=blob_size))
+        db.add(Law(law_of_country=f"{tag} {i}", filename=name, constitution_file=blob, file_size_bytes=blob_size))
+    db.add_all([case, record])
+    db.flush()
+    ids = {"case_id": case.case_id, "case_record_id": record.case_id}
+    db.expire_all()
+    return ids
+
+
+PATHS = [
+    "/api/files?case_id={case_record_id}&limit={rows}",
+    "/api/cases-new/{case_id}/files?limit={rows}",
+    "/api/past-cases?limit={rows}",
+    "/api/laws?limit={rows}",
+]
+
+
+def _measure(api, url: str) -> tuple[float, int]:
+    """Median latency and peak traced memory of listing url."""
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        response = api.get(url)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        assert len(response.json()["items"]) == ROWS
+    tracemalloc.start()
+    try:
+        api.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(latencies), peak
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_listing_cost_does_not_grow_with_blob_size(db, api, path):
+    # Newest first, so limit=ROWS lists exactly the rows seeded last
+    small_ids = _seed(db, SMALL)
+    small_latency, small_peak = _measure(api, path.format(rows=ROWS, **small_ids))
+    large_ids = _seed(db, LARGE)
+    large_latency, large_peak = _measure(api, path.format(rows=ROWS, **large_ids))
+
+    # Loading the large blobs would cost ROWS MB; allow a fraction of one
+    assert large_peak <= small_peak + LARGE // 2, f"{path}: peak {small_peak} → {large_peak} bytes"
+    assert large_latency <= small_latency * 2 + 0.05, f"{path}: {small_latency:.3f}s → {large_latency:.3f}s"
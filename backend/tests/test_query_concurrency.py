@@ -0,0 +1,85 @@
+"""
+tests/test_query_concurrency.py
+───────────────────────────────
+/api/query must never block the event loop: while ten queries are waiting
+on a (stubbed, slow) Ollama, /api/health answers as fast as when idle.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+import evaluation.judge
+import generation.llm
+import retrieval.search
+from main import app
+from retrieval.query_cache import query_embedding_cache
+from retrieval.search import QuerySearcher
+
+OLLAMA_DELAY = 0.5    # seconds per stubbed embed / chat call
+IN_FLIGHT = 10
+HEALTH_SAMPLES = 20
+SLACK = 0.05          # seconds health may slow down by under load
+
+
+class SlowOllama:
+    """Stands in for ollama.AsyncClient: answers after OLLAMA_DELAY."""
+
+    async def embed(self, model, input):
+        await asyncio.sleep(OLLAMA_DELAY)
+        return {"embeddings": [[0.1, 0.2, 0.3]]}
+
+    async def chat(self, model, messages, format=None):
+        await asyncio.sleep(OLLAMA_DELAY)
+        return {"message": {"content": json.dumps({"score": 9, "is_helpful": True})}}
+
+
+def _stub_backends(monkeypatch):
+    slow = SlowOllama()
+    for module in (retrieval.search, generation.llm, evaluation.judge):
+        monkeypatch.setattr(module, "ollama_client", slow)
+    monkeypatch.setattr(retrieval.search.embedding_cache, "get", lambda *a, **k: None)
+    monkeypatch.setattr(retrieval.search.embedding_cache, "put", lambda *a, **k: None)
+    monkeypatch.setattr(query_embedding_cache, "enabled", False)
+    monkeypatch.setattr(QuerySearcher, "query_collections", staticmethod(
+        lambda *a, **k: [{"id": "1", "text": "Article 1", "metadata": {}, "distance": 0.1, "db_source": "law"}]
+    ))
+
+
+async def _health_latencies(client: httpx.AsyncClient) -> list[float]:
+    latencies = []
+    for _ in range(HEALTH_SAMPLES):
+        start = time.perf_counter()
+        response = await client.get("/api/health")
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return latencies
+
+
+def test_health_stays_flat_while_queries_are_in_flight(monkeypatch):
+    _stub_backends(monkeypatch)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            idle = await _health_latencies(client)
+
+            queries = [
+                asyncio.create_task(client.post("/api/query", json={"query": f"question {i}"}))
+                for i in range(IN_FLIGHT)
+            ]
+            await asyncio.sleep(OLLAMA_DELAY / 5)    # let every query reach Ollama
+            loaded = await _health_latencies(client)
+            assert not any(q.done() for q in queries), "queries finished before health was measured"
+
+            responses = await asyncio.gather(*queries)
+        return idle, loaded, responses
+
+    idle, loaded, responses = asyncio.run(scenario())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert statistics.median(loaded) <= statistics.median(idle) + SLACK
+    assert max(loaded) <= max(idle) + SLACK
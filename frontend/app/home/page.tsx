@@ -6,13 +6,14 @@ import { Menu, UserCircle, Plus, Loader2 } from 'lucide-react';
 import ShinyText from '@/components/ui/ShinyText';
 import { useTheme } from '@/hooks/useTheme';
 import { fetchClients, createClient, type BackendClient } from '@/lib/api';
+import { usePagedList } from '@/hooks/usePagedList';
 
 export default function Home() {
   const router = useRouter();
   const { theme } = useTheme();
   const logoSrc = theme === 'light' ? '/logo_light.png' : '/logo.png';
 
-  const [clients, setClients] = useState<BackendClient[]>([]);
+  const { items: clients, setItems: setClients, hasMore, loadingMore, load, loadMore } = usePagedList<BackendClient>();
   const [loading, setLoading] = useState(true);
   const [creating, setCreating] = useState(false);
   const [newName, setNewName] = useState('');
@@ -20,8 +21,7 @@ export default function Home() {
 
   useEffect(() => {
     setLoading(true);
-    fetchClients()
-      .then(data => setClients(data))
+    load(fetchClients)
       .catch(err => console.error('Failed to load clients:', err))
       .finally(() => setLoading(false));
   }, []);
@@ -120,6 +120,15 @@ export default function Home() {
                     </div>
                   ))
                 )}
+                {!loading && hasMore && (
+                  <button
+                    onClick={() => loadMore().catch(err => console.error('Failed to load more clients:', err))}
+                    disabled={loadingMore}
+                    className="shrink-0 w-36 h-48 md:w-44 md:h-56 rounded-2xl bg-nblm-panel border border-nblm-border flex items-center justify-center text-sm text-nblm-text-muted hover:text-nblm-text hover:bg-zinc-800 transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore ? <Loader2 className="w-5 h-5 animate-spin" /> : 'Load more'}
+                  </button>
+                )}
               </div>
             </div>
 
@@ -9,7 +9,8 @@ import SidebarRight from '@/components/layout/SidebarRight';
 import { useSidebarResize } from '@/hooks/useSidebarResize';
 import { ANALYTICS_MARKDOWN, ANALYTICS_HEADING_MAP } from '@/lib/constants';
 import { upsertSession } from '@/lib/chatHistory';
-import { fetchAnalytics, fetchClients, createClient, createCase, fetchCasesForClient, type AllCaseItem, type BackendClient } from '@/lib/api';
+import { fetchAnalytics, fetchClients, fetchClient, createClient, createCase, fetchCasesForClient, type AllCaseItem, type BackendClient } from '@/lib/api';
+import { usePagedList } from '@/hooks/usePagedList';
 import type { SourceInfo, Message, ChatSession, ChecklistAnalytic } from '@/types';
 
 export default function Page() {
@@ -30,12 +31,12 @@ function Home() {
   const { containerRef, leftOpen, rightOpen, leftWidth, rightWidth, handleToggleLeft, handleToggleRight, handleLeftResizeStart, handleRightResizeStart } = useSidebarResize();
 
   // ── Client Management ──────────────────────────────────────────────────────
-  const [clients, setClients] = useState<BackendClient[]>([]);
+  const { items: clients, setItems: setClients, hasMore: hasMoreClients, load: loadClients, loadMore: loadMoreClients } = usePagedList<BackendClient>();
   const [selectedClientId, setSelectedClientId] = useState<number | null>(null);
   const [clientsLoading, setClientsLoading] = useState(true);
 
   // ── Case Management ────────────────────────────────────────────────────────
-  const [cases, setCases] = useState<AllCaseItem[]>([]);
+  const { items: cases, setItems: setCases, hasMore: hasMoreCases, load: loadCases, loadMore: loadMoreCases, reset: resetCases } = usePagedList<AllCaseItem>();
   const [selectedCaseId, setSelectedCaseId] = useState<number | null>(null);
   const [casesLoading, setCasesLoading] = useState(true);
 
@@ -47,19 +48,28 @@ function Home() {
   // Load clients on mount
   useEffect(() => {
     setClientsLoading(true);
-    fetchClients()
-      .then(data => {
-        setClients(data);
+    loadClients(fetchClients)
+      .then(async data => {
+        if (!data) return;
         // Check if URL has a client param from /home redirect
         const urlClientId = searchParams.get('client');
         if (urlClientId) {
           const cid = parseInt(urlClientId, 10);
           if (data.some(c => c.client_id === cid)) {
             setSelectedClientId(cid);
-          } else if (data.length > 0) {
-            setSelectedClientId(data[0].client_id);
+            return;
           }
-        } else if (data.length > 0) {
+          // Only the first page of clients is loaded; the linked one may be further down
+          try {
+            const client = await fetchClient(cid);
+            setClients(prev => prev.some(c => c.client_id === cid) ? prev : [...prev, client]);
+            setSelectedClientId(cid);
+            return;
+          } catch {
+            // Unknown client: fall back to the first one
+          }
+        }
+        if (data.length > 0) {
           setSelectedClientId(data[0].client_id);
         }
       })
@@ -67,34 +77,35 @@ function Home() {
       .finally(() => setClientsLoading(false));
   }, []); // eslint-disable-line react-hooks/exhaustive-deps
 
-  // When client changes, load their cases
+  // When client changes, load their cases (not when more clients are paged in)
+  const selectedClientName = clients.find(c => c.client_id === selectedClientId)?.client_name;
   useEffect(() => {
     if (!selectedClientId) {
-      setCases([]);
+      resetCases();
       setSelectedCaseId(null);
       setCasesLoading(false);
       return;
     }
     setCasesLoading(true);
-    fetchCasesForClient(selectedClientId)
-      .then((data: Array<{ case_id: number; client_id: number; description: string | null; created_at: string; updated_at: string; file_count: number }>) => {
-        // Map to AllCaseItem shape
-        const selectedClient = clients.find(c => c.client_id === selectedClientId);
-        const mapped: AllCaseItem[] = data.map(c => ({
-          ...c,
-          client_name: selectedClient?.client_name || 'Unknown',
-        }));
-        setCases(mapped);
+    const clientId = selectedClientId;
+    const clientName = selectedClientName || 'Unknown';
+    loadCases(async cursor => {
+      const page = await fetchCasesForClient(clientId, cursor);
+      // Map to AllCaseItem shape
+      return { items: page.items.map(c => ({ ...c, client_name: clientName })), next_cursor: page.next_cursor };
+    })
+      .then(mapped => {
+        if (!mapped) return;
         if (mapped.length > 0) setSelectedCaseId(mapped[0].case_id);
         else setSelectedCaseId(null);
       })
       .catch(err => {
         console.error('Failed to fetch cases for client:', err);
-        setCases([]);
+        resetCases();
         setSelectedCaseId(null);
       })
       .finally(() => setCasesLoading(false));
-  }, [selectedClientId, clients]);
+  }, [selectedClientId, selectedClientName]); // eslint-disable-line react-hooks/exhaustive-deps
 
   // Reset analytics cache when case changes
   useEffect(() => {
@@ -255,6 +266,10 @@ function Home() {
         onCreateClient={handleCreateClient}
         onCreateCase={handleCreateCase}
         clientsLoading={clientsLoading}
+        hasMoreCases={hasMoreCases}
+        onLoadMoreCases={() => loadMoreCases().catch(err => console.error('Failed to fetch more cases:', err))}
+        hasMoreClients={hasMoreClients}
+        onLoadMoreClients={() => loadMoreClients().catch(err => console.error('Failed to fetch more clients:', err))}
       />
 
       {/* Mobile Tabs — only below md */}
@@ -13,6 +13,7 @@ export default function AddSourceModal({ isOpen, onClose, onSourceAdded, caseId
   const [scanContent, setScanContent] = useState('');
   const [uploading, setUploading] = useState(false);
   const [dataType, setDataType] = useState<'1' | '2' | '3'>('1');
+  const [replaceExisting, setReplaceExisting] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
   if (!isOpen) return null;
@@ -40,7 +41,7 @@ export default function AddSourceModal({ isOpen, onClose, onSourceAdded, caseId
     if (!caseId) { alert('Please select a case first'); return; }
     setUploading(true);
     try {
-      const result = await uploadCaseFile(caseId, file);
+      const result = await uploadCaseFile(caseId, file, { overwrite: replaceExisting });
       const newSource: SourceInfo = {
         id: result.file_id?.toString() ?? Date.now().toString(),
         title: result.filename,
@@ -69,7 +70,7 @@ export default function AddSourceModal({ isOpen, onClose, onSourceAdded, caseId
       const blob = new Blob([noteContent], { type: 'text/plain' });
       const fileName = (noteTitle || 'Untitled Note') + '.txt';
       const file = new File([blob], fileName, { type: 'text/plain' });
-      const result = await uploadCaseFile(caseId, file);
+      const result = await uploadCaseFile(caseId, file, { overwrite: replaceExisting });
       const newSource: SourceInfo = {
         id: result.file_id?.toString() ?? Date.now().toString(),
         title: fileName,
@@ -98,7 +99,7 @@ export default function AddSourceModal({ isOpen, onClose, onSourceAdded, caseId
     try {
       const blob = new Blob([scanContent], { type: 'text/plain' });
       const file = new File([blob], 'Scanned_Document.txt', { type: 'text/plain' });
-      const result = await uploadCaseFile(caseId, file);
+      const result = await uploadCaseFile(caseId, file, { overwrite: replaceExisting });
       const newSource: SourceInfo = {
         id: result.file_id?.toString() ?? Date.now().toString(),
         title: 'Scanned Document',
@@ -163,6 +164,15 @@ export default function AddSourceModal({ isOpen, onClose, onSourceAdded, caseId
                 </button>
               ))}
             </div>
+            <label className="mt-4 flex items-center gap-2 text-sm text-zinc-400">
+              <input
+                type="checkbox"
+                checked={replaceExisting}
+                onChange={e => setReplaceExisting(e.target.checked)}
+                className="accent-zinc-500"
+              />
+              Replace the existing source with the same name (new version)
+            </label>
           </div>
 
           {/* Upload Tab */}
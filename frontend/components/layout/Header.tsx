@@ -13,6 +13,7 @@ import {
 export default function Header({
   cases, selectedCaseId, onCaseChange, isLoading,
   clients, selectedClientId, onClientChange, onCreateClient, onCreateCase, clientsLoading,
+  hasMoreCases, onLoadMoreCases, hasMoreClients, onLoadMoreClients,
 }: HeaderProps) {
   const { theme, toggle } = useTheme();
   const [showNewClientInput, setShowNewClientInput] = useState(false);
@@ -133,6 +134,17 @@ export default function Header({
                   )}
                 </div>
               ))}
+              {hasMoreCases && onLoadMoreCases && (
+                <>
+                  <DropdownMenuSeparator />
+                  <DropdownMenuItem
+                    onClick={(e) => { e.preventDefault(); onLoadMoreCases(); }}
+                    className="justify-center text-xs text-nblm-text-muted"
+                  >
+                    Load more cases
+                  </DropdownMenuItem>
+                </>
+              )}
             </DropdownMenuContent>
           </DropdownMenu>
         )}
@@ -220,6 +232,14 @@ export default function Header({
                 </DropdownMenuItem>
               ))
             )}
+            {!clientsLoading && hasMoreClients && onLoadMoreClients && (
+              <DropdownMenuItem
+                onClick={(e) => { e.preventDefault(); onLoadMoreClients(); }}
+                className="justify-center text-xs text-nblm-text-muted"
+              >
+                Load more clients
+              </DropdownMenuItem>
+            )}
           </DropdownMenuContent>
         </DropdownMenu>
       </div>
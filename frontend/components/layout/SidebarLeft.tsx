@@ -6,6 +6,11 @@ import type { SourceInfo, SidebarLeftProps, ChatSession } from '@/types';
 import AddSourceModal from '@/components/layout/AddSourceModal';
 import ChatHistoryPanel from '@/components/layout/ChatHistoryPanel';
 import { fetchCaseFiles, getCaseFileDownloadUrl, type BackendCaseFile } from '@/lib/api';
+import { usePagedList } from '@/hooks/usePagedList';
+
+function isProcessing(source: SourceInfo) {
+  return source.status === 'pending' || source.status === 'processing';
+}
 
 function caseFileToSourceInfo(f: BackendCaseFile): SourceInfo {
   const mimeType = f.mime_type || 'application/octet-stream';
@@ -24,7 +29,7 @@ function caseFileToSourceInfo(f: BackendCaseFile): SourceInfo {
 export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, caseId }: SidebarLeftProps) {
   const [tab, setTab] = useState<'sources' | 'history'>('sources');
   const [historyRefreshKey, setHistoryRefreshKey] = useState(0);
-  const [sources, setSources] = useState<SourceInfo[]>([]);
+  const { items: sources, setItems: setSources, hasMore, loadingMore, load, loadMore, reset } = usePagedList<SourceInfo>();
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
   const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set());
   const [isLoading, setIsLoading] = useState(false);
@@ -33,7 +38,7 @@ export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, c
   // Fetch sources from backend when case changes
   useEffect(() => {
     if (!caseId) {
-      setSources([]);
+      reset();
       return;
     }
     loadSources(caseId);
@@ -42,14 +47,15 @@ export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, c
   const loadSources = useCallback(async (id: number) => {
     setIsLoading(true);
     try {
-      const files = await fetchCaseFiles(id);
-      const mapped = files.map(caseFileToSourceInfo);
-      setSources(mapped);
+      const mapped = await load(async cursor => {
+        const page = await fetchCaseFiles(id, cursor);
+        return { items: page.items.map(caseFileToSourceInfo), next_cursor: page.next_cursor };
+      });
+      if (!mapped) return;
       setSelectedIds(new Set(mapped.map(s => s.id)));
 
       // If any files are still processing, poll for updates
-      const hasProcessing = files.some(f => f.status === 'pending' || f.status === 'processing');
-      if (hasProcessing) {
+      if (mapped.some(isProcessing)) {
         startPolling(id);
       } else {
         stopPolling();
@@ -59,17 +65,34 @@ export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, c
     } finally {
       setIsLoading(false);
     }
-  }, []);
+  }, [load]);
+
+  const handleLoadMore = async () => {
+    try {
+      const more = await loadMore();
+      setSelectedIds(prev => new Set([...prev, ...more.map(s => s.id)]));
+    } catch (error) {
+      console.error('Failed to fetch more sources:', error);
+    }
+  };
 
   const startPolling = useCallback((id: number) => {
     stopPolling();
     pollTimerRef.current = setInterval(async () => {
       try {
-        const files = await fetchCaseFiles(id);
-        const mapped = files.map(caseFileToSourceInfo);
-        setSources(mapped);
-        const hasProcessing = files.some(f => f.status === 'pending' || f.status === 'processing');
-        if (!hasProcessing) stopPolling();
+        // Files are listed newest first, so the ones still ingesting are on
+        // the first page; refresh it in place and keep the pages loaded below
+        const page = await fetchCaseFiles(id);
+        const fresh = page.items.map(caseFileToSourceInfo);
+        const freshById = new Map(fresh.map(s => [s.id, s]));
+        setSources(prev => {
+          const seen = new Set(prev.map(s => s.id));
+          return [
+            ...fresh.filter(s => !seen.has(s.id)),
+            ...prev.map(s => freshById.get(s.id) ?? s),
+          ];
+        });
+        if (!fresh.some(isProcessing)) stopPolling();
       } catch {
         // ignore polling errors
       }
@@ -113,8 +136,6 @@ export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, c
     return <FileText className="w-4 h-4 text-blue-500" />;
   };
 
-  const isProcessing = (source: SourceInfo) => source.status === 'pending' || source.status === 'processing';
-
   return (
     <aside className="w-full bg-nblm-bg flex flex-col h-full shrink-0">
       {/* Header */}
@@ -266,6 +287,17 @@ export default function SidebarLeft({ onToggle, onSourceSelect, onLoadSession, c
                 </button>
               </li>
             ))}
+            {hasMore && (
+              <li className="px-4 py-2">
+                <button
+                  onClick={handleLoadMore}
+                  disabled={loadingMore}
+                  className="w-full flex items-center justify-center gap-2 text-[13px] text-nblm-text-muted hover:text-nblm-text py-1.5 rounded-full border border-nblm-border hover:bg-nblm-panel transition-colors disabled:opacity-50"
+                >
+                  {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Load more'}
+                </button>
+              </li>
+            )}
           </ul>
         )}
       </div>
@@ -0,0 +1,75 @@
+'use client';
+
+import { useState, useRef, useCallback } from 'react';
+import type { Page } from '@/lib/api';
+
+export type PageFetcher<T> = (cursor: string | null) => Promise<Page<T>>;
+
+export interface UsePagedListReturn<T> {
+  items: T[];
+  setItems: React.Dispatch<React.SetStateAction<T[]>>;
+  hasMore: boolean;
+  loadingMore: boolean;
+  load: (fetcher: PageFetcher<T>) => Promise<T[] | null>;
+  loadMore: () => Promise<T[]>;
+  reset: () => void;
+}
+
+/**
+ * A list endpoint read one page at a time, following next_cursor.
+ * load() replaces the list with the first page of a fetcher; loadMore()
+ * appends the next page. A load() started later supersedes an earlier one,
+ * whose result is dropped (load() then resolves to null).
+ */
+export function usePagedList<T>(): UsePagedListReturn<T> {
+  const [items, setItems] = useState<T[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const fetcherRef = useRef<PageFetcher<T> | null>(null);
+  const cursorRef = useRef<string | null>(null);
+  const loadingMoreRef = useRef(false);
+  const generation = useRef(0);
+
+  const setCursor = (cursor: string | null) => {
+    cursorRef.current = cursor;
+    setNextCursor(cursor);
+  };
+
+  const load = useCallback(async (fetcher: PageFetcher<T>) => {
+    const current = ++generation.current;
+    fetcherRef.current = fetcher;
+    const page = await fetcher(null);
+    if (current !== generation.current) return null;
+    setItems(page.items);
+    setCursor(page.next_cursor);
+    return page.items;
+  }, []);
+
+  const loadMore = useCallback(async () => {
+    const fetcher = fetcherRef.current;
+    const cursor = cursorRef.current;
+    if (!fetcher || !cursor || loadingMoreRef.current) return [];
+    const current = generation.current;
+    loadingMoreRef.current = true;
+    setLoadingMore(true);
+    try {
+      const page = await fetcher(cursor);
+      if (current !== generation.current) return [];
+      setItems(prev => [...prev, ...page.items]);
+      setCursor(page.next_cursor);
+      return page.items;
+    } finally {
+      loadingMoreRef.current = false;
+      setLoadingMore(false);
+    }
+  }, []);
+
+  const reset = useCallback(() => {
+    generation.current++;
+    fetcherRef.current = null;
+    setItems([]);
+    setCursor(null);
+  }, []);
+
+  return { items, setItems, hasMore: nextCursor !== null, loadingMore, load, loadMore, reset };
+}
@@ -5,18 +5,37 @@
 
 const API = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
+/** Rows per page requested from the list endpoints. */
+export const PAGE_SIZE = 50;
+
+/**
+ * One page of a list endpoint. Pass the previous page's next_cursor to get
+ * the page after it; next_cursor is null on the last page.
+ */
+async function fetchPage<T>(path: string, cursor?: string | null, params: Record<string, string> = {}): Promise<Page<T>> {
+  const query = new URLSearchParams({ ...params, limit: PAGE_SIZE.toString() });
+  if (cursor) query.set('cursor', cursor);
+  const res = await fetch(`${API}${path}?${query}`);
+  if (!res.ok) throw new Error(`Failed to fetch ${path}`);
+  return res.json();
+}
+
 // ─── Clients ──────────────────────────────────────────────────────────────────
 
-export async function fetchClients(): Promise<BackendClient[]> {
+export async function fetchClients(cursor?: string | null): Promise<Page<BackendClient>> {
   try {
-    const res = await fetch(`${API}/clients`);
-    if (!res.ok) return [];
-    return await res.json();
+    return await fetchPage<BackendClient>('/clients', cursor);
   } catch {
-    return [];
+    return { items: [], next_cursor: null };
   }
 }
 
+export async function fetchClient(clientId: number): Promise<BackendClient> {
+  const res = await fetch(`${API}/clients/${clientId}`);
+  if (!res.ok) throw new Error('Failed to fetch client');
+  return res.json();
+}
+
 export async function createClient(data: { client_name: string; phone?: string; address?: string }): Promise<BackendClient> {
   const res = await fetch(`${API}/clients`, {
     method: 'POST',
@@ -29,21 +48,17 @@ export async function createClient(data: { client_name: string; phone?: string;
 
 // ─── Cases ────────────────────────────────────────────────────────────────────
 
-export async function fetchAllCases(): Promise<AllCaseItem[]> {
+export async function fetchAllCases(cursor?: string | null): Promise<Page<AllCaseItem>> {
   try {
-    const res = await fetch(`${API}/all-cases`);
-    if (!res.ok) return [];
-    return await res.json();
+    return await fetchPage<AllCaseItem>('/all-cases', cursor);
   } catch {
     // Backend not running or unreachable — return empty list gracefully
-    return [];
+    return { items: [], next_cursor: null };
   }
 }
 
-export async function fetchCasesForClient(clientId: number) {
-  const res = await fetch(`${API}/clients/${clientId}/cases`);
-  if (!res.ok) throw new Error('Failed to fetch cases');
-  return res.json();
+export async function fetchCasesForClient(clientId: number, cursor?: string | null): Promise<Page<BackendCase>> {
+  return fetchPage<BackendCase>(`/clients/${clientId}/cases`, cursor);
 }
 
 export async function createCase(clientId: number, description?: string) {
@@ -58,17 +73,26 @@ export async function createCase(clientId: number, description?: string) {
 
 // ─── Case Files (Sources) ─────────────────────────────────────────────────────
 
-export async function fetchCaseFiles(caseId: number): Promise<BackendCaseFile[]> {
-  const res = await fetch(`${API}/cases-new/${caseId}/files`);
-  if (!res.ok) throw new Error('Failed to fetch case files');
-  return res.json();
+export async function fetchCaseFiles(caseId: number, cursor?: string | null): Promise<Page<BackendCaseFile>> {
+  return fetchPage<BackendCaseFile>(`/cases-new/${caseId}/files`, cursor);
 }
 
-export async function uploadCaseFile(caseId: number, file: File): Promise<UploadResult> {
+/**
+ * Upload a file to a case. A new version of a stored file names it with
+ * replacesFileId (or overwrite: the latest file of the same name), so only
+ * its changed chunks are embedded and the old version's are removed.
+ */
+export async function uploadCaseFile(
+  caseId: number,
+  file: File,
+  options: { replacesFileId?: number; overwrite?: boolean } = {},
+): Promise<UploadResult> {
   const formData = new FormData();
   formData.append('file', file);
   formData.append('file_type', 'case_file');
   formData.append('case_id', caseId.toString());
+  if (options.replacesFileId !== undefined) formData.append('replaces_file_id', options.replacesFileId.toString());
+  if (options.overwrite) formData.append('overwrite', 'true');
 
   const res = await fetch(`${API}/upload-file`, {
     method: 'POST',
@@ -127,11 +151,12 @@ export async function clearAnalyticsCache(caseId: number) {
 
 // ─── Chat Sessions ────────────────────────────────────────────────────────────
 
-export async function fetchChatSessions(caseId?: number) {
-  const url = caseId != null ? `${API}/chat-sessions?case_id=${caseId}` : `${API}/chat-sessions`;
-  const res = await fetch(url);
-  if (!res.ok) throw new Error('Failed to fetch chat sessions');
-  return res.json();
+export async function fetchChatSessions(caseId?: number, cursor?: string | null): Promise<Page<BackendChatSession>> {
+  return fetchPage<BackendChatSession>(
+    '/chat-sessions',
+    cursor,
+    caseId != null ? { case_id: caseId.toString() } : {},
+  );
 }
 
 export async function fetchChatSession(sessionId: number) {
@@ -167,6 +192,29 @@ export async function updateChatSession(sessionId: number, data: {
   return res.json();
 }
 
+export async function appendChatMessages(sessionId: number, data: {
+  after_message_id: number | null;
+  title?: string;
+  messages: Array<{ role: string; content: string; ai_response_json?: string | null }>;
+}) {
+  const res = await fetch(`${API}/chat-sessions/${sessionId}/messages`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+  });
+  if (res.status === 409) throw new Error('Chat session changed on the server; refetch it');
+  if (!res.ok) throw new Error('Failed to append chat messages');
+  return res.json();
+}
+
+export async function fetchChatSessionPage(sessionId: number, limit: number, beforeId?: number) {
+  const params = new URLSearchParams({ limit: limit.toString() });
+  if (beforeId != null) params.set('before_id', beforeId.toString());
+  const res = await fetch(`${API}/chat-sessions/${sessionId}?${params}`);
+  if (!res.ok) throw new Error('Failed to fetch chat session');
+  return res.json();
+}
+
 export async function deleteChatSessionApi(sessionId: number) {
   const res = await fetch(`${API}/chat-sessions/${sessionId}`, { method: 'DELETE' });
   if (!res.ok) throw new Error('Failed to delete chat session');
@@ -175,6 +223,11 @@ export async function deleteChatSessionApi(sessionId: number) {
 
 // ─── Types ────────────────────────────────────────────────────────────────────
 
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 export interface BackendClient {
   client_id: number;
   client_name: string;
@@ -184,6 +237,15 @@ export interface BackendClient {
   case_count: number;
 }
 
+export interface BackendCase {
+  case_id: number;
+  client_id: number;
+  description: string | null;
+  created_at: string;
+  updated_at: string;
+  file_count: number;
+}
+
 export interface AllCaseItem {
   case_id: number;
   client_id: number;
@@ -209,9 +271,10 @@ export interface BackendCaseFile {
 }
 
 export interface UploadResult {
-  status: 'success' | 'partial' | 'skipped';
+  status: 'success' | 'partial' | 'skipped' | 'queued';
   file_type: string;
   file_id?: number;
+  job_id?: number;
   filename: string;
   chunks?: number;
   message: string;
@@ -135,6 +135,10 @@ export interface HeaderProps {
   onCreateClient: (name: string) => void;
   onCreateCase?: (clientId: number, description: string) => void;
   clientsLoading?: boolean;
+  hasMoreCases?: boolean;
+  onLoadMoreCases?: () => void;
+  hasMoreClients?: boolean;
+  onLoadMoreClients?: () => void;
 }
 
 export interface AddSourceModalProps {